@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+"""Compares sequential and parallel execution of a RestorePlan"""
+
+import time
+
+import dsklayout.backup.restore_ as restore_
+import dsklayout.graph.graph_ as graph_
+
+
+def make_graph(disks=8):
+    """Disks with two partitions each, mirrored in pairs, with LVs on top"""
+    graph = graph_.Graph()
+    for i in range(disks):
+        disk = 'sd%c' % (ord('a') + i)
+        for j in (1, 2):
+            graph.add_edge((disk, '%s%d' % (disk, j)))
+            graph.add_edge(('%s%d' % (disk, j), 'md%d%d' % (i // 2, j)))
+    for i in range(disks // 2):
+        graph.add_edge(('md%d2' % i, 'vg-lv%d' % i))
+        graph.add_edge(('vg-lv%d' % i, 'crypt%d' % i))
+    return graph
+
+
+def cost(node):
+    # disks get their partition tables written, the rest only regions
+    return 0.02 if node.startswith('sd') and node[-1].isalpha() else 0.005
+
+
+def main():
+    graph = make_graph()
+    for jobs in (1, 2, 4, 8):
+        plan = restore_.RestorePlan(graph, cost, jobs)
+        start = time.perf_counter()
+        plan.execute(lambda node: time.sleep(cost(node)))
+        elapsed = time.perf_counter() - start
+        print("%-20s estimated %8.3f s, measured %8.3f s" %
+              ('%d jobs' % jobs, plan.makespan, elapsed))
+    print("critical path: %s" % ' -> '.join(plan.critical_path()))
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+"""Compares the iterative Dfs against the former recursive implementation,
+and the callback-free fast path against the iterative Dfs with callbacks"""
+
+import sys
+import timeit
+
+import dsklayout.graph.dfs_ as dfs_
+import dsklayout.graph.graph_ as graph_
+
+
+class RecursiveDfs(dfs_.Dfs):
+    """The recursive implementation of Dfs, kept here as a baseline"""
+
+    __slots__ = ()
+
+    def _dfs(self, trail, node, edge):
+        trail.explore_and_append_node(node)
+        stop = self._invoke_callback(trail.ingress_func, trail, node, edge)
+        if not stop:
+            stop = self._select_edges_and_iterate(trail, node)
+        stop |= self._invoke_callback(trail.egress_func, trail, node, edge)
+        return stop
+
+    def _select_edges_and_iterate(self, trail, node):
+        for edge in self.select_edges(trail.graph, node):
+            if trail.edge_explored(edge):
+                continue
+            adjacent_node = trail.graph.adjacent(node, edge)
+            if self._handle_adjacent_node(trail, adjacent_node, edge):
+                return True
+        return False
+
+    def _handle_adjacent_node(self, trail, adjacent_node, edge):
+        if not trail.node_explored(adjacent_node):
+            trail.explore_and_append_edge(edge)
+            return self._dfs(trail, adjacent_node, edge)
+        else:
+            trail.explore_and_append_backedge(edge)
+            return self._invoke_callback(trail.backedge_func, trail, edge)
+
+
+def chain(length):
+    return graph_.Graph(range(length), [(i, i+1) for i in range(length-1)])
+
+
+def fanout(width):
+    return graph_.Graph(range(width+1), [(0, i) for i in range(1, width+1)])
+
+
+def measure(label, search, graph, number):
+    seconds = min(timeit.repeat(lambda: search(graph, [0]),
+                                number=number, repeat=5)) / number
+    print("%-32s %10.3f ms" % (label, seconds * 1000.0))
+    return seconds
+
+
+def noop(trail, node, edge):
+    return False
+
+
+def main():
+    sys.setrecursionlimit(100000)
+    # Without callbacks Dfs dispatches to _dfs_quiet(), which RecursiveDfs
+    # doesn't override, so both implementations are given a callback to
+    # compare _dfs() methods. The fast path is measured separately.
+    cases = [('chain(5000)', chain(5000), 10),
+             ('fanout(20000)', fanout(20000), 10)]
+    for name, graph, number in cases:
+        for direction in ('outward', 'incident'):
+            old = measure('recursive  %s %s' % (direction, name),
+                          RecursiveDfs(direction=direction,
+                                       ingress_func=noop), graph, number)
+            new = measure('iterative  %s %s' % (direction, name),
+                          dfs_.Dfs(direction=direction,
+                                   ingress_func=noop), graph, number)
+            print("%-32s %10.2fx" % ('speedup', old / new))
+            quiet = measure('quiet      %s %s' % (direction, name),
+                            dfs_.Dfs(direction=direction), graph, number)
+            print("%-32s %10.2fx" % ('speedup over iterative', new / quiet))
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ft=python et ts=4 sw=4:
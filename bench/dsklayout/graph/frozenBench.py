@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+"""Compares FrozenGraph against Graph in searches and node queries"""
+
+import pickle
+import timeit
+
+import dsklayout.graph.bfs_ as bfs_
+import dsklayout.graph.dfs_ as dfs_
+import dsklayout.graph.graph_ as graph_
+
+
+def storage_stack(disks, parts):
+    """Disks with partitions, every partition topped with a few volumes"""
+    graph = graph_.Graph()
+    for d in range(disks):
+        disk = 'disk%d' % d
+        graph.add_node(disk)
+        for p in range(parts):
+            part = '%s-p%d' % (disk, p)
+            graph.add_edge((disk, part))
+            for v in range(3):
+                graph.add_edge((part, 'md%d-%d' % (p, v)))
+    return graph
+
+
+def measure(label, func, number=5):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print("%-44s %10.3f ms" % (label, seconds * 1000.0))
+    return seconds
+
+
+def compare(label, graph, frozen, func):
+    mutable = measure('%s, Graph' % label, lambda: func(graph))
+    snapshot = measure('%s, FrozenGraph' % label, lambda: func(frozen))
+    print("%-44s %10.2fx" % ('speedup', mutable / snapshot))
+
+
+def main():
+    graph = storage_stack(200, 50)
+    frozen = graph.freeze()
+    starts = sorted(graph.roots())
+    for klass in (bfs_.Bfs, dfs_.Dfs):
+        name = klass.__name__
+        for direction in ('outward', 'incident'):
+            label = '%s %s' % (name, direction)
+            search = klass(direction=direction)
+            compare(label, graph, frozen, lambda g: search(g, starts))
+            views = klass(direction=direction, views=True)
+            compare('%s, views' % label, graph, frozen,
+                    lambda g: views(g, starts))
+            # searched over FrozenGraph's CSR rows by node identifiers
+            compare('%s, record=nodes' % label, graph, frozen,
+                    lambda g: search(g, starts, record=('nodes',)))
+    nodes = list(graph.nodes)
+    compare('successors() of all nodes', graph, frozen,
+            lambda g: [g.successors(n) for n in nodes])
+    compare('has_successors() of all nodes', graph, frozen,
+            lambda g: [g.has_successors(n) for n in nodes])
+    compare('roots()', graph, frozen, lambda g: g.roots())
+    compare('pickle.dumps()', graph, frozen, lambda g: pickle.dumps(g))
+    print("%-44s %10d B" % ('pickled size, Graph', len(pickle.dumps(graph))))
+    print("%-44s %10d B" % ('pickled size, FrozenGraph',
+                            len(pickle.dumps(frozen))))
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+"""Measures Bfs/Dfs with different trail and callback settings"""
+
+import timeit
+
+import dsklayout.graph.bfs_ as bfs_
+import dsklayout.graph.dfs_ as dfs_
+import dsklayout.graph.graph_ as graph_
+
+
+def storage_stack(disks, parts):
+    """Disks with partitions, every partition topped with a few volumes"""
+    graph = graph_.Graph()
+    for d in range(disks):
+        disk = 'disk%d' % d
+        graph.add_node(disk)
+        for p in range(parts):
+            part = '%s-p%d' % (disk, p)
+            graph.add_edge((disk, part))
+            for v in range(3):
+                graph.add_edge((part, 'md%d-%d' % (p, v)))
+    return graph
+
+
+def measure(label, func, number=5):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print("%-40s %10.3f ms" % (label, seconds * 1000.0))
+    return seconds
+
+
+def main():
+    graph = storage_stack(200, 50)
+    starts = sorted(graph.roots())
+    callback = {'ingress_func': lambda g, n, e: False}
+    for klass in (bfs_.Bfs, dfs_.Dfs):
+        name = klass.__name__
+        search = klass(direction='incident', **callback)
+        full = measure('%s full trail' % name,
+                       lambda: search(graph, starts))
+        nodes = measure('%s record=nodes' % name,
+                        lambda: search(graph, starts, record=('nodes',)))
+        print("%-40s %10.2fx" % ('speedup', full / nodes))
+        quiet = klass(direction='incident')
+        plain = measure('%s no callbacks' % name,
+                        lambda: quiet(graph, starts))
+        print("%-40s %10.2fx" % ('speedup', full / plain))
+        plain = measure('%s no callbacks, record=nodes' % name,
+                        lambda: quiet(graph, starts, record=('nodes',)))
+        print("%-40s %10.2fx" % ('speedup', nodes / plain))
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+"""Measures the cost of creating BlkDev objects with lazy, eager and no
+conversion"""
+
+import timeit
+import json
+import os
+
+import dsklayout.model.blkdev_ as blkdev_
+
+
+def device_properties():
+    """Properties of a partition, as found in lsblk output"""
+    fixture = os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                           'test', 'dsklayout', 'model', 'fixtures',
+                           'lsblk_1_sda.json')
+    with open(fixture) as f:
+        device = json.load(f)['blockdevices'][0]['children'][0]
+    return {k: v for (k, v) in device.items() if k != 'children'}
+
+
+def measure(label, func, number=3):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print("%-40s %10.3f ms" % (label, seconds * 1000.0))
+    return seconds
+
+
+def main():
+    props = device_properties()
+    count = 100000
+    plain = measure('%d devices, convert=False' % count,
+                    lambda: [blkdev_.BlkDev(props) for _ in range(count)])
+    lazy = measure('%d devices, convert=True' % count,
+                   lambda: [blkdev_.BlkDev(props, convert=True)
+                            for _ in range(count)])
+    print("%-40s %10.2fx" % ('convert=True overhead', lazy / plain))
+    # all the values converted when the device is created
+    convert = blkdev_.BlkDev.convert_values
+    eager = measure('%d devices, converted eagerly' % count,
+                    lambda: [blkdev_.BlkDev(convert(props))
+                             for _ in range(count)])
+    print("%-40s %10.2fx" % ('eager conversion overhead', eager / plain))
+    devices = [blkdev_.BlkDev(props, convert=True) for _ in range(count)]
+    measure('%d devices, read size and rota' % count,
+            lambda: [(d.size, d.rota) for d in devices])
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ft=python et ts=4 sw=4:
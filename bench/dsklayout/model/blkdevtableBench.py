@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+"""Compares memory used by BlkDev objects and BlkDevTable rows"""
+
+import tracemalloc
+import timeit
+import json
+import os
+
+import dsklayout.model.blkdev_ as blkdev_
+import dsklayout.model.blkdevtable_ as blkdevtable_
+
+
+def device_properties(count):
+    """Properties of count partitions, based on lsblk output"""
+    fixture = os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                           'test', 'dsklayout', 'model', 'fixtures',
+                           'lsblk_1_sda.json')
+    with open(fixture) as f:
+        device = json.load(f)['blockdevices'][0]['children'][0]
+    device = {k: v for (k, v) in device.items() if k != 'children'}
+    devices = []
+    for i in range(count):
+        props = dict(device)
+        props['name'] = props['kname'] = '/dev/sd%d' % i
+        props['uuid'] = '%032x' % i
+        devices.append(props)
+    return devices
+
+
+def allocated(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def objects(devices):
+    return [blkdev_.BlkDev(p) for p in devices]
+
+
+def table(devices):
+    table = blkdevtable_.BlkDevTable()
+    for props in devices:
+        table.add(props)
+    return table
+
+
+def main():
+    count = 100000
+    devices = device_properties(count)
+    _, plain = allocated(lambda: objects(devices))
+    _, columnar = allocated(lambda: table(devices))
+    print("%-40s %10.1f MiB" % ('%d BlkDev objects' % count, plain / 2**20))
+    print("%-40s %10.1f MiB" % ('%d BlkDevTable rows' % count,
+                                columnar / 2**20))
+    print("%-40s %10.2fx" % ('memory saved', plain / columnar))
+    devs, rows = objects(devices), table(devices)
+    rotational = (lambda v: v == '1')
+    for (label, func) in (
+            ('objects, select rota', lambda: [d for d in devs
+                                              if rotational(d.rota)]),
+            ('table, select rota', lambda: rows.select('rota', rotational))):
+        seconds = min(timeit.repeat(func, number=3, repeat=3)) / 3
+        print("%-40s %10.3f ms" % (label, seconds * 1000.0))
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+"""Compares building a graph with lsblk(8) and loading it from LayoutCache"""
+
+import tempfile
+import timeit
+import shutil
+
+import dsklayout.model.lsblk_ as lsblk_
+import dsklayout.model.layoutcache_ as layoutcache_
+
+
+def measure(label, func, number=10):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print("%-40s %10.3f ms" % (label, seconds * 1000.0))
+    return seconds
+
+
+def main():
+    build = (lambda: lsblk_.LsBlk.new().graph())
+    try:
+        build()
+    except Exception as e:  # no lsblk, or output that can't be decoded
+        print("lsblk unusable here: %s" % e)
+        return
+    cachedir = tempfile.mkdtemp()
+    try:
+        cache = layoutcache_.LayoutCache(cachedir)
+        if cache.key() is None:
+            print("no uevent_seqnum in sysfs, nothing would be cached")
+            return
+        cache.graph(build)
+        slow = measure('lsblk and LsBlk.graph()', build)
+        fast = measure('LayoutCache.graph(), cache hit',
+                       lambda: cache.graph(build))
+        print("%-40s %10.2fx" % ('speedup', slow / fast))
+    finally:
+        shutil.rmtree(cachedir)
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ft=python et ts=4 sw=4:
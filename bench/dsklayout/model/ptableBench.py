@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+"""Compares reading a GPT with PartitionTable and with sfdisk --dump"""
+
+import subprocess
+import tempfile
+import timeit
+import shutil
+import os
+
+import dsklayout.model.ptable_ as ptable_
+import dsklayout.model.sfdisk_ as sfdisk_
+
+
+def measure(label, func, number=20):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print("%-40s %10.3f ms" % (label, seconds * 1000.0))
+    return seconds
+
+
+def make_image(path, partitions=16):
+    """Creates a sparse 8GiB image with a GPT, using sfdisk"""
+    with open(path, 'wb') as f:
+        f.truncate(8 * 2**30)
+    script = 'label: gpt\n' + 'size=256MiB\n' * partitions
+    subprocess.run(['sfdisk', '-q', path], input=script,
+                   universal_newlines=True, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        images = [os.path.join(tmpdir, 'disk%d.img' % i) for i in range(8)]
+        try:
+            for image in images:
+                make_image(image)
+        except (OSError, subprocess.SubprocessError) as e:
+            print("sfdisk unusable here: %s" % e)
+            return
+        slow = measure('sfdisk --dump, 1 image',
+                       lambda: sfdisk_.SfDisk.new(images[0]))
+        fast = measure('PartitionTable.read(), 1 image',
+                       lambda: ptable_.PartitionTable.read(images[0]))
+        print("%-40s %10.2fx" % ('speedup', slow / fast))
+        measure('PartitionTable.read_all(), %d images' % len(images),
+                lambda: ptable_.PartitionTable.read_all(images, jobs=4))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ft=python et ts=4 sw=4:
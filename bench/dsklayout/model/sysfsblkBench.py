@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+"""Compares building the block device graph from sysfs and from lsblk"""
+
+import subprocess
+import tempfile
+import timeit
+import shutil
+import os
+
+import dsklayout.model.lsblk_ as lsblk_
+import dsklayout.model.sysfsblk_ as sysfsblk_
+
+
+def fake_sysfs(root, disks, parts):
+    """Writes a sysfs-like tree with disks and their partitions"""
+    classdir = os.path.join(root, 'class', 'block')
+    os.makedirs(classdir)
+    for d in range(disks):
+        disk = 'sd%d' % d
+        diskdir = os.path.join(root, 'devices', disk)
+        for p in range(parts + 1):
+            name = disk if p == 0 else '%sp%d' % (disk, p)
+            path = diskdir if p == 0 else os.path.join(diskdir, name)
+            os.makedirs(os.path.join(path, 'holders'))
+            os.makedirs(os.path.join(path, 'queue'))
+            for (file, text) in (('dev', '8:%d' % p), ('size', '2048'),
+                                 ('ro', '0'), ('queue/rotational', '1')):
+                with open(os.path.join(path, file), 'w') as f:
+                    f.write(text + '\n')
+            if p > 0:
+                open(os.path.join(path, 'partition'), 'w').close()
+            os.symlink(path, os.path.join(classdir, name))
+
+
+def measure(label, func, number=5):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print("%-40s %10.3f ms" % (label, seconds * 1000.0))
+    return seconds
+
+
+def main():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fake_sysfs(tmpdir, 500, 4)
+        measure('SysfsBlk, 500 disks x 4 partitions',
+                lambda: sysfsblk_.SysfsBlk.new(sysfs=tmpdir).graph())
+    finally:
+        shutil.rmtree(tmpdir)
+
+    try:
+        lsblk_.LsBlk.run()
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        print("lsblk not available, skipping comparison on this host")
+        return
+    tree = measure('LsBlk (tree mode), this host',
+                   lambda: lsblk_.LsBlk.new().graph())
+    flat = measure('LsBlk (list mode), this host',
+                   lambda: lsblk_.LsBlk.new(flat=True).graph())
+    sysfs = measure('SysfsBlk, this host',
+                    lambda: sysfsblk_.SysfsBlk.new().graph())
+    print("%-40s %10.2fx" % ('speedup vs tree mode', tree / sysfs))
+    print("%-40s %10.2fx" % ('speedup vs list mode', flat / sysfs))
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,13 @@
+# -*- coding: utf8 -*-
+
+from .. import util
+util.inject_symbols_from_modules(__package__, [
+    '.chunkstore_',
+    '.exceptions_',
+    '.history_',
+    '.manifest_',
+    '.regions_',
+    '.restore_',
+])
+
+# vim: set ft=python et ts=4 sw=4:
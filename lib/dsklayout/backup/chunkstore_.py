@@ -0,0 +1,73 @@
+# -*- coding: utf8 -*-
+
+from . import exceptions_
+
+import hashlib
+import tempfile
+import os
+
+__all__ = ('ChunkStore',)
+
+
+class ChunkStore(object):
+    """A local store of data chunks addressed by their SHA-256 digests.
+
+       A chunk is stored in ``<directory>/<first two hex digits>/<digest>``
+       and written only once, so identical chunks (e.g. same boot sectors or
+       partition tables backed up from many hosts) share the same file.
+    """
+
+    __slots__ = ('_directory',)
+
+    def __init__(self, directory):
+        self._directory = directory
+
+    @property
+    def directory(self):
+        """The store's directory"""
+        return self._directory
+
+    @classmethod
+    def digest(cls, data):
+        """Returns the address (hex SHA-256 digest) of data"""
+        return hashlib.sha256(data).hexdigest()
+
+    def path(self, digest):
+        """Returns path to the file storing a chunk"""
+        return os.path.join(self._directory, digest[:2], digest)
+
+    def has(self, digest):
+        """Returns True if the store has a chunk with given digest"""
+        return os.path.exists(self.path(digest))
+
+    def put(self, data):
+        """Stores a chunk (unless already present) and returns its digest"""
+        digest = self.digest(data)
+        path = self.path(digest)
+        if not os.path.exists(path):
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        return digest
+
+    def get(self, digest, verify=True):
+        """Returns a chunk with given digest.
+
+        With ``verify=True``, the data is checked against the digest and
+        CorruptedChunkError raised on mismatch.
+        """
+        with open(self.path(digest), 'rb') as f:
+            data = f.read()
+        if verify and self.digest(data) != digest:
+            msg = "corrupted chunk %s" % digest
+            raise exceptions_.CorruptedChunkError(msg)
+        return data
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,13 @@
+# -*- coding: utf8 -*-
+
+__all__ = ('CorruptedChunkError', 'RestoreError')
+
+
+class CorruptedChunkError(Exception):
+    pass
+
+
+class RestoreError(Exception):
+    pass
+
+# vim: set ft=python et ts=4 sw=4:
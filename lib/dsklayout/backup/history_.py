@@ -0,0 +1,125 @@
+# -*- coding: utf8 -*-
+
+from ..graph import Graph, GraphDiff
+from ..model import layoutcache_
+
+import json
+import os
+import re
+import tempfile
+
+__all__ = ('LayoutHistory',)
+
+
+class LayoutHistory(object):
+    """Incremental backups of the layout in a directory.
+
+       A full snapshot of the graph of block devices is kept in
+       ``layout.json`` (as written by LayoutCache.encode_graph()). Later
+       backups are stored as GraphDiffs against that snapshot in
+       ``layout.<N>.diff.json`` files. Each diff refers to the full snapshot
+       only, so any backup is restored from two files. Once there are
+       ``compact`` diffs, the next backup is written as a new full snapshot
+       and the diffs are removed.
+    """
+
+    __slots__ = ('_directory',)
+
+    full = 'layout.json'
+    _diff_re = re.compile(r'^layout\.(\d+)\.diff\.json$')
+
+    def __init__(self, directory):
+        self._directory = directory
+
+    @property
+    def directory(self):
+        """The backup directory"""
+        return self._directory
+
+    def diffs(self):
+        """Returns a sorted list of numbers of the stored diffs"""
+        try:
+            names = os.listdir(self._directory)
+        except FileNotFoundError:
+            return []
+        matches = (self._diff_re.match(name) for name in names)
+        return sorted(int(m.group(1)) for m in matches if m)
+
+    def has_full(self):
+        """Returns True if there is a full snapshot"""
+        return os.path.exists(self._path(self.full))
+
+    def write(self, graph, compact=7):
+        """Stores graph, as a diff if possible.
+
+        A full snapshot is written if there is none yet or if there are
+        already ``compact`` diffs (compact <= 0 means always write a diff).
+        Returns the name of the file written.
+        """
+        diffs = self.diffs()
+        if not self.has_full() or 0 < compact <= len(diffs):
+            return self.write_full(graph)
+        layout = layoutcache_.LayoutCache.encode_graph(graph)
+        base = self._layout_graph(self._load(self.full))
+        diff = GraphDiff.between(base, self._layout_graph(layout))
+        name = self._diff_name(diffs[-1] + 1 if diffs else 1)
+        self._dump(name, diff.to_dict(), sort_keys=True,
+                   separators=(',', ':'))
+        return name
+
+    def write_full(self, graph):
+        """Stores graph as a full snapshot, removing all the diffs"""
+        layout = layoutcache_.LayoutCache.encode_graph(graph)
+        self._dump(self.full, layout, indent=2, sort_keys=True)
+        for number in self.diffs():
+            os.unlink(self._path(self._diff_name(number)))
+        return self.full
+
+    def diff(self, number):
+        """Returns the GraphDiff stored under number"""
+        return GraphDiff.from_dict(self._load(self._diff_name(number)))
+
+    def graph(self, number=None, **kw):
+        """Returns the graph of BlkDevs of a backup.
+
+        By default the most recent backup is returned, number selects
+        a diff, and 0 the full snapshot.
+        """
+        layout = self._layout_graph(self._load(self.full))
+        if number is None:
+            diffs = self.diffs()
+            number = diffs[-1] if diffs else 0
+        if number:
+            self.diff(number).apply(layout)
+        data = {'nodes': dict(layout.nodes.items()),
+                'edges': [list(e) for e in layout.edges]}
+        return layoutcache_.LayoutCache.decode_graph(data, **kw)
+
+    @classmethod
+    def _layout_graph(cls, layout):
+        # graph with raw properties (dicts) as node data
+        return Graph(layout['nodes'], [tuple(e) for e in layout['edges']])
+
+    @classmethod
+    def _diff_name(cls, number):
+        return 'layout.%d.diff.json' % number
+
+    def _path(self, name):
+        return os.path.join(self._directory, name)
+
+    def _load(self, name):
+        with open(self._path(name)) as f:
+            return json.load(f)
+
+    def _dump(self, name, data, **kw):
+        os.makedirs(self._directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, **kw)
+            os.replace(tmp, self._path(name))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+# vim: set ft=python et ts=4 sw=4:
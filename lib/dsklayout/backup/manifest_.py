@@ -0,0 +1,170 @@
+# -*- coding: utf8 -*-
+
+from . import regions_
+from ..model import layoutcache_
+
+import json
+import tempfile
+import os
+
+__all__ = ('Manifest',)
+
+
+class Manifest(object):
+    """A backup of a host, referring to chunks kept in a ChunkStore.
+
+       A manifest holds the graph of block devices (serialized as by
+       LayoutCache.encode_graph()) and named blobs (partition table dumps,
+       device regions, ...). Each blob is split into fixed-size chunks
+       stored in a ChunkStore by their digests, and all-zero chunks aren't
+       stored at all. The manifest itself is a small JSON file, so a repeated
+       backup of an unchanged host, or of a host identical to another one,
+       adds nothing to the store but the manifest.
+    """
+
+    __slots__ = ('_layout', '_blobs', '_regions', '_properties')
+
+    version = 1
+    chunk_size = 64 * 1024
+
+    def __init__(self, graph=None, **properties):
+        if graph is not None:
+            self._layout = layoutcache_.LayoutCache.encode_graph(graph)
+        else:
+            self._layout = {'nodes': {}, 'edges': []}
+        self._blobs = dict()
+        self._regions = []
+        self._properties = properties
+
+    @property
+    def properties(self):
+        """Additional properties of the backup (host, creation time, ...)"""
+        return self._properties
+
+    @property
+    def layout(self):
+        """Serialized graph of block devices"""
+        return self._layout
+
+    @property
+    def blobs(self):
+        """Names of the blobs in the manifest"""
+        return sorted(self._blobs)
+
+    @property
+    def regions(self):
+        """Device regions added with add_regions()"""
+        return list(self._regions)
+
+    def graph(self, **kw):
+        """Returns graph of block devices (BlkDevs) stored in the manifest"""
+        return layoutcache_.LayoutCache.decode_graph(self._layout, **kw)
+
+    def add_blob(self, name, data, store):
+        """Splits data into chunks, puts them to store and records the blob"""
+        size = self.chunk_size
+        zero = bytes(size)
+        chunks = []
+        for offset in range(0, len(data), size):
+            chunk = data[offset:offset+size]
+            if chunk == zero[:len(chunk)]:
+                chunks.append(None)
+            else:
+                chunks.append(store.put(chunk))
+        self._blobs[name] = {'size': len(data), 'chunks': chunks}
+
+    def blob_size(self, name):
+        """Returns size of a blob"""
+        return self._blobs[name]['size']
+
+    def read_blob(self, name, store, offset=0, length=None):
+        """Reads a blob, or a part of it, fetching only the chunks needed"""
+        blob = self._blobs[name]
+        end = blob['size'] if length is None else \
+            min(offset + length, blob['size'])
+        if offset >= end:
+            return b''
+        size = self.chunk_size
+        first, last = offset // size, (end - 1) // size
+        parts = []
+        for i in range(first, last + 1):
+            digest = blob['chunks'][i]
+            if digest is None:
+                parts.append(bytes(min(size, blob['size'] - i * size)))
+            else:
+                parts.append(store.get(digest))
+        data = b''.join(parts)
+        start = offset - first * size
+        return data[start:start + end - offset]
+
+    def add_regions(self, archive, store):
+        """Adds all the regions of a RegionArchive as blobs"""
+        for region in archive.regions:
+            self.add_blob(self.region_blob(region), archive.read(region),
+                          store)
+            extents = [(o, n, o - region.offset)
+                       for (o, n, _) in region.extents]
+            self._regions.append(regions_.Region(region.device,
+                                                 region.offset,
+                                                 region.length,
+                                                 region.device_size,
+                                                 extents))
+
+    def read_region(self, region, store):
+        """Returns contents of a region (holes filled with zeros)"""
+        return self.read_blob(self.region_blob(region), store)
+
+    @classmethod
+    def region_blob(cls, region):
+        """Returns name of the blob storing a region"""
+        return 'region:%s@%d' % (region.device, region.offset)
+
+    def chunks(self):
+        """Returns a set of digests of all the chunks referred to"""
+        return {d for b in self._blobs.values() for d in b['chunks']
+                if d is not None}
+
+    def to_dict(self):
+        """Returns a JSON-serializable representation of the manifest"""
+        return {'version': self.version,
+                'chunk_size': self.chunk_size,
+                'properties': self._properties,
+                'layout': self._layout,
+                'blobs': self._blobs,
+                'regions': [r.to_dict() for r in self._regions]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates manifest from a dict returned by to_dict()"""
+        if data.get('version') != cls.version:
+            raise ValueError("unsupported manifest version: %s" %
+                             repr(data.get('version')))
+        if data['chunk_size'] != cls.chunk_size:
+            raise ValueError("unsupported chunk size: %d" % data['chunk_size'])
+        manifest = cls(**data['properties'])
+        manifest._layout = data['layout']
+        manifest._blobs = data['blobs']
+        manifest._regions = [regions_.Region.from_dict(r)
+                             for r in data['regions']]
+        return manifest
+
+    def save(self, path):
+        """Writes the manifest to a file (atomically)"""
+        directory = os.path.dirname(path) or '.'
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.to_dict(), f, sort_keys=True,
+                          separators=(',', ':'))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Reads manifest from a file"""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+# vim: set ft=python et ts=4 sw=4:
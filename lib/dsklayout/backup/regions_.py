@@ -0,0 +1,354 @@
+# -*- coding: utf8 -*-
+
+from ..graph import topological_sort
+
+import errno
+import json
+import os
+import struct
+
+__all__ = ('Region', 'RegionWriter', 'RegionArchive')
+
+
+# errors meaning that a copy method can't be used for given descriptors
+_UNSUPPORTED = (errno.EINVAL, errno.ENOSYS, errno.EXDEV, errno.EOPNOTSUPP,
+                errno.ENOTSUP, errno.EBADF, errno.ESPIPE)
+
+
+def _device_type(data):
+    # BlkDevs (and alike) have the type among properties, dicts as they are
+    return (getattr(data, 'properties', data) or {}).get('type')
+
+
+def _copy_file_range(src, dst, src_offset, dst_offset, count):
+    return os.copy_file_range(src, dst, count, src_offset, dst_offset)
+
+
+def _sendfile(src, dst, src_offset, dst_offset, count):
+    os.lseek(dst, dst_offset, os.SEEK_SET)
+    return os.sendfile(dst, src, src_offset, count)
+
+
+def _pread_pwrite(src, dst, src_offset, dst_offset, count):
+    data = os.pread(src, min(count, 1 << 20), src_offset)
+    return os.pwrite(dst, data, dst_offset)
+
+
+def _copy_methods():
+    methods = []
+    if hasattr(os, 'copy_file_range'):
+        methods.append(_copy_file_range)
+    if hasattr(os, 'sendfile'):
+        methods.append(_sendfile)
+    methods.append(_pread_pwrite)
+    return methods
+
+
+def _copy(src, dst, src_offset, dst_offset, count):
+    """Copies count bytes between file descriptors, in kernel if possible.
+
+    Falls back from copy_file_range(2) to sendfile(2) and then to pread/pwrite
+    when a method isn't supported for given descriptors. Returns the number
+    of bytes copied (less than count at the end of src).
+    """
+    methods = _copy_methods()
+    copied = 0
+    while copied < count:
+        try:
+            n = methods[0](src, dst, src_offset + copied,
+                           dst_offset + copied, count - copied)
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED or len(methods) == 1:
+                raise
+            methods.pop(0)
+            continue
+        if n == 0:
+            break
+        copied += n
+    return copied
+
+
+def _data_extents(fd, offset, length):
+    """Yields (offset, length) of parts of a file range which contain data.
+
+    Holes are found with SEEK_DATA/SEEK_HOLE. Where these aren't supported
+    (e.g. block devices), the whole range is assumed to contain data.
+    """
+    end = offset + length
+    seek_data = getattr(os, 'SEEK_DATA', None)
+    if seek_data is None:
+        yield (offset, length)
+        return
+    position = offset
+    while position < end:
+        try:
+            start = os.lseek(fd, position, seek_data)
+            stop = os.lseek(fd, start, os.SEEK_HOLE)
+        except OSError as e:
+            if e.errno == errno.ENXIO:  # no more data past position
+                return
+            if e.errno in _UNSUPPORTED:
+                yield (position, end - position)
+                return
+            raise
+        if start >= end:
+            return
+        stop = min(stop, end)
+        yield (start, stop - start)
+        position = stop
+
+
+def _ignore_backedge(graph, edge):
+    pass
+
+
+def _device_size(fd):
+    return os.lseek(fd, 0, os.SEEK_END)
+
+
+class Region(object):
+    """A region of a device stored in RegionArchive.
+
+       Only the extents of the region that contain data are stored, each as
+       an ``(offset, length, archive_offset)`` triple, where offset is given
+       relative to the beginning of the device.
+    """
+
+    __slots__ = ('_device', '_offset', '_length', '_device_size',
+                 '_extents')
+
+    def __init__(self, device, offset, length, device_size, extents=()):
+        self._device = device
+        self._offset = offset
+        self._length = length
+        self._device_size = device_size
+        self._extents = [tuple(e) for e in extents]
+
+    @property
+    def device(self):
+        """The device (or file) the region was copied from"""
+        return self._device
+
+    @property
+    def offset(self):
+        """Offset of the region on device"""
+        return self._offset
+
+    @property
+    def length(self):
+        """Length of the region (including holes)"""
+        return self._length
+
+    @property
+    def device_size(self):
+        """Size of the whole device at the time of backup"""
+        return self._device_size
+
+    @property
+    def extents(self):
+        """A list of (offset, length, archive_offset) of stored data"""
+        return self._extents
+
+    def __repr__(self):
+        return "%s(%s, %d, %d)" % (self.__class__.__name__,
+                                   repr(self._device), self._offset,
+                                   self._length)
+
+    def to_dict(self):
+        """Returns a JSON-serializable representation of the region"""
+        return {'device': self._device, 'offset': self._offset,
+                'length': self._length, 'device_size': self._device_size,
+                'extents': [list(e) for e in self._extents]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates region from a dict returned by to_dict()"""
+        return cls(data['device'], data['offset'], data['length'],
+                   data['device_size'], data['extents'])
+
+
+class RegionWriter(object):
+    """Writes regions of devices into a single archive file.
+
+       The archive starts with a magic string followed by the data of all
+       the regions, with holes left out. The data is copied in kernel
+       (copy_file_range(2) or sendfile(2)) where possible. An index of the
+       regions (JSON) and a trailer locating the index are appended by
+       close().
+    """
+
+    __slots__ = ('_path', '_fd', '_position', '_regions')
+
+    magic = b'DSKLREG1'
+    trailer = struct.Struct('<QQ8s')  # index offset, index length, magic
+
+    def __init__(self, path):
+        self._path = path
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        self._position = os.write(self._fd, self.magic)
+        self._regions = []
+
+    @property
+    def path(self):
+        """Path to the archive"""
+        return self._path
+
+    @property
+    def regions(self):
+        """Regions written so far"""
+        return list(self._regions)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.close()
+        elif self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def add(self, device, offset, length):
+        """Copies a region of device (clamped to device size) to archive"""
+        fd = os.open(device, os.O_RDONLY)
+        try:
+            size = _device_size(fd)
+            return self._add(fd, device, size, offset, length)
+        finally:
+            os.close(fd)
+
+    def add_device(self, device, head, tail):
+        """Copies first head and last tail bytes of device to archive.
+
+        Returns a list of regions added (one if they overlap).
+        """
+        fd = os.open(device, os.O_RDONLY)
+        try:
+            size = _device_size(fd)
+            head = min(head, size)
+            tail_start = max(size - tail, head)
+            if tail_start == head:
+                return [self._add(fd, device, size, 0, size)]
+            if tail_start == size:
+                return [self._add(fd, device, size, 0, head)]
+            return [self._add(fd, device, size, 0, head),
+                    self._add(fd, device, size, tail_start, size - tail_start)]
+        finally:
+            os.close(fd)
+
+    def add_graph(self, graph, head, tail, types=('disk', 'part')):
+        """Copies head and tail regions of every disk and partition of a graph.
+
+        Only devices whose ``type`` property is in ``types`` are copied.
+        Other devices (md arrays, LVs, dm-crypt mappings, optical drives,
+        ...) and nodes without data are skipped, as their data lives on the
+        underlying disks, and reading them would archive decrypted data or
+        fail on empty drives. Devices are visited in topological order
+        (disks before partitions). The order doesn't matter for the copy, so
+        back edges of cyclic graphs (misconfigured dm/multipath setups) are
+        just disregarded. Returns a ``{device: exception}`` dict of devices
+        which couldn't be read.
+        """
+        errors = dict()
+        for device in topological_sort(graph, _ignore_backedge):
+            if _device_type(graph.node(device)) not in types:
+                continue
+            try:
+                self.add_device(device, head, tail)
+            except OSError as e:
+                errors[device] = e
+        return errors
+
+    def close(self):
+        """Writes the index and closes the archive"""
+        if self._fd is None:
+            return
+        index = json.dumps([r.to_dict() for r in self._regions],
+                           separators=(',', ':')).encode('utf8')
+        os.pwrite(self._fd, index, self._position)
+        trailer = self.trailer.pack(self._position, len(index), self.magic)
+        os.pwrite(self._fd, trailer, self._position + len(index))
+        os.close(self._fd)
+        self._fd = None
+
+    def _add(self, fd, device, size, offset, length):
+        offset = min(offset, size)
+        length = min(length, size - offset)
+        extents = []
+        for (start, count) in _data_extents(fd, offset, length):
+            count = _copy(fd, self._fd, start, self._position, count)
+            if count:
+                extents.append((start, count, self._position))
+                self._position += count
+        region = Region(device, offset, length, size, extents)
+        self._regions.append(region)
+        return region
+
+
+class RegionArchive(object):
+    """Reads an archive written by RegionWriter.
+
+       Regions are read at random, using the index stored in the archive.
+    """
+
+    __slots__ = ('_path', '_regions')
+
+    def __init__(self, path):
+        self._path = path
+        self._regions = self._read_index(path)
+
+    @property
+    def path(self):
+        """Path to the archive"""
+        return self._path
+
+    @property
+    def regions(self):
+        """A list of regions stored in the archive"""
+        return self._regions
+
+    def read(self, region):
+        """Returns contents of a region (holes filled with zeros)"""
+        data = bytearray(region.length)
+        fd = os.open(self._path, os.O_RDONLY)
+        try:
+            for (offset, length, archive_offset) in region.extents:
+                start = offset - region.offset
+                data[start:start+length] = os.pread(fd, length,
+                                                    archive_offset)
+        finally:
+            os.close(fd)
+        return bytes(data)
+
+    def extract(self, region, target):
+        """Writes region's data to the same offsets of target file (path).
+
+        Holes are left untouched, so a target is expected to be zeroed or
+        sparse where the source device had holes.
+        """
+        fd = os.open(self._path, os.O_RDONLY)
+        try:
+            out = os.open(target, os.O_WRONLY)
+            try:
+                for (offset, length, archive_offset) in region.extents:
+                    _copy(fd, out, archive_offset, offset, length)
+            finally:
+                os.close(out)
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def _read_index(cls, path):
+        trailer = RegionWriter.trailer
+        with open(path, 'rb') as f:
+            if f.read(len(RegionWriter.magic)) != RegionWriter.magic:
+                raise ValueError("%s: not a region archive" % path)
+            f.seek(-trailer.size, os.SEEK_END)
+            (offset, length, magic) = trailer.unpack(f.read(trailer.size))
+            if magic != RegionWriter.magic:
+                raise ValueError("%s: truncated region archive" % path)
+            f.seek(offset)
+            index = json.loads(f.read(length).decode('utf8'))
+        return [Region.from_dict(r) for r in index]
+
+# vim: set ft=python et ts=4 sw=4:
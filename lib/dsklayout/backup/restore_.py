@@ -0,0 +1,173 @@
+# -*- coding: utf8 -*-
+
+from . import exceptions_
+from ..graph import topological_sort
+
+import concurrent.futures
+import heapq
+
+__all__ = ('RestorePlan',)
+
+
+class RestorePlan(object):
+    """A schedule of restore steps for the devices of a graph.
+
+       Every node of the graph (a device) is restored by a single step, and
+       a step may start only after the steps of all its predecessors have
+       finished (partition tables before partitions, partitions before md
+       arrays, PVs before LVs, ...). Steps are ordered by the length of the
+       longest (critical) path from the step to the end of the restore, as
+       estimated with the cost(node) function. The ready step with the
+       longest such path is started first, whenever one of ``jobs`` workers
+       is free, both when the schedule is estimated and when the plan is
+       executed.
+    """
+
+    __slots__ = ('_graph', '_jobs', '_costs', '_order', '_indices', '_ranks',
+                 '_schedule')
+
+    def __init__(self, graph, cost, jobs=4):
+        self._graph = graph
+        self._jobs = max(1, jobs)
+        self._order = topological_sort(graph)
+        self._indices = {node: i for (i, node) in enumerate(self._order)}
+        self._costs = {node: cost(node) for node in self._order}
+        self._ranks = self._critical_lengths()
+        self._schedule = None
+
+    @property
+    def graph(self):
+        """The graph of devices to be restored"""
+        return self._graph
+
+    @property
+    def jobs(self):
+        """Number of steps executed at once"""
+        return self._jobs
+
+    @property
+    def order(self):
+        """Nodes in topological order"""
+        return list(self._order)
+
+    def cost(self, node):
+        """Estimated cost (duration) of restoring node"""
+        return self._costs[node]
+
+    def rank(self, node):
+        """Length of the longest path from node to the end of the restore"""
+        return self._ranks[node]
+
+    def critical_path(self):
+        """Returns the longest path (list of nodes) through the graph"""
+        if not self._order:
+            return []
+        node = max(self._graph.roots() or self._order, key=self._priority)
+        path = [node]
+        while self._graph.has_successors(node):
+            node = max(self._graph.successors(node), key=self._priority)
+            path.append(node)
+        return path
+
+    @property
+    def schedule(self):
+        """A list of ``(start, finish, worker, node)`` tuples ordered by start.
+
+        This is the estimated schedule, computed by simulating execution of
+        the plan on ``jobs`` workers with the costs taken as durations.
+        """
+        if self._schedule is None:
+            self._schedule = self._simulate()
+        return list(self._schedule)
+
+    @property
+    def makespan(self):
+        """Estimated duration of the whole restore"""
+        return max((s[1] for s in self.schedule), default=0)
+
+    def execute(self, action):
+        """Runs action(node) for every node, on a pool of ``jobs`` threads.
+
+        If action raises an exception, the descendants of the node are not
+        restored. Returns a ``{node: exception}`` dict of the nodes that
+        failed, with RestoreError for the nodes skipped.
+        """
+        pending = self._pending()
+        ready = self._ready(pending)
+        errors = dict()
+        running = dict()
+        with concurrent.futures.ThreadPoolExecutor(self._jobs) as executor:
+            while ready or running:
+                while ready and len(running) < self._jobs:
+                    node = heapq.heappop(ready)[-1]
+                    running[executor.submit(action, node)] = node
+                done = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done[0]:
+                    node = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors[node] = e
+                    else:
+                        self._release(node, pending, ready)
+        for node in self._order:
+            if pending.get(node):
+                msg = "%s: skipped, a device it depends on failed" % node
+                errors[node] = exceptions_.RestoreError(msg)
+        return errors
+
+    def _simulate(self):
+        pending = self._pending()
+        ready = self._ready(pending)
+        workers = list(range(self._jobs))
+        running = []
+        schedule = []
+        time = 0
+        while ready or running:
+            while ready and workers:
+                node = heapq.heappop(ready)[-1]
+                worker = heapq.heappop(workers)
+                finish = time + self._costs[node]
+                heapq.heappush(running, (finish, worker, node))
+                schedule.append((time, finish, worker, node))
+            (time, worker, node) = heapq.heappop(running)
+            heapq.heappush(workers, worker)
+            self._release(node, pending, ready)
+        return schedule
+
+    def _critical_lengths(self):
+        ranks = dict()
+        for node in reversed(self._order):
+            ranks[node] = self._costs[node] + max(
+                (ranks[s] for s in self._graph.view(node, 'successors')),
+                default=0)
+        return ranks
+
+    def _priority(self, node):
+        return (self._ranks[node], -self._indices[node])
+
+    def _pending(self):
+        # number of unfinished predecessors of every node
+        pending = {node: 0 for node in self._order}
+        for (_, right) in self._graph.edges:
+            pending[right] += 1
+        return pending
+
+    def _ready(self, pending):
+        ready = [self._entry(n) for n in self._order if not pending[n]]
+        heapq.heapify(ready)
+        return ready
+
+    def _entry(self, node):
+        # heap entry, the longest path first, then in topological order
+        return (-self._ranks[node], self._indices[node], node)
+
+    def _release(self, node, pending, ready):
+        for successor in self._graph.view(node, 'successors'):
+            pending[successor] -= 1
+            if not pending[successor]:
+                heapq.heappush(ready, self._entry(successor))
+        pending[node] = None
+
+# vim: set ft=python et ts=4 sw=4:
@@ -9,6 +9,7 @@ util.inject_symbols_from_modules(__package__, [
     '.cmdext_',
     '.dsklayout_',
     '.lsblkext_',
+    '.restorecmd_',
     ])
 
 # vim: set ft=python et ts=4 sw=4:
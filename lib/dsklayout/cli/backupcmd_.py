@@ -7,6 +7,19 @@ Implements the BackupCmd class
 from . import cmd_
 from . import lsblkext_
 from ..graph import *
+from ..model import sfdisk_
+from ..backup import regions_
+from ..backup import history_
+from ..backup import chunkstore_
+from ..backup import manifest_
+
+import concurrent.futures
+import subprocess
+import tempfile
+import socket
+import time
+import os
+import sys
 
 __all__ = ('BackupCmd',)
 
@@ -30,9 +43,173 @@ class BackupCmd(cmd_.Cmd):
     def add_cmd_arguments(self, parser):
         parser.add_argument("devices", metavar='DEV', nargs='*',
                             help="block device to be included in backup")
+        parser.add_argument("-o", "--output",
+                            dest='output',
+                            metavar='DIR',
+                            default='.',
+                            help="directory where the backup is written")
+        parser.add_argument("-j", "--jobs",
+                            dest='jobs',
+                            metavar='N',
+                            type=int,
+                            default=4,
+                            help="number of partition tables dumped at once")
+        parser.add_argument("--region-size",
+                            dest='region_size',
+                            metavar='BYTES',
+                            type=int,
+                            default=4 * 2**20,
+                            help="size of the head and tail regions of each "
+                                 "disk and partition copied to regions.bin "
+                                 "(0 disables)")
+        parser.add_argument("--store",
+                            dest='store',
+                            metavar='DIR',
+                            default=None,
+                            help="chunk store where the backup data is "
+                                 "deduplicated, the output directory gets "
+                                 "manifest.json only")
+        parser.add_argument("--incremental",
+                            dest='incremental',
+                            action='store_true',
+                            default=False,
+                            help="store the layout as a diff against the "
+                                 "last full snapshot (not used with --store)")
+        parser.add_argument("--compact",
+                            dest='compact',
+                            metavar='N',
+                            type=int,
+                            default=7,
+                            help="write a new full snapshot after N "
+                                 "incremental backups (0 disables)")
+        parser.add_argument("--sfdisk",
+                            dest='sfdisk',
+                            metavar='PROG',
+                            default='sfdisk',
+                            help="name or path to sfdisk program")
 
     def run(self):
-        return 0
+        """Writes the layout and partition tables of all the disks.
+
+        The graph of block devices is stored in ``layout.json`` (or, with
+        ``--incremental``, as a diff against it, see LayoutHistory) and each
+        partitioned disk (a root of the graph having partitions) gets its
+        ``sfdisk --dump`` output stored in ``<disk>.sfdisk``. The tables are
+        dumped concurrently, by ``--jobs`` threads. The first and last
+        ``--region-size`` bytes of every device (boot code, GPT, md
+        superblocks, LVM labels, ...) are copied to ``regions.bin``.
+
+        With ``--store``, all of these go to a Manifest (``manifest.json``)
+        referring to deduplicated chunks kept in the store.
+        """
+        args = self.arguments
+        graph = self.lsblk.graph()
+        os.makedirs(args.output, exist_ok=True)
+        if args.store is None:
+            manifest = None
+            self.write(graph)
+        else:
+            manifest = manifest_.Manifest(graph, host=socket.gethostname(),
+                                          created=int(time.time()))
+        failed = 0
+        if args.region_size > 0:
+            errors = self.write_regions(graph, manifest)
+            for (device, error) in sorted(errors.items()):
+                sys.stderr.write("%s: %s\n" % (device, error))
+                failed += 1
+        for (disk, table) in self.dump_partition_tables(graph):
+            if isinstance(table, Exception):
+                sys.stderr.write("%s: %s\n" % (disk, table))
+                failed += 1
+            else:
+                self.write_partition_table(table, manifest)
+        if manifest is not None:
+            manifest.save(os.path.join(args.output, 'manifest.json'))
+        return 1 if failed else 0
+
+    def write(self, graph):
+        """Writes the graph of block devices to the output directory"""
+        args = self.arguments
+        history = history_.LayoutHistory(args.output)
+        if args.incremental:
+            return history.write(graph, args.compact)
+        return history.write_full(graph)
+
+    def write_regions(self, graph, manifest=None):
+        """Writes head and tail regions of graph's disks and partitions to
+           regions.bin, or to manifest (and the chunk store) if one is given.
+
+        Returns a ``{device: exception}`` dict of devices that failed.
+        """
+        size = self.arguments.region_size
+        if manifest is None:
+            path = os.path.join(self.arguments.output, 'regions.bin')
+            with regions_.RegionWriter(path) as writer:
+                return writer.add_graph(graph, size, size)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'regions.bin')
+            with regions_.RegionWriter(path) as writer:
+                errors = writer.add_graph(graph, size, size)
+            manifest.add_regions(regions_.RegionArchive(path), self.store)
+        return errors
+
+    def write_partition_table(self, table, manifest=None):
+        """Writes SfDisk dump to the output directory, or to manifest"""
+        if manifest is not None:
+            name = self.partition_table_blob(table.device)
+            manifest.add_blob(name, table.dump.encode('utf8'), self.store)
+            return
+        name = '%s.sfdisk' % self._filename(table.device)
+        with open(os.path.join(self.arguments.output, name), 'w') as f:
+            f.write(table.dump)
+
+    @property
+    def store(self):
+        """ChunkStore given with --store option"""
+        return chunkstore_.ChunkStore(self.arguments.store)
+
+    @classmethod
+    def partition_table_blob(cls, disk):
+        """Name of a Manifest blob with disk's sfdisk dump"""
+        return 'sfdisk:%s' % disk
+
+    def dump_partition_tables(self, graph):
+        """Dumps partition tables of the partitioned disks found in graph.
+
+        Yields ``(disk, SfDisk)`` pairs in order of completion, or ``(disk,
+        exception)`` for disks whose table couldn't be dumped.
+        """
+        args = self.arguments
+        disks = self.partitioned_disks(graph)
+        jobs = max(1, min(args.jobs, len(disks) or 1))
+        with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+            futures = {executor.submit(sfdisk_.SfDisk.new, disk,
+                                       sfdisk=args.sfdisk): disk
+                       for disk in disks}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    table = future.result()
+                except (subprocess.SubprocessError, OSError) as e:
+                    table = e
+                yield (futures[future], table)
+
+    @classmethod
+    def partitioned_disks(cls, graph):
+        """Returns a sorted list of graph's roots having partitions"""
+        return sorted(n for n in graph.roots()
+                      if any(cls._is_partition(graph.node(s))
+                             for s in graph.successors(n)))
+
+    @classmethod
+    def _is_partition(cls, device):
+        return getattr(device, 'properties', {}).get('type') == 'part'
+
+    @classmethod
+    def _filename(cls, device):
+        # /dev/sda -> sda, /dev/mapper/foo -> mapper!foo (as in sysfs)
+        if device.startswith('/dev/'):
+            device = device[len('/dev/'):]
+        return device.strip('/').replace('/', '!')
 
 # Local Variables:
 # # tab-width:4
@@ -6,6 +6,7 @@ Provides the DskLayout class
 
 from . import app_
 from . import backupcmd_
+from . import restorecmd_
 
 __all__ = ('DskLayout',)
 
@@ -19,7 +20,7 @@ class DskLayout(app_.App):
 
     @property
     def subcommands(self):
-        return [backupcmd_.BackupCmd]
+        return [backupcmd_.BackupCmd, restorecmd_.RestoreCmd]
 
     def add_arguments(self, parser):
         pass
@@ -4,6 +4,7 @@
 
 from . import cmdext_
 from ..model import lsblk_
+from ..model import layoutcache_
 
 __all__ = ('LsBlkExt',)
 
@@ -22,13 +23,23 @@ class LsBlkExt(cmdext_.CmdExt):
                             metavar="PROG",
                             default='lsblk',
                             help="name or path to lsblk program")
+        parser.add_argument('--cache-dir',
+                            dest='cache_dir',
+                            metavar="DIR",
+                            default=None,
+                            help="directory where parsed layouts are cached")
 
     def new(self):
         args = self.arguments
         return lsblk_.LsBlk.new(args.devices, lsblk=args.lsblk)
 
     def graph(self):
-        return self.new().graph()
+        args = self.arguments
+        if args.cache_dir is None:
+            return self.new().graph()
+        cache = layoutcache_.LayoutCache(args.cache_dir)
+        return cache.graph(lambda: self.new().graph(), args.devices,
+                           args.lsblk)
 
 
 # Local Variables:
@@ -0,0 +1,234 @@
+# -*- coding: utf8 -*-
+"""`dsklayout.cli.restorecmd_`
+
+Implements the RestoreCmd class
+"""
+
+from . import cmd_
+from . import backupcmd_
+from ..graph import CyclicGraphError, Graph
+from ..model import sfdisk_
+from ..backup import exceptions_
+from ..backup import history_
+from ..backup import regions_
+from ..backup import restore_
+
+import errno
+import functools
+import os
+import sys
+
+__all__ = ('RestoreCmd',)
+
+
+class RestoreCmd(cmd_.Cmd):
+
+    __slots__ = ()
+
+    # types of devices restored, the others (md arrays, LVs, dm-crypt
+    # mappings, ...) are recreated on top of them and never written raw
+    types = ('disk', 'part')
+
+    # rough costs (in seconds) used to estimate the schedule
+    step_cost = 0.05
+    sfdisk_cost = 0.5
+    throughput = 100 * 2**20
+
+    @property
+    def name(self):
+        return 'restore'
+
+    @property
+    def properties(self):
+        return {'description': 'restore disk layout from backup'}
+
+    def add_cmd_arguments(self, parser):
+        parser.add_argument("backup", metavar='DIR',
+                            help="directory with a backup written by the "
+                                 "backup command (without --store)")
+        parser.add_argument("devices", metavar='DEVICE', nargs='*',
+                            help="disk or partition to be restored (with "
+                                 "its partitions), all of them by default")
+        parser.add_argument("-j", "--jobs",
+                            dest='jobs',
+                            metavar='N',
+                            type=int,
+                            default=4,
+                            help="number of devices restored at once")
+        parser.add_argument("-n", "--dry-run",
+                            dest='dry_run',
+                            action='store_true',
+                            default=False,
+                            help="print the schedule and its estimated "
+                                 "makespan, restore nothing")
+        parser.add_argument("-f", "--force",
+                            dest='force',
+                            action='store_true',
+                            default=False,
+                            help="restore all the disks and partitions, if "
+                                 "no DEVICE is given")
+        parser.add_argument("--sfdisk",
+                            dest='sfdisk',
+                            metavar='PROG',
+                            default='sfdisk',
+                            help="name or path to sfdisk program")
+
+    def run(self):
+        """Restores partition tables and regions of the backed up devices.
+
+        Only disks and partitions are restored: the selected DEVICEs and
+        their partitions, or all of them with ``--force``. Nothing is
+        written if no DEVICE nor ``--force`` is given, or if any of the
+        devices is mounted or in use. Devices are restored in an order
+        respecting the graph stored in the backup (see LayoutHistory), by
+        ``--jobs`` threads, the devices on the longest (critical) path first
+        (see RestorePlan). A partitioned disk gets its partition table
+        written back by sfdisk(8), then the head and tail regions of every
+        device are written back from ``regions.bin``. Devices depending on
+        a device that failed are skipped. With ``--dry-run`` the estimated
+        schedule is printed. A graph with cycles can't be ordered and is
+        reported as an error, as is a backup without ``layout.json``.
+        """
+        args = self.arguments
+        history = history_.LayoutHistory(args.backup)
+        if not history.has_full():
+            sys.stderr.write("%s: %s\n" % (args.backup, self.missing_layout()))
+            return 1
+        try:
+            graph = self.targets(history.graph(), args.devices)
+        except exceptions_.RestoreError as e:
+            sys.stderr.write("%s\n" % e)
+            return 1
+        archive = self.region_archive()
+        try:
+            plan = restore_.RestorePlan(graph,
+                                        functools.partial(self.cost, archive),
+                                        args.jobs)
+        except CyclicGraphError as e:
+            sys.stderr.write("%s: %s\n" % (args.backup, e))
+            return 1
+        if args.dry_run:
+            self.print_schedule(plan)
+            return 0
+        if not (args.devices or args.force):
+            sys.stderr.write("%s: refusing to overwrite all the disks and "
+                             "partitions, select DEVICEs or use --force\n" %
+                             args.backup)
+            return 1
+        busy = [d for d in plan.order if self.in_use(d)]
+        for device in busy:
+            sys.stderr.write("%s: device is mounted or in use\n" % device)
+        if busy:
+            return 1
+        errors = plan.execute(functools.partial(self.restore, archive))
+        for (device, error) in sorted(errors.items()):
+            sys.stderr.write("%s: %s\n" % (device, error))
+        return 1 if errors else 0
+
+    def missing_layout(self):
+        """Describes why the backup has no layout.json"""
+        backup = self.arguments.backup
+        if not os.path.isdir(backup):
+            return os.strerror(errno.ENOENT)
+        if os.path.exists(os.path.join(backup, 'manifest.json')):
+            return "backups written with --store can't be restored"
+        return "no %s in backup" % history_.LayoutHistory.full
+
+    @classmethod
+    def targets(cls, graph, devices=None):
+        """Returns the subgraph of graph's devices to be restored.
+
+        These are the disks and partitions among ``devices`` and their
+        partitions, or all the disks and partitions if no devices are given.
+        """
+        nodes = {n for n in graph.nodes if cls._type(graph.node(n))
+                 in cls.types}
+        if devices:
+            for device in devices:
+                if device not in nodes:
+                    msg = "%s: not a disk or partition in backup" % device
+                    raise exceptions_.RestoreError(msg)
+            selected = set(devices)
+            for device in devices:
+                selected.update(n for n in graph.successors(device)
+                                if n in nodes)
+            nodes = selected
+        edges = [e for e in graph.edges if e[0] in nodes and e[1] in nodes]
+        return Graph({n: graph.node(n) for n in nodes}, edges)
+
+    @classmethod
+    def in_use(cls, device):
+        """Returns True if a block device is mounted or held by another
+           device (md array, device-mapper, ...), i.e. can't be opened
+           exclusively"""
+        try:
+            fd = os.open(device, os.O_RDONLY | os.O_EXCL)
+        except OSError as e:
+            # other errors are left to be reported by the restore itself
+            return e.errno == errno.EBUSY
+        os.close(fd)
+        return False
+
+    def print_schedule(self, plan, file=None):
+        """Prints the estimated schedule of a RestorePlan"""
+        file = sys.stdout if file is None else file
+        file.write("%8s %8s %4s  %s\n" % ('START', 'FINISH', 'JOB', 'DEVICE'))
+        for (start, finish, worker, node) in plan.schedule:
+            file.write("%8.2f %8.2f %4d  %s\n" % (start, finish, worker, node))
+        file.write("estimated makespan: %.2fs with %d jobs\n" %
+                   (plan.makespan, plan.jobs))
+        file.write("critical path: %s\n" % ' -> '.join(plan.critical_path()))
+
+    def region_archive(self):
+        """Returns RegionArchive of the backup, or None if there is none"""
+        path = os.path.join(self.arguments.backup, 'regions.bin')
+        if not os.path.exists(path):
+            return None
+        return regions_.RegionArchive(path)
+
+    def partition_table(self, device):
+        """Returns SfDisk backed up for device, or None if there is none"""
+        name = '%s.sfdisk' % backupcmd_.BackupCmd._filename(device)
+        try:
+            with open(os.path.join(self.arguments.backup, name)) as f:
+                return sfdisk_.SfDisk(device, f.read())
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def regions(cls, archive, device):
+        """Returns a list of device's regions stored in archive"""
+        if archive is None:
+            return []
+        return [r for r in archive.regions if r.device == device]
+
+    def cost(self, archive, device):
+        """Estimates the time (in seconds) needed to restore device"""
+        cost = self.step_cost
+        if self.partition_table(device) is not None:
+            cost += self.sfdisk_cost
+        size = sum(e[1] for r in self.regions(archive, device)
+                   for e in r.extents)
+        return cost + size / self.throughput
+
+    def restore(self, archive, device):
+        """Restores device's partition table and regions"""
+        if self.in_use(device):
+            msg = "%s: device is mounted or in use" % device
+            raise exceptions_.RestoreError(msg)
+        table = self.partition_table(device)
+        if table is not None:
+            table.restore(sfdisk=self.arguments.sfdisk)
+        for region in self.regions(archive, device):
+            archive.extract(region, device)
+
+    @classmethod
+    def _type(cls, data):
+        # BlkDevs (and alike) have the type among properties
+        return (getattr(data, 'properties', data) or {}).get('type')
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -3,14 +3,22 @@
 from .. import util
 util.inject_symbols_from_modules(__package__, [
     '.bfs_',
+    '.components_',
     '.dfs_',
+    '.diff_',
     '.edges_',
     '.elems_',
     '.exceptions_',
+    '.frozen_',
     '.graph_',
+    '.index_',
     '.nodes_',
+    '.reach_',
+    '.scc_',
+    '.topo_',
     '.trail_',
     '.traversal_',
+    '.views_',
 ])
 
 # vim: set ft=python et ts=4 sw=4:
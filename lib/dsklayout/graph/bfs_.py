@@ -1,6 +1,5 @@
 # -*- coding: utf8 -*-
 
-from . import trail_
 from . import traversal_
 
 import collections
@@ -17,14 +16,55 @@ class Bfs(traversal_.Traversal):
         super().__init__(**kw)
 
     def __call__(self, graph, start_nodes, **kw):
-        trail = trail_.Trail(graph, **self.callbacks(**kw))
+        trail = self.make_trail(graph, **kw)
+        rows = self._csr_rows(trail)
+        if rows is not None:
+            self._bfs_csr(trail, start_nodes, rows)
+            return trail
+        if not trail.has_callbacks():
+            search = self._bfs_quiet
+        elif trail.tracks_edges():
+            search = self._bfs
+        else:
+            search = self._bfs_nodes
         for start_node in start_nodes:
             if trail.node_explored(start_node):
                 continue
-            if self._bfs(trail, start_node):
+            if search(trail, start_node):
                 break
         return trail
 
+    def iter_events(self, graph, start_nodes):
+        """Lazily yields (kind, node, edge) events of the search.
+
+        The kind is one of ENTER, LEAVE (same moments at which ingress_func
+        and egress_func are invoked by __call__), EDGE (a tree edge leading
+        to node was discovered) or BACKEDGE (a non-tree edge was found while
+        exploring node). Callbacks are not invoked and no trail is recorded,
+        so the consumer may stop the search at any time.
+        """
+        explored_nodes, explored_edges = set(), set()
+        queue = collections.deque()
+        for start_node in start_nodes:
+            if start_node in explored_nodes:
+                continue
+            explored_nodes.add(start_node)
+            queue.append((start_node, None))
+            while queue:
+                (node, edge) = queue.popleft()
+                yield (self.ENTER, node, edge)
+                yield (self.LEAVE, node, edge)
+                for next_edge in self.select_edges(graph, node):
+                    adjacent_node = graph.adjacent(node, next_edge)
+                    if adjacent_node not in explored_nodes:
+                        explored_nodes.add(adjacent_node)
+                        explored_edges.add(next_edge)
+                        queue.append((adjacent_node, next_edge))
+                        yield (self.EDGE, adjacent_node, next_edge)
+                    elif next_edge not in explored_edges:
+                        explored_edges.add(next_edge)
+                        yield (self.BACKEDGE, node, next_edge)
+
     def _bfs(self, trail, start_node):
         trail.enqueue((start_node, None))
         trail.explore_node(start_node)
@@ -36,6 +76,78 @@ class Bfs(traversal_.Traversal):
                 return True
         return False
 
+    def _bfs_nodes(self, trail, start_node):
+        # A variant of _bfs() used when edges need not to be tracked.
+        graph, queue = trail.graph, trail.queue
+        explored_nodes = trail.explored_nodes
+        adjacent, select_edges = graph.adjacent, self.select_edges
+        queue.append((start_node, None))
+        explored_nodes.add(start_node)
+        while queue:
+            (node, edge) = queue.popleft()
+            if self._handle_dequeued(trail, node, edge):
+                return True
+            for next_edge in select_edges(graph, node):
+                adjacent_node = adjacent(node, next_edge)
+                if adjacent_node not in explored_nodes:
+                    explored_nodes.add(adjacent_node)
+                    queue.append((adjacent_node, next_edge))
+        return False
+
+    def _bfs_quiet(self, trail, start_node):
+        # A variant of _bfs() used when there are no callbacks to invoke.
+        graph, queue = trail.graph, trail.queue
+        select_edges = self.select_edges
+        explored_nodes = trail.explored_nodes
+        explored_edges = trail.explored_edges
+        track = trail.tracks_edges()
+        visited = trail.nodes if trail.records('nodes') else None
+        tree_edges = trail.edges if trail.records('edges') else None
+        back_edges = trail.backedges if trail.records('backedges') else None
+        queue.append((start_node, None))
+        explored_nodes.add(start_node)
+        while queue:
+            (node, edge) = queue.popleft()
+            if visited is not None:
+                visited.append(node)
+            if tree_edges is not None and edge is not None:
+                tree_edges.append(edge)
+            for next_edge in select_edges(graph, node):
+                left, right = next_edge
+                adjacent_node = right if left == node else left
+                if adjacent_node not in explored_nodes:
+                    explored_nodes.add(adjacent_node)
+                    if track:
+                        explored_edges.add(next_edge)
+                    queue.append((adjacent_node, next_edge))
+                elif track and next_edge not in explored_edges:
+                    explored_edges.add(next_edge)
+                    if back_edges is not None:
+                        back_edges.append(next_edge)
+        return False
+
+    def _bfs_csr(self, trail, start_nodes, rows):
+        # A variant of _bfs_quiet() used when edges need not to be tracked,
+        # searching FrozenGraph's CSR rows by integer node identifiers.
+        ids, adjacent = trail.graph.ids, self._csr_adjacent
+        seen = bytearray(len(ids.keys))
+        visited = []
+        queue = collections.deque()
+        for start_node in start_nodes:
+            i = ids[start_node]
+            if seen[i]:
+                continue
+            seen[i] = 1
+            queue.append(i)
+            while queue:
+                i = queue.popleft()
+                visited.append(i)
+                for j in adjacent(rows, i):
+                    if not seen[j]:
+                        seen[j] = 1
+                        queue.append(j)
+        self._fill_csr_trail(trail, seen, visited)
+
     def _handle_dequeued(self, trail, node, edge):
         trail.append_node(node)
         if edge is not None:
@@ -0,0 +1,87 @@
+# -*- coding: utf8 -*-
+
+import concurrent.futures
+
+__all__ = ('components', 'map_components')
+
+
+def components(graph):
+    """Returns a list of weakly connected components of graph.
+
+    Each component is a set of nodes; edge directions are ignored. The
+    components are found with union-find over the edge set and are listed
+    in order of their first nodes in graph.
+    """
+    parent = _union_find(graph)
+    result = dict()
+    for node in parent:
+        result.setdefault(_find(parent, node), set()).add(node)
+    return list(result.values())
+
+
+def map_components(func, graph, executor=None):
+    """Returns a list of func(component) results, one per component.
+
+    Each component of graph (see components()) is passed to func as a
+    FrozenGraph, which pickles into a few compact arrays, and the calls are
+    submitted to executor (any concurrent.futures.Executor). If executor is
+    None, a ProcessPoolExecutor is created for the time of the call. The
+    results are listed in same order as components(graph).
+    """
+    subgraphs = [s.freeze() for s in _component_subgraphs(graph)]
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            return _map(func, subgraphs, executor)
+    return _map(func, subgraphs, executor)
+
+
+def _component_subgraphs(graph):
+    # nodes and edges are bucketed by their roots in a single pass, instead
+    # of building an induced subgraph (scanning all edges) per component
+    parent = _union_find(graph)
+    nodes = dict()
+    edges = dict()
+    for node in parent:
+        bucket = nodes.setdefault(_find(parent, node), dict())
+        if node in graph.nodes:
+            bucket[node] = graph.nodes[node]
+    for (edge, data) in graph.edges.items():
+        edges.setdefault(_find(parent, edge[0]), dict())[edge] = data
+    return [type(graph)(bucket, edges.get(root, ()), consistency=False)
+            for (root, bucket) in nodes.items()]
+
+
+def _union_find(graph):
+    parent = dict()
+    size = dict()
+    for node in graph.nodes:
+        parent[node] = node
+        size[node] = 1
+    for (left, right) in graph.edges:
+        for node in (left, right):
+            if node not in parent:  # graph created with consistency=False
+                parent[node] = node
+                size[node] = 1
+        left, right = _find(parent, left), _find(parent, right)
+        if left == right:
+            continue
+        if size[left] < size[right]:
+            left, right = right, left
+        parent[right] = left
+        size[left] += size[right]
+    return parent
+
+
+def _map(func, subgraphs, executor):
+    futures = [executor.submit(func, subgraph) for subgraph in subgraphs]
+    return [future.result() for future in futures]
+
+
+def _find(parent, node):
+    # path halving
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
+
+# vim: set ft=python et ts=4 sw=4:
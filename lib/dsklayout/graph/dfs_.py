@@ -1,6 +1,5 @@
 # -*- coding: utf8 -*-
 
-from . import trail_
 from . import traversal_
 
 import collections
@@ -17,38 +16,185 @@ class Dfs(traversal_.Traversal):
         super().__init__(**kw)
 
     def __call__(self, graph, start_nodes, **kw):
-        trail = trail_.Trail(graph, **self.callbacks(**kw))
+        trail = self.make_trail(graph, **kw)
+        rows = self._csr_rows(trail)
+        if rows is not None:
+            self._dfs_csr(trail, start_nodes, rows)
+            return trail
+        if not trail.has_callbacks():
+            search = self._dfs_quiet
+        elif trail.tracks_edges():
+            search = self._dfs
+        else:
+            search = self._dfs_nodes
         for start_node in start_nodes:
             if trail.node_explored(start_node):
                 continue
-            if self._dfs(trail, start_node, None):
+            if search(trail, start_node, None):
                 break
         return trail
 
+    def iter_events(self, graph, start_nodes):
+        """Lazily yields (kind, node, edge) events of the search.
+
+        The kind is one of ENTER, LEAVE (same moments at which ingress_func
+        and egress_func are invoked by __call__), EDGE (a tree edge leading
+        to node is about to be followed) or BACKEDGE (a non-tree edge was
+        found while exploring node). Callbacks are not invoked and no trail
+        is recorded, so the consumer may stop the search at any time.
+        """
+        explored_nodes, explored_edges = set(), set()
+        for start_node in start_nodes:
+            if start_node in explored_nodes:
+                continue
+            explored_nodes.add(start_node)
+            yield (self.ENTER, start_node, None)
+            edges = iter(self.select_edges(graph, start_node))
+            stack = [(start_node, None, edges)]
+            while stack:
+                node, edge, edges = stack[-1]
+                for next_edge in edges:
+                    if next_edge in explored_edges:
+                        continue
+                    explored_edges.add(next_edge)
+                    adjacent_node = graph.adjacent(node, next_edge)
+                    if adjacent_node not in explored_nodes:
+                        explored_nodes.add(adjacent_node)
+                        yield (self.EDGE, adjacent_node, next_edge)
+                        yield (self.ENTER, adjacent_node, next_edge)
+                        edges = iter(self.select_edges(graph, adjacent_node))
+                        stack.append((adjacent_node, next_edge, edges))
+                        break
+                    yield (self.BACKEDGE, node, next_edge)
+                else:
+                    stack.pop()
+                    yield (self.LEAVE, node, edge)
+
     def _dfs(self, trail, node, edge):
-        trail.explore_and_append_node(node)
-        stop = self._invoke_callback(trail.ingress_func, trail, node, edge)
-        if not stop:
-            stop = self._select_edges_and_iterate(trail, node)
-        stop |= self._invoke_callback(trail.egress_func, trail, node, edge)
+        # An explicit stack of (node, edge, iterator over node's edges) frames
+        # replaces recursion, so deep graphs do not hit the recursion limit.
+        adjacent = trail.graph.adjacent
+        edge_explored, node_explored = trail.edge_explored, trail.node_explored
+        invoke, enter = self._invoke_callback, self._enter
+        stack = []
+        stop = enter(trail, stack, node, edge)
+        while stack and not stop:
+            node, edge, edges = stack[-1]
+            for next_edge in edges:
+                if edge_explored(next_edge):
+                    continue
+                adjacent_node = adjacent(node, next_edge)
+                if not node_explored(adjacent_node):
+                    trail.explore_and_append_edge(next_edge)
+                    stop = enter(trail, stack, adjacent_node, next_edge)
+                    break
+                trail.explore_and_append_backedge(next_edge)
+                if invoke(trail.backedge_func, trail, next_edge):
+                    stop = True
+                    break
+            else:
+                stack.pop()
+                stop = invoke(trail.egress_func, trail, node, edge)
+        # search stopped, leave all the nodes remaining on stack
+        while stack:
+            node, edge, _ = stack.pop()
+            invoke(trail.egress_func, trail, node, edge)
         return stop
 
-    def _select_edges_and_iterate(self, trail, node):
-        for edge in self.select_edges(trail.graph, node):
-            if trail.edge_explored(edge):
-                continue
-            adjacent_node = trail.graph.adjacent(node, edge)
-            if self._handle_adjacent_node(trail, adjacent_node, edge):
-                return True
+    def _dfs_nodes(self, trail, node, edge):
+        # A variant of _dfs() used when edges need not to be tracked.
+        adjacent = trail.graph.adjacent
+        explored_nodes = trail.explored_nodes
+        invoke, enter = self._invoke_callback, self._enter
+        stack = []
+        stop = enter(trail, stack, node, edge)
+        while stack and not stop:
+            node, edge, edges = stack[-1]
+            for next_edge in edges:
+                adjacent_node = adjacent(node, next_edge)
+                if adjacent_node not in explored_nodes:
+                    stop = enter(trail, stack, adjacent_node, next_edge)
+                    break
+            else:
+                stack.pop()
+                stop = invoke(trail.egress_func, trail, node, edge)
+        while stack:
+            node, edge, _ = stack.pop()
+            invoke(trail.egress_func, trail, node, edge)
+        return stop
+
+    def _dfs_quiet(self, trail, node, edge):
+        # A variant of _dfs() used when there are no callbacks to invoke.
+        graph, select_edges = trail.graph, self.select_edges
+        explored_nodes = trail.explored_nodes
+        explored_edges = trail.explored_edges
+        track = trail.tracks_edges()
+        visited = trail.nodes if trail.records('nodes') else None
+        tree_edges = trail.edges if trail.records('edges') else None
+        back_edges = trail.backedges if trail.records('backedges') else None
+        explored_nodes.add(node)
+        if visited is not None:
+            visited.append(node)
+        stack = [(node, iter(select_edges(graph, node)))]
+        while stack:
+            node, edges = stack[-1]
+            for next_edge in edges:
+                if track and next_edge in explored_edges:
+                    continue
+                left, right = next_edge
+                adjacent_node = right if left == node else left
+                if adjacent_node not in explored_nodes:
+                    explored_nodes.add(adjacent_node)
+                    if visited is not None:
+                        visited.append(adjacent_node)
+                    if track:
+                        explored_edges.add(next_edge)
+                        if tree_edges is not None:
+                            tree_edges.append(next_edge)
+                    edges = iter(select_edges(graph, adjacent_node))
+                    stack.append((adjacent_node, edges))
+                    break
+                if track:
+                    explored_edges.add(next_edge)
+                    if back_edges is not None:
+                        back_edges.append(next_edge)
+            else:
+                stack.pop()
         return False
 
-    def _handle_adjacent_node(self, trail, adjacent_node, edge):
-        if not trail.node_explored(adjacent_node):
-            trail.explore_and_append_edge(edge)
-            return self._dfs(trail, adjacent_node, edge)
+    def _dfs_csr(self, trail, start_nodes, rows):
+        # A variant of _dfs_quiet() used when edges need not to be tracked,
+        # searching FrozenGraph's CSR rows by integer node identifiers.
+        ids, adjacent = trail.graph.ids, self._csr_adjacent
+        seen = bytearray(len(ids.keys))
+        visited = []
+        for start_node in start_nodes:
+            i = ids[start_node]
+            if seen[i]:
+                continue
+            seen[i] = 1
+            visited.append(i)
+            stack = [iter(adjacent(rows, i))]
+            while stack:
+                for j in stack[-1]:
+                    if not seen[j]:
+                        seen[j] = 1
+                        visited.append(j)
+                        stack.append(iter(adjacent(rows, j)))
+                        break
+                else:
+                    stack.pop()
+        self._fill_csr_trail(trail, seen, visited)
+
+    def _enter(self, trail, stack, node, edge):
+        trail.explore_and_append_node(node)
+        stop = self._invoke_callback(trail.ingress_func, trail, node, edge)
+        if stop:
+            edges = iter(())
         else:
-            trail.explore_and_append_backedge(edge)
-            return self._invoke_callback(trail.backedge_func, trail, edge)
+            edges = iter(self.select_edges(trail.graph, node))
+        stack.append((node, edge, edges))
+        return stop
 
     @classmethod
     def _invoke_callback(cls, func, trail, elem, *args):
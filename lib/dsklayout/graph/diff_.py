@@ -0,0 +1,157 @@
+# -*- coding: utf8 -*-
+
+__all__ = ('GraphDiff',)
+
+
+def _properties(data):
+    # BlkDevs (and alike) are compared by properties, dicts as they are
+    return getattr(data, 'properties', data)
+
+
+def _dict(data):
+    return {} if data is None else data
+
+
+class GraphDiff(object):
+    """Differences between two graphs.
+
+       A diff lists nodes and edges added to and deleted from the old graph,
+       and property changes of the nodes present in both graphs. Node data
+       are compared as dicts of properties (``data.properties`` for BlkDevs,
+       the data itself otherwise). For a changed node only the properties
+       set (added or modified) and the names of the properties unset are
+       recorded, so a diff between two similar graphs stays small.
+    """
+
+    __slots__ = ('_added_nodes', '_deleted_nodes', '_changed_nodes',
+                 '_added_edges', '_deleted_edges')
+
+    def __init__(self, added_nodes=None, deleted_nodes=(), changed_nodes=None,
+                 added_edges=(), deleted_edges=()):
+        self._added_nodes = dict(added_nodes or {})
+        self._deleted_nodes = sorted(deleted_nodes)
+        self._changed_nodes = {n: (dict(s), sorted(u)) for (n, (s, u))
+                               in (changed_nodes or {}).items()}
+        self._added_edges = sorted(tuple(e) for e in added_edges)
+        self._deleted_edges = sorted(tuple(e) for e in deleted_edges)
+
+    @property
+    def added_nodes(self):
+        """A {node: properties} dict of nodes missing in the old graph"""
+        return self._added_nodes
+
+    @property
+    def deleted_nodes(self):
+        """A sorted list of nodes missing in the new graph"""
+        return self._deleted_nodes
+
+    @property
+    def changed_nodes(self):
+        """A {node: (set, unset)} dict of nodes with changed properties.
+
+        The ``set`` is a dict of properties added or modified and ``unset``
+        is a sorted list of names of the properties removed.
+        """
+        return self._changed_nodes
+
+    @property
+    def added_edges(self):
+        """A sorted list of edges missing in the old graph"""
+        return self._added_edges
+
+    @property
+    def deleted_edges(self):
+        """A sorted list of edges missing in the new graph"""
+        return self._deleted_edges
+
+    def __bool__(self):
+        return bool(self._added_nodes or self._deleted_nodes or
+                    self._changed_nodes or self._added_edges or
+                    self._deleted_edges)
+
+    def __repr__(self):
+        return "%s(+%d -%d ~%d nodes, +%d -%d edges)" % (
+            self.__class__.__name__, len(self._added_nodes),
+            len(self._deleted_nodes), len(self._changed_nodes),
+            len(self._added_edges), len(self._deleted_edges))
+
+    @classmethod
+    def between(cls, old, new, properties=None):
+        """Computes the diff turning graph old into graph new.
+
+        The properties(data) function returns a dict of properties for node
+        data (None is treated as an empty dict). By default, it returns
+        ``data.properties`` or the data itself.
+        """
+        if properties is None:
+            properties = _properties
+        added = {n: properties(d) for (n, d) in new.nodes.items()
+                 if n not in old.nodes}
+        deleted = [n for n in old.nodes if n not in new.nodes]
+        changed = dict()
+        for (node, data) in new.nodes.items():
+            if node in old.nodes:
+                change = cls._changes(_dict(properties(old.nodes[node])),
+                                      _dict(properties(data)))
+                if change is not None:
+                    changed[node] = change
+        added_edges = [e for e in new.edges if e not in old.edges]
+        deleted_edges = [e for e in old.edges if e not in new.edges]
+        return cls(added, deleted, changed, added_edges, deleted_edges)
+
+    def apply(self, graph, properties=None, node=None):
+        """Applies the diff to graph (in place), using graph's methods.
+
+        The node(properties) function creates node data from a dict of
+        properties, by default the dict itself is used. The properties
+        function is same as in between().
+        """
+        if properties is None:
+            properties = _properties
+        if node is None:
+            node = _dict
+        for edge in self._deleted_edges:
+            graph.discard_edge(edge)
+        for name in self._deleted_nodes:
+            graph.discard_node(name)
+        for (name, (set_, unset)) in self._changed_nodes.items():
+            props = dict(_dict(properties(graph.node(name))))
+            props.update(set_)
+            for key in unset:
+                props.pop(key, None)
+            graph.add_node(name, node(props))
+        for (name, props) in self._added_nodes.items():
+            graph.add_node(name, None if props is None else node(props))
+        for edge in self._added_edges:
+            graph.add_edge(edge)
+        return graph
+
+    def to_dict(self):
+        """Returns a JSON-serializable representation of the diff"""
+        changed = {n: {'set': s, 'unset': u}
+                   for (n, (s, u)) in self._changed_nodes.items()}
+        return {'nodes': {'added': self._added_nodes,
+                          'deleted': self._deleted_nodes,
+                          'changed': changed},
+                'edges': {'added': [list(e) for e in self._added_edges],
+                          'deleted': [list(e) for e in self._deleted_edges]}}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates diff from a dict returned by to_dict()"""
+        nodes, edges = data['nodes'], data['edges']
+        changed = {n: (c['set'], c['unset'])
+                   for (n, c) in nodes['changed'].items()}
+        return cls(nodes['added'], nodes['deleted'], changed,
+                   edges['added'], edges['deleted'])
+
+    @classmethod
+    def _changes(cls, old, new):
+        set_ = {k: v for (k, v) in new.items()
+                if k not in old or old[k] != v}
+        unset = [k for k in old if k not in new]
+        if set_ or unset:
+            return (set_, unset)
+        return None
+
+# vim: set ft=python et ts=4 sw=4:
@@ -1,6 +1,7 @@
 # -*- coding: utf8 -*-
 
 from . import elems_
+from . import views_
 
 import collections.abc
 
@@ -74,6 +75,32 @@ class Edges(elems_.Elems):
         """Returns a set of edges incident (outward/inward) to a given node"""
         return self.outward(node) | self.inward(node)
 
+    def successors_view(self, node):
+        """Returns a live read-only view of successors of a given node"""
+        return views_.NodesView(node, self._successors_dict)
+
+    def predecessors_view(self, node):
+        """Returns a live read-only view of predecessors of a given node"""
+        return views_.NodesView(node, self._predecessors_dict)
+
+    def neighbors_view(self, node):
+        """Returns a live read-only view of nodes connected to a given node"""
+        return views_.NodesView(node, self._predecessors_dict,
+                                self._successors_dict)
+
+    def outward_view(self, node):
+        """Returns a live read-only view of outward edges for given node"""
+        return views_.EdgesView(node, successors=self._successors_dict)
+
+    def inward_view(self, node):
+        """Returns a live read-only view of inward edges for given node"""
+        return views_.EdgesView(node, predecessors=self._predecessors_dict)
+
+    def incident_view(self, node):
+        """Returns a live read-only view of edges incident to a given node"""
+        return views_.EdgesView(node, self._successors_dict,
+                                self._predecessors_dict)
+
     @classmethod
     def adjacent(self, node, edge):
         """Returns a node on the opposite end of edge"""
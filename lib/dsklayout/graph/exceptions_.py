@@ -1,5 +1,13 @@
 # -*- coding: utf8 -*-
 
-__all__ = ()
+__all__ = ('CyclicGraphError',)
+
+
+class CyclicGraphError(Exception):
+    """Raised when an acyclic graph is required, but a cycle was found"""
+
+    def __init__(self, message, backedges=()):
+        super().__init__(message)
+        self.backedges = list(backedges)
 
 # vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,397 @@
+# -*- coding: utf8 -*-
+
+from . import edges_
+from . import views_
+
+import collections.abc
+import itertools
+import array
+
+__all__ = ('FrozenGraph',)
+
+
+def _slice(offsets, indices, node_id):
+    # CSR row of node_id
+    return indices[offsets[node_id]:offsets[node_id+1]]
+
+
+class _FrozenNodes(collections.abc.Mapping):
+    """A read-only {node: data} mapping over FrozenGraph's interned nodes"""
+
+    __slots__ = ('_graph',)
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, node):
+        return self._graph.node(node)
+
+    def __contains__(self, node):
+        return self._graph.has_node(node)
+
+    def __iter__(self):
+        return iter(self._graph._keys)
+
+    def __len__(self):
+        return len(self._graph._keys)
+
+
+class _FrozenEdges(collections.abc.Mapping):
+    """A read-only {edge: data} mapping over FrozenGraph's CSR buffers"""
+
+    __slots__ = ('_graph',)
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, edge):
+        return self._graph.edge(edge)
+
+    def __contains__(self, edge):
+        return self._graph.has_edge(edge)
+
+    def __iter__(self):
+        keys = self._graph._keys
+        offsets = self._graph._succ_offsets
+        indices = self._graph._succ_indices
+        for i, left in enumerate(keys):
+            for j in indices[offsets[i]:offsets[i+1]]:
+                yield (left, keys[j])
+
+    def __len__(self):
+        return len(self._graph._succ_indices)
+
+
+class _FrozenNodesView(views_._View):
+    """A read-only view of nodes related to a node of FrozenGraph"""
+
+    __slots__ = ('_graph', '_slices')
+
+    def __init__(self, graph, *slices):
+        self._graph = graph
+        self._slices = slices
+
+    def __contains__(self, node):
+        node_id = self._graph._ids.get(node)
+        return node_id is not None and any(node_id in s for s in self._slices)
+
+    def __iter__(self):
+        keys, ids = self._graph._keys, self._slices[0]
+        if len(self._slices) > 1:
+            ids = dict.fromkeys(itertools.chain(*self._slices))
+        return iter([keys[j] for j in ids])
+
+    def __len__(self):
+        if len(self._slices) == 1:
+            return len(self._slices[0])
+        return sum(1 for _ in self)
+
+
+class _FrozenEdgesView(views_._View):
+    """A read-only view of edges outward/inward to a node of FrozenGraph"""
+
+    __slots__ = ('_graph', '_node', '_successors', '_predecessors')
+
+    def __init__(self, graph, node, successors=None, predecessors=None):
+        self._graph = graph
+        self._node = node
+        self._successors = successors
+        self._predecessors = predecessors
+
+    def __contains__(self, edge):
+        try:
+            left, right = edge
+        except (TypeError, ValueError):
+            return False
+        ids = self._graph._ids
+        if self._successors is not None and left == self._node:
+            if ids.get(right) in self._successors:
+                return True
+        if self._predecessors is not None and right == self._node:
+            if ids.get(left) in self._predecessors:
+                return True
+        return False
+
+    def __iter__(self):
+        # edges are built by comprehensions, much faster than yielding them
+        keys, node = self._graph._keys, self._node
+        edges = []
+        if self._successors is not None:
+            edges += [(node, keys[j]) for j in self._successors]
+        if self._predecessors is not None:
+            inward = [(keys[j], node) for j in self._predecessors]
+            if self._successors is not None:
+                # self-loop, already included as outward edge
+                inward = [e for e in inward if e[0] != node]
+            edges += inward
+        return iter(edges)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class _FrozenIds(object):
+    """Integer identifiers of FrozenGraph's nodes (``ids[node]``) and the
+       adjacency of identified nodes, read straight from the CSR buffers"""
+
+    __slots__ = ('_graph',)
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, node):
+        return self._graph._ids[node]
+
+    @property
+    def keys(self):
+        """All nodes, indexed by their identifiers (a tuple)"""
+        return self._graph._keys
+
+    def key(self, node_id):
+        """Returns a node identified by integer node_id"""
+        return self._graph._keys[node_id]
+
+    def rows(self, kind):
+        """Returns CSR (offsets, indices) buffers of 'successors' or
+           'predecessors' of all the nodes"""
+        graph = self._graph
+        if kind == 'successors':
+            return (graph._succ_offsets, graph._succ_indices)
+        elif kind == 'predecessors':
+            return (graph._pred_offsets, graph._pred_indices)
+        raise ValueError("invalid kind of rows: %r" % (kind,))
+
+    def successors(self, node_id):
+        """Returns identifiers of successors of a node given by node_id"""
+        return _slice(*self.rows('successors'), node_id)
+
+    def predecessors(self, node_id):
+        """Returns identifiers of predecessors of a node given by node_id"""
+        return _slice(*self.rows('predecessors'), node_id)
+
+
+class _FrozenCache(object):
+    """Values computed from FrozenGraph, on first use only"""
+
+    __slots__ = ('_graph', '_values')
+
+    # a frozen graph never gets modified
+    version = 0
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._values = {}
+
+    def get(self, key, func):
+        """Returns func(graph), computing it on first use only"""
+        try:
+            return self._values[key]
+        except KeyError:
+            value = self._values[key] = func(self._graph)
+            return value
+
+
+class FrozenGraph(object):
+    """An immutable snapshot of a Graph.
+
+       Nodes are interned into dense integer identifiers and the adjacency is
+       stored in compressed-sparse-row form, i.e. as ``array('l')`` offset and
+       index buffers for successors and predecessors. The read API is same as
+       in Graph, so search algorithms may be run against a snapshot unchanged.
+       A mutable copy is obtained with ``Graph(frozen.nodes, frozen.edges)``.
+
+       A snapshot pays off when pickled (e.g. sent to worker processes) and
+       in Bfs/Dfs searches that record nodes only, which run over the CSR
+       buffers by node identifiers. Searches tracking edges and queries
+       returning sets of nodes or edges are about as fast as on Graph, or
+       slower, as the tuples of edges have to be built on the fly.
+    """
+
+    __slots__ = ('_keys', '_ids', '_nodedata', '_edgedata',
+                 '_succ_offsets', '_succ_indices',
+                 '_pred_offsets', '_pred_indices', '_cache')
+
+    # kinds of views -> (edges?, successors?, predecessors?)
+    _views = {'successors': (False, True, False),
+              'predecessors': (False, False, True),
+              'neighbors': (False, True, True),
+              'outward': (True, True, False),
+              'inward': (True, False, True),
+              'incident': (True, True, True)}
+
+    def __init__(self, graph):
+        keys = list(graph.nodes)
+        ids = {k: i for i, k in enumerate(keys)}
+        for edge in graph.edges:
+            for node in edge:
+                if node not in ids:  # graph created with consistency=False
+                    ids[node] = len(keys)
+                    keys.append(node)
+        self._keys = tuple(keys)
+        self._ids = ids
+        self._nodedata = tuple(graph.nodes.get(k) for k in keys)
+        self._edgedata = {e: d for (e, d) in graph.edges.items()
+                          if d is not None}
+        self._succ_offsets, self._succ_indices = \
+            self._csr(keys, ids, graph.edges.successors_dict)
+        self._pred_offsets, self._pred_indices = \
+            self._csr(keys, ids, graph.edges.predecessors_dict)
+        self._cache = _FrozenCache(self)
+
+    @property
+    def nodes(self):
+        """All nodes in the graph (a read-only mapping)"""
+        return _FrozenNodes(self)
+
+    @property
+    def edges(self):
+        """All edges in the graph (a read-only mapping)"""
+        return _FrozenEdges(self)
+
+    @property
+    def ids(self):
+        """Integer identifiers of nodes, see _FrozenIds"""
+        return _FrozenIds(self)
+
+    @property
+    def cache(self):
+        """Values computed from the graph, on first use only"""
+        return self._cache
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return "%s(%s, %s)" % (name, repr(dict(self.nodes)),
+                               repr(dict(self.edges)))
+
+    def __getstate__(self):
+        # node identifiers are implied by _keys and needn't be serialized
+        return (self._keys, self._nodedata, self._edgedata,
+                self._succ_offsets, self._succ_indices,
+                self._pred_offsets, self._pred_indices)
+
+    def __setstate__(self, state):
+        (self._keys, self._nodedata, self._edgedata,
+         self._succ_offsets, self._succ_indices,
+         self._pred_offsets, self._pred_indices) = state
+        self._ids = {k: i for i, k in enumerate(self._keys)}
+        self._cache = _FrozenCache(self)
+
+    def has_node(self, node):
+        """Returns True if the graph has given node"""
+        return node in self._ids
+
+    def node(self, node):
+        """Returns data assigned to node. Same as ``self.nodes[node]``"""
+        return self._nodedata[self._ids[node]]
+
+    def has_edge(self, edge):
+        """Returns True if the graph has given edge"""
+        try:
+            left, right = tuple(edge)
+            i, j = self._ids[left], self._ids[right]
+        except (ValueError, KeyError):
+            return False
+        return j in _slice(self._succ_offsets, self._succ_indices, i)
+
+    def edge(self, edge):
+        """Returns data assigned to edge. Same as ``self.edges[edge]``"""
+        if not self.has_edge(edge):
+            raise KeyError(edge)
+        return self._edgedata.get(tuple(edge))
+
+    def has_successors(self, node):
+        """Returns True if node has successors."""
+        i = self._ids[node]
+        return self._succ_offsets[i] != self._succ_offsets[i+1]
+
+    def has_predecessors(self, node):
+        """Returns True if node has predecessors."""
+        i = self._ids[node]
+        return self._pred_offsets[i] != self._pred_offsets[i+1]
+
+    def has_neighbors(self, node):
+        """Returns True if node has neighbors."""
+        return self.has_successors(node) or self.has_predecessors(node)
+
+    def successors(self, node):
+        """Returns successors of the given node."""
+        keys = self._keys
+        return {keys[j] for j in self._successors(node)}
+
+    def predecessors(self, node):
+        """Returns predecessors of the given node."""
+        keys = self._keys
+        return {keys[j] for j in self._predecessors(node)}
+
+    def neighbors(self, node):
+        """Returns a set of nodes that are connected to a given node"""
+        return self.predecessors(node) | self.successors(node)
+
+    def outward(self, node):
+        """Returns edges outward to given node"""
+        keys = self._keys
+        return {(node, keys[j]) for j in self._successors(node)}
+
+    def inward(self, node):
+        """Returns edges inward to given node"""
+        keys = self._keys
+        return {(keys[j], node) for j in self._predecessors(node)}
+
+    def incident(self, node):
+        """Returns edges incident to given node"""
+        return self.outward(node) | self.inward(node)
+
+    def view(self, node, kind):
+        """Returns a read-only view of elements related to given node.
+
+        The ``kind`` is one of 'successors', 'predecessors', 'neighbors',
+        'outward', 'inward' or 'incident' (see Graph.view()).
+        """
+        try:
+            (edges, successors, predecessors) = self._views[kind]
+        except KeyError:
+            raise ValueError("invalid kind of view: %r" % (kind,))
+        succ = self._successors(node) if successors else None
+        pred = self._predecessors(node) if predecessors else None
+        if edges:
+            return _FrozenEdgesView(self, node, succ, pred)
+        return _FrozenNodesView(self, *(s for s in (pred, succ)
+                                        if s is not None))
+
+    # returns a node on the opposite end of edge
+    adjacent = staticmethod(edges_.Edges.adjacent)
+
+    def roots(self):
+        """Returns a set of root nodes (having no predecessors)"""
+        return self._select_nodes_without(self._pred_offsets)
+
+    def leafs(self):
+        """Returns a set of leaf nodes (having no successors)"""
+        return self._select_nodes_without(self._succ_offsets)
+
+    def isolated(self):
+        """Returns a set of isolated nodes (having no neighbors)"""
+        succ, pred = self._succ_offsets, self._pred_offsets
+        return {k for i, k in enumerate(self._keys)
+                if succ[i] == succ[i+1] and pred[i] == pred[i+1]}
+
+    def _successors(self, node):
+        return _slice(self._succ_offsets, self._succ_indices, self._ids[node])
+
+    def _predecessors(self, node):
+        return _slice(self._pred_offsets, self._pred_indices, self._ids[node])
+
+    def _select_nodes_without(self, offsets):
+        return {k for i, k in enumerate(self._keys)
+                if offsets[i] == offsets[i+1]}
+
+    @classmethod
+    def _csr(cls, keys, ids, registry):
+        offsets = array.array('l', [0])
+        indices = array.array('l')
+        for key in keys:
+            indices.extend(ids[n] for n in registry.get(key, ()))
+            offsets.append(len(indices))
+        return offsets, indices
+
+# vim: set ft=python et ts=4 sw=4:
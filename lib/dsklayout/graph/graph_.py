@@ -3,24 +3,161 @@
 from . import edges_
 from . import nodes_
 from . import elems_
+from . import frozen_
 
 __all__ = ('Graph',)
 
 MISSING = elems_.MISSING
 
+# kinds of views returned by view() -> methods of Edges returning them
+_VIEWS = {'successors': 'successors_view',
+          'predecessors': 'predecessors_view',
+          'neighbors': 'neighbors_view',
+          'outward': 'outward_view',
+          'inward': 'inward_view',
+          'incident': 'incident_view'}
+
+
+class _Cache(object):
+    """Values derived from a graph, reused until the graph gets modified.
+
+       The node sets (roots, leafs, isolated) are kept up to date
+       incrementally as nodes get touched by graph modifications, other
+       values are recomputed on first use after a modification.
+    """
+
+    __slots__ = ('_graph', '_version', '_sets', '_values')
+
+    # derived node sets and the conditions their members must not satisfy
+    _conditions = (('roots', 'has_predecessors'),
+                   ('leafs', 'has_successors'),
+                   ('isolated', 'has_neighbors'))
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._version = 0
+        self._sets = None
+        self._values = {}
+
+    @property
+    def version(self):
+        """A counter incremented by every modification made via graph methods.
+
+        Modifications applied directly to ``graph.nodes`` or ``graph.edges``
+        are not tracked and leave cached results (such as roots()) outdated.
+        """
+        return self._version
+
+    def get(self, key, func):
+        """Returns func(graph), reusing the value computed for current version.
+
+        The value is recomputed once the graph gets modified (see version).
+        """
+        try:
+            version, value = self._values[key]
+        except KeyError:
+            version = None
+        if version != self._version:
+            value = func(self._graph)
+            self._values[key] = (self._version, value)
+        return value
+
+    def nodes(self, name):
+        """Returns a cached node set, computing all of them on first use"""
+        if self._sets is None:
+            nodes = self._graph.nodes
+            self._sets = {key: {n for n in nodes if not cond(n)}
+                          for (key, cond) in self._items()}
+        return self._sets[name]
+
+    def touch(self, nodes):
+        """Bumps the version and refreshes the membership of nodes in sets"""
+        self._version += 1
+        if self._sets is None:
+            return
+        graph_nodes = self._graph.nodes
+        for (key, cond) in self._items():
+            derived = self._sets[key]
+            for node in nodes:
+                if node in graph_nodes and not cond(node):
+                    derived.add(node)
+                else:
+                    derived.discard(node)
+
+    def _items(self):
+        return ((k, getattr(self._graph, c)) for (k, c) in self._conditions)
+
+
+class _Indexes(object):
+    """Indexes (see Index) attached to a graph, notified about every
+       modification made via graph methods"""
+
+    __slots__ = ('_graph', '_indexes')
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._indexes = []
+
+    def __iter__(self):
+        return iter(self._indexes)
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def add(self, index):
+        """Attaches an index to the graph and returns the index.
+
+        The index gets rebuilt and is then kept up to date by add_node(),
+        del_node(), add_edge() and del_edge() of the graph.
+        """
+        index.rebuild(self._graph)
+        self._indexes.append(index)
+        return index
+
+    def remove(self, index):
+        """Detaches index from the graph"""
+        self._indexes.remove(index)
+
+    def notify(self, event, *args):
+        """Forwards a modification event to attached indexes"""
+        for index in self._indexes:
+            getattr(index, event)(self._graph, *args)
+
+
+def _check_consistency(nodes, edges):
+    """Checks provided nodes and edges for consistency"""
+    # For each edge ensure, that their both endpoints refer existing nodes
+    for (left, right) in edges:
+        if left not in nodes:
+            raise KeyError(left)
+        if right not in nodes:
+            raise KeyError(right)
+
+
+def _related_elems(nodes, selector, node):
+    """Helper used to select node-related elements (nodes, edges)"""
+    try:
+        elems = selector(node)
+    except KeyError:
+        nodes[node]  # rethrow if we have no such node
+        elems = ()   # otherwise it was an isolated node
+    return set(elems)
+
 
 class Graph(object):
     """Represents a directed graph of block devices"""
 
-    __slots__ = ('_nodes', '_edges')
+    __slots__ = ('_nodes', '_edges', '_cache', '_indexes')
 
     def __init__(self, nodes=(), edges=(), **kw):
         nodes = nodes_.Nodes(nodes, **kw)
         edges = edges_.Edges(edges, **kw)
         if kw.get('consistency', True):
-            self._consistency(nodes, edges)
+            _check_consistency(nodes, edges)
         self._nodes = nodes
         self._edges = edges
+        self._cache = _Cache(self)
+        self._indexes = _Indexes(self)
 
     @property
     def nodes(self):
@@ -32,6 +169,16 @@ class Graph(object):
         """All edges in the graph"""
         return self._edges
 
+    @property
+    def cache(self):
+        """Values computed from the graph, reused until it gets modified"""
+        return self._cache
+
+    @property
+    def indexes(self):
+        """Indexes attached to the graph, see add() and remove() of it"""
+        return self._indexes
+
     def __repr__(self):
         name = self.__class__.__name__
         return "%s(%s, %s)" % (name, repr(self._nodes), repr(self._edges))
@@ -39,11 +186,22 @@ class Graph(object):
     def add_node(self, node, data=MISSING):
         """Add new node to graph"""
         self._nodes.add(node, data)
+        self._cache.touch((node,))
+        self._indexes.notify('node_added', node)
 
     def del_node(self, node):
         """Deletes node and all its incident edges"""
         del self._nodes[node]
-        self._edges.del_incident(node)
+        if self._edges.has_neighbors(node):
+            incident = self._edges.incident(node)
+            for edge in incident:
+                del self._edges[edge]
+        else:
+            incident = ()
+        self._cache.touch([node] + [self.adjacent(node, e) for e in incident])
+        for edge in incident:
+            self._indexes.notify('edge_deleted', edge)
+        self._indexes.notify('node_deleted', node)
 
     def discard_node(self, node):
         """Discards node and all its incident edges"""
@@ -61,17 +219,28 @@ class Graph(object):
     def add_edge(self, edge, data=MISSING, **kw):
         """Add edge and its nodes to graph."""
         left, right = tuple(edge)
+        if self._indexes:
+            added = [n for n in dict.fromkeys((left, right))
+                     if n not in self._nodes or n in kw]
         self._edges.add(edge, data)
-        self.add_node(left, kw.get(left, MISSING))
-        self.add_node(right, kw.get(right, MISSING))
+        self._nodes.add(left, kw.get(left, MISSING))
+        self._nodes.add(right, kw.get(right, MISSING))
+        self._cache.touch((left, right))
+        if self._indexes:
+            for node in added:
+                self._indexes.notify('node_added', node)
+            self._indexes.notify('edge_added', (left, right))
 
     def del_edge(self, edge):
         """Deletes edge leaving its (possibly isolated) nodes in graph."""
         del self._edges[edge]
+        self._cache.touch(tuple(edge))
+        self._indexes.notify('edge_deleted', tuple(edge))
 
     def discard_edge(self, edge):
         """Discards edge leaving its (possibly isolated) nodes in graph."""
-        self._edges.discard(edge)
+        if edge in self._edges:
+            self.del_edge(edge)
 
     def has_edge(self, edge):
         """Returns True if the graph has given edge"""
@@ -95,64 +264,62 @@ class Graph(object):
 
     def successors(self, node):
         """Returns successors of the given node."""
-        return self._select_node_related_elems(self._edges.successors, node)
+        return _related_elems(self._nodes, self._edges.successors, node)
 
     def predecessors(self, node):
         """Returns predecessors of the given node."""
-        return self._select_node_related_elems(self._edges.predecessors, node)
+        return _related_elems(self._nodes, self._edges.predecessors, node)
 
     def neighbors(self, node):
         """Returns a set of nodes that are connected to a given node"""
-        return self._select_node_related_elems(self._edges.neighbors, node)
+        return _related_elems(self._nodes, self._edges.neighbors, node)
 
     def outward(self, node):
         """Returns edges outward to given node"""
-        return self._select_node_related_elems(self._edges.outward, node)
+        return _related_elems(self._nodes, self._edges.outward, node)
 
     def inward(self, node):
         """Returns edges inward to given node"""
-        return self._select_node_related_elems(self._edges.inward, node)
+        return _related_elems(self._nodes, self._edges.inward, node)
 
     def incident(self, node):
         """Returns edges incident to given node"""
-        return self._select_node_related_elems(self._edges.incident, node)
+        return _related_elems(self._nodes, self._edges.incident, node)
 
-    @classmethod
-    def adjacent(cls, node, edge):
-        """Returns a node on the opposite end of edge"""
-        return edges_.Edges.adjacent(node, edge)
+    def view(self, node, kind):
+        """Returns a live read-only view of elements related to given node.
+
+        The ``kind`` is one of 'successors', 'predecessors', 'neighbors',
+        'outward', 'inward' or 'incident', and the view contains same
+        elements as the set returned by the method of that name, without
+        copying them. The length of an 'inward' ('outward') view is the in
+        (out) degree of node.
+        """
+        try:
+            selector = getattr(self._edges, _VIEWS[kind])
+        except KeyError:
+            raise ValueError("invalid kind of view: %r" % (kind,))
+        if node not in self._nodes and not self._edges.has_neighbors(node):
+            raise KeyError(node)
+        return selector(node)
+
+    # returns a node on the opposite end of edge
+    adjacent = staticmethod(edges_.Edges.adjacent)
 
     def roots(self):
         """Returns a set of root nodes (having no predecessors)"""
-        return self._select_nodes_not_satisfying(self.has_predecessors)
+        return set(self._cache.nodes('roots'))
 
     def leafs(self):
         """Returns a set of leaf nodes (having no successors)"""
-        return self._select_nodes_not_satisfying(self.has_successors)
+        return set(self._cache.nodes('leafs'))
 
     def isolated(self):
         """Returns a set of isolated nodes (having no neighbors)"""
-        return self._select_nodes_not_satisfying(self.has_neighbors)
-
-    def _consistency(self, nodes, edges):
-        """Checks provided nodes and edges for consistency"""
-        # For each edge ensure, that their both endpoints refer existing nodes
-        for (left, right) in edges:
-            if left not in nodes:
-                raise KeyError(left)
-            if right not in nodes:
-                raise KeyError(right)
-
-    def _select_node_related_elems(self, selector, node):
-        """Helper used to select node-related elements (nodes, edges)"""
-        try:
-            elems = selector(node)
-        except KeyError:
-            self._nodes[node]  # rethrow if we have no such node
-            elems = ()         # otherwise it was an isolated node
-        return set(elems)
+        return set(self._cache.nodes('isolated'))
 
-    def _select_nodes_not_satisfying(self, condition):
-        return {n for n in self._nodes if not condition(n)}
+    def freeze(self):
+        """Returns an immutable, compact snapshot of the graph"""
+        return frozen_.FrozenGraph(self)
 
 # vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,40 @@
+# -*- coding: utf8 -*-
+
+import abc
+
+__all__ = ('Index',)
+
+
+class Index(object, metaclass=abc.ABCMeta):
+    """An abstract base class for indexes maintained by a Graph.
+
+       An index attached with Graph.indexes.add() is notified about every
+       modification made via graph methods. Each notification receives the
+       graph as its first argument and is issued after the graph has been
+       modified.
+    """
+
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def rebuild(self, graph):
+        """Builds the index from scratch for the given graph"""
+        pass
+
+    def node_added(self, graph, node):
+        """Called when a node was added or its data was replaced"""
+        pass
+
+    def node_deleted(self, graph, node):
+        """Called when a node was deleted (after its incident edges)"""
+        pass
+
+    def edge_added(self, graph, edge):
+        """Called when an edge was added"""
+        pass
+
+    def edge_deleted(self, graph, edge):
+        """Called when an edge was deleted"""
+        pass
+
+# vim: set ft=python et ts=4 sw=4:
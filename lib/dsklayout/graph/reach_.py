@@ -0,0 +1,164 @@
+# -*- coding: utf8 -*-
+
+from . import index_
+from . import dfs_
+
+import collections
+
+__all__ = ('Reachability',)
+
+
+class Reachability(index_.Index):
+    """A reachability index answering descendants/ancestors queries.
+
+       Nodes are interned into integer identifiers and each node keeps two
+       bitsets (Python integers) of its descendants and ancestors. Queries are
+       answered from the bitsets, without searching the graph. When attached
+       to a graph (``graph.indexes.add(Reachability())``), the index is updated
+       incrementally as edges and nodes are added or deleted. Cycles are
+       supported.
+    """
+
+    __slots__ = ('_ids', '_keys', '_free', '_descendants', '_ancestors')
+
+    def __init__(self):
+        self._clear()
+
+    def rebuild(self, graph):
+        """Builds the index from scratch for the given graph"""
+        self._clear()
+        nodes = list(graph.nodes)
+        nodes.extend(n for e in graph.edges for n in e if n not in graph.nodes)
+        for node in nodes:
+            self._intern(node)
+        # post-order makes most of the nodes settle within a single pass
+        search = dfs_.Dfs(direction='outward')
+        events = search.iter_events(graph, nodes)
+        order = [node for (kind, node, _) in events if kind == search.LEAVE]
+        self._settle_descendants(graph, order, set(order))
+        order.reverse()
+        self._settle_ancestors(graph, order, set(order))
+
+    def node_added(self, graph, node):
+        self._intern(node)
+
+    def node_deleted(self, graph, node):
+        i = self._ids.pop(node)
+        self._keys[i] = None
+        self._descendants[i] = self._ancestors[i] = 0
+        self._free.append(i)
+
+    def edge_added(self, graph, edge):
+        left, right = edge
+        i, j = self._intern(left), self._intern(right)
+        descendants = (1 << j) | self._descendants[j]
+        ancestors = (1 << i) | self._ancestors[i]
+        for k in self._bit_indices(self._ancestors[i] | (1 << i)):
+            self._descendants[k] |= descendants
+        for k in self._bit_indices(self._descendants[j] | (1 << j)):
+            self._ancestors[k] |= ancestors
+
+    def edge_deleted(self, graph, edge):
+        left, right = edge
+        i, j = self._ids[left], self._ids[right]
+        # only nodes that reached the left end may have lost descendants, and
+        # only nodes reachable from the right end may have lost ancestors
+        upstream = self._decode(self._ancestors[i] | (1 << i))
+        downstream = self._decode(self._descendants[j] | (1 << j))
+        # skip a node being deleted from graph, it has no edges anymore
+        upstream = {n for n in upstream if self._present(graph, n)}
+        downstream = {n for n in downstream if self._present(graph, n)}
+        for node in upstream:
+            self._descendants[self._ids[node]] = 0
+        for node in downstream:
+            self._ancestors[self._ids[node]] = 0
+        self._settle_descendants(graph, upstream, upstream)
+        self._settle_ancestors(graph, downstream, downstream)
+
+    def descendants(self, node):
+        """Returns a set of nodes reachable from node"""
+        return self._decode(self._descendants[self._ids[node]])
+
+    def ancestors(self, node):
+        """Returns a set of nodes from which node is reachable"""
+        return self._decode(self._ancestors[self._ids[node]])
+
+    def is_reachable(self, source, target):
+        """Returns True if target is reachable from source.
+
+        Every node is considered to be reachable from itself.
+        """
+        i, j = self._ids[source], self._ids[target]
+        return i == j or bool((self._descendants[i] >> j) & 1)
+
+    def _clear(self):
+        self._ids = dict()
+        self._keys = list()
+        self._free = list()
+        self._descendants = list()
+        self._ancestors = list()
+
+    @classmethod
+    def _present(cls, graph, node):
+        return graph.has_node(node) or graph.has_neighbors(node)
+
+    def _intern(self, node):
+        try:
+            return self._ids[node]
+        except KeyError:
+            pass
+        if self._free:
+            i = self._free.pop()
+            self._keys[i] = node
+        else:
+            i = len(self._keys)
+            self._keys.append(node)
+            self._descendants.append(0)
+            self._ancestors.append(0)
+        self._ids[node] = i
+        return i
+
+    def _settle_descendants(self, graph, order, scope):
+        self._settle(graph, self._descendants, order, scope,
+                     'successors', 'predecessors')
+
+    def _settle_ancestors(self, graph, order, scope):
+        self._settle(graph, self._ancestors, order, scope,
+                     'predecessors', 'successors')
+
+    def _settle(self, graph, table, order, scope, related, dependent):
+        # Recomputes table entries for nodes in scope until they reach the
+        # least fixed point of table[x] = OR(bit(y) | table[y]) for y related
+        # to x (y in graph.view(x, related)). Entries outside of scope are
+        # assumed to be up to date.
+        ids = self._ids
+        pending = collections.deque(order)
+        queued = set(order)
+        while pending:
+            node = pending.popleft()
+            queued.discard(node)
+            bits = 0
+            for other in graph.view(node, related):
+                k = ids[other]
+                bits |= (1 << k) | table[k]
+            i = ids[node]
+            if bits != table[i]:
+                table[i] = bits
+                for other in graph.view(node, dependent):
+                    if other in scope and other not in queued:
+                        queued.add(other)
+                        pending.append(other)
+
+    def _decode(self, bits):
+        keys = self._keys
+        return {keys[i] for i in self._bit_indices(bits)}
+
+    @classmethod
+    def _bit_indices(cls, bits):
+        digits = bin(bits)[:1:-1]  # lowest bit first, without '0b' prefix
+        i = digits.find('1')
+        while i >= 0:
+            yield i
+            i = digits.find('1', i + 1)
+
+# vim: set ft=python et ts=4 sw=4:
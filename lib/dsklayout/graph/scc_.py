@@ -0,0 +1,84 @@
+# -*- coding: utf8 -*-
+
+from . import graph_
+
+import itertools
+
+__all__ = ('strongly_connected_components', 'condensation')
+
+
+def strongly_connected_components(graph):
+    """Returns a list of strongly connected components of graph.
+
+    Each component is a set of nodes. Components are listed in topological
+    order, i.e. there is no edge leading from a component to any of the
+    components preceding it. A component having more than one node (or a
+    node with a self-loop) indicates a cycle. The search is Tarjan's
+    algorithm driven by an explicit stack, so it runs in linear time and
+    doesn't hit the recursion limit on deep graphs.
+    """
+    index = dict()
+    lowlink = dict()
+    onstack = set()
+    stack = []
+    result = []
+    # edge endpoints are visited too, in case of consistency=False graphs
+    roots = itertools.chain(graph.nodes, (n for e in graph.edges for n in e))
+    for root in roots:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        onstack.add(root)
+        frames = [(root, iter(graph.view(root, 'successors')))]
+        while frames:
+            node, successors = frames[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    onstack.add(successor)
+                    successors = iter(graph.view(successor, 'successors'))
+                    frames.append((successor, successors))
+                    break
+                if successor in onstack and index[successor] < lowlink[node]:
+                    lowlink[node] = index[successor]
+            else:
+                frames.pop()
+                if frames:
+                    parent = frames[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    result.append(_pop_component(stack, onstack, node))
+    result.reverse()  # Tarjan finds sink components first
+    return result
+
+
+def condensation(graph, components=None):
+    """Returns the condensation of graph, i.e. a DAG of its components.
+
+    Nodes of the returned Graph are positions in components list (by
+    default, as returned by strongly_connected_components()) and their data
+    are frozensets of graph nodes. There is an edge (i, j) if any node of
+    the i-th component has an edge to a node of the j-th one.
+    """
+    if components is None:
+        components = strongly_connected_components(graph)
+    owner = {n: i for (i, c) in enumerate(components) for n in c}
+    nodes = {i: frozenset(c) for (i, c) in enumerate(components)}
+    edges = {(owner[left], owner[right]) for (left, right) in graph.edges
+             if owner[left] != owner[right]}
+    return graph_.Graph(nodes, edges)
+
+
+def _pop_component(stack, onstack, node):
+    component = set()
+    while True:
+        member = stack.pop()
+        onstack.discard(member)
+        component.add(member)
+        if member == node:
+            return component
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,120 @@
+# -*- coding: utf8 -*-
+
+from . import dfs_
+from . import exceptions_
+
+import collections
+
+__all__ = ('topological_sort', 'levels')
+
+
+def topological_sort(graph, backedge_func=None):
+    """Returns a list of graph nodes in topological order.
+
+    Every node precedes all of its successors. If the graph has cycles and
+    backedge_func is None, CyclicGraphError listing the back edges is
+    raised. Otherwise backedge_func(graph, edge) is invoked for every back
+    edge and the edge is disregarded. The result obtained without
+    backedge_func is cached on the graph (see Graph.cache).
+    """
+    if backedge_func is None:
+        return list(graph.cache.get(topological_sort, _topological_sort))
+    return _sort(graph, backedge_func)[0]
+
+
+def levels(graph, backedge_func=None):
+    """Returns a {node: level} dict with longest-path levels of nodes.
+
+    Nodes having no predecessors are at level 0, any other node is one level
+    deeper than the deepest of its predecessors. Cycles are handled same way
+    as in topological_sort() and the result is cached in same manner.
+    """
+    if backedge_func is None:
+        return dict(graph.cache.get(levels, _levels))
+    return _assign_levels(graph, *_sort(graph, backedge_func))
+
+
+def _topological_sort(graph):
+    return _sort(graph, None)[0]
+
+
+def _levels(graph):
+    return _assign_levels(graph, topological_sort(graph), ())
+
+
+def _sort(graph, backedge_func):
+    # Kahn's algorithm; on cycles, the back edges found by Dfs are reported
+    # and the nodes get sorted once more with the back edges ignored.
+    nodes = _all_nodes(graph)
+    ignored = ()
+    order = _kahn(graph, nodes, ignored)
+    if len(order) < len(nodes):
+        sorted_nodes = set(order)
+        remaining = [n for n in nodes if n not in sorted_nodes]
+        backedges = _find_backedges(graph, remaining)
+        if backedge_func is None:
+            raise exceptions_.CyclicGraphError(
+                "graph has cycles, back edges: %s" % repr(backedges),
+                backedges)
+        for edge in backedges:
+            backedge_func(graph, edge)
+        ignored = set(backedges)
+        order = _kahn(graph, nodes, ignored)
+    return order, ignored
+
+
+def _all_nodes(graph):
+    nodes = list(graph.nodes)
+    # endpoints missing in nodes, if graph was created with consistency=False
+    nodes.extend(n for n in dict.fromkeys(n for e in graph.edges for n in e)
+                 if n not in graph.nodes)
+    return nodes
+
+
+def _kahn(graph, nodes, ignored):
+    indegree = dict()
+    for node in nodes:
+        predecessors = graph.view(node, 'predecessors')
+        if ignored:
+            indegree[node] = sum(1 for p in predecessors
+                                 if (p, node) not in ignored)
+        else:
+            indegree[node] = len(predecessors)
+    queue = collections.deque(n for n in nodes if not indegree[n])
+    order = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for successor in graph.view(node, 'successors'):
+            if ignored and (node, successor) in ignored:
+                continue
+            indegree[successor] -= 1
+            if not indegree[successor]:
+                queue.append(successor)
+    return order
+
+
+def _find_backedges(graph, start_nodes):
+    # Only the edges closing a cycle, i.e. leading to a node on the Dfs stack
+    search = dfs_.Dfs(direction='outward')
+    stack = set()
+    backedges = []
+    for (kind, node, edge) in search.iter_events(graph, start_nodes):
+        if kind == search.ENTER:
+            stack.add(node)
+        elif kind == search.LEAVE:
+            stack.discard(node)
+        elif kind == search.BACKEDGE and edge[1] in stack:
+            backedges.append(edge)
+    return backedges
+
+
+def _assign_levels(graph, order, ignored):
+    level = dict()
+    for node in order:
+        predecessors = graph.view(node, 'predecessors')
+        level[node] = max((level[p] + 1 for p in predecessors
+                           if (p, node) not in ignored), default=0)
+    return level
+
+# vim: set ft=python et ts=4 sw=4:
@@ -5,9 +5,22 @@ import collections
 __all__ = ('Trail',)
 
 
+def noop(*args):
+    """A default callback, does nothing and never stops the search"""
+    return False
+
+
 class Trail(object):
 
+    # lists that may be recorded by a trail
+    RECORDABLE = ('nodes', 'edges', 'backedges')
+
     def __init__(self, graph, **kw):
+        record = frozenset(kw.get('record', self.RECORDABLE))
+        if not record.issubset(self.RECORDABLE):
+            unknown = sorted(record.difference(self.RECORDABLE))
+            raise ValueError('Invalid record %s' % repr(unknown))
+        self._record = record
         self._graph = graph
         self._explored_nodes = set()
         self._explored_edges = set()
@@ -16,9 +29,9 @@ class Trail(object):
         self._backedges = list()
         self._result = None
         self._queue = collections.deque()
-        self._ingress_func = kw.get('ingress_func', lambda *args:  False)
-        self._egress_func = kw.get('egress_func', lambda *args:  False)
-        self._backedge_func = kw.get('backedge_func', lambda *args:  False)
+        self._ingress_func = kw.get('ingress_func', noop)
+        self._egress_func = kw.get('egress_func', noop)
+        self._backedge_func = kw.get('backedge_func', noop)
 
     @property
     def explored_nodes(self):
@@ -45,6 +58,11 @@ class Trail(object):
         """A list of back edges (skipped due to cycles)"""
         return self._backedges
 
+    @property
+    def record(self):
+        """A set of names of the lists being recorded (nodes, edges, ...)"""
+        return self._record
+
     @property
     def queue(self):
         """A node queue used, for example, by BFS algorithm"""
@@ -79,6 +97,25 @@ class Trail(object):
         """A callback invoked when a search algorithm finds a backedges"""
         return self._backedge_func
 
+    def records(self, name):
+        """Returns True if the list of given name is being recorded"""
+        return name in self._record
+
+    def tracks_edges(self):
+        """Returns True if a search has to keep track of explored edges.
+
+        This is the case when edges or backedges are recorded or when the
+        backedges shall be reported to a callback.
+        """
+        return 'edges' in self._record or 'backedges' in self._record or \
+               self._backedge_func is not noop
+
+    def has_callbacks(self):
+        """Returns True if any of the callbacks was provided"""
+        return (self._ingress_func is not noop or
+                self._egress_func is not noop or
+                self._backedge_func is not noop)
+
     def node_explored(self, node):
         """Returns whether a node was already explored"""
         return node in self._explored_nodes
@@ -96,16 +133,19 @@ class Trail(object):
         self._explored_edges.add(edge)
 
     def append_node(self, node):
-        """Append node to the list of visited nodes"""
-        self._nodes.append(node)
+        """Append node to the list of visited nodes (if recorded)"""
+        if 'nodes' in self._record:
+            self._nodes.append(node)
 
     def append_edge(self, edge):
-        """Append edge to the list of visited edges"""
-        self._edges.append(edge)
+        """Append edge to the list of visited edges (if recorded)"""
+        if 'edges' in self._record:
+            self._edges.append(edge)
 
     def append_backedge(self, backedge):
-        """Append backedge to the list of visited backedges"""
-        self._backedges.append(backedge)
+        """Append backedge to the list of visited backedges (if recorded)"""
+        if 'backedges' in self._record:
+            self._backedges.append(backedge)
 
     def explore_and_append_node(self, node):
         """Append node to self.nodes and add to self.explored_nodes"""
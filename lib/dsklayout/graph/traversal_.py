@@ -1,6 +1,7 @@
 # -*- coding: utf8 -*-
 
 from . import trail_
+from . import frozen_
 
 import collections
 import abc
@@ -14,13 +15,28 @@ class Traversal(object, metaclass=abc.ABCMeta):
     __slots__ = ('_edge_selector',
                  '_ingress_func',
                  '_egress_func',
-                 '_backedge_func')
+                 '_backedge_func',
+                 '_views')
+
+    # kinds of events yielded by iter_events()
+    ENTER = 'enter'
+    LEAVE = 'leave'
+    EDGE = 'edge'
+    BACKEDGE = 'backedge'
+
+    # predefined edge selectors -> kinds of FrozenGraph's CSR rows searched
+    # instead of the edges they select
+    _csr_selectors = {'select_inward_edges': ('predecessors',),
+                      'select_outward_edges': ('successors',),
+                      'select_incident_edges': ('successors', 'predecessors'),
+                      'select_both_edges': ('successors', 'predecessors')}
 
     def __init__(self, **kw):
+        self._views = bool(kw.get('views', False))
         self.edge_selector = kw.get('edge_selector', kw.get('direction'))
-        self.ingress_func = kw.get('ingress_func', lambda g, n, e: False)
-        self.egress_func = kw.get('egress_func', lambda g, n, e: False)
-        self.backedge_func = kw.get('backedge_func', lambda g, e: False)
+        self.ingress_func = kw.get('ingress_func', trail_.noop)
+        self.egress_func = kw.get('egress_func', trail_.noop)
+        self.backedge_func = kw.get('backedge_func', trail_.noop)
 
     @property
     def edge_selector(self):
@@ -37,6 +53,15 @@ class Traversal(object, metaclass=abc.ABCMeta):
         else:
             raise ValueError('Invalid edge selector %s' % repr(selector))
 
+    @property
+    def views(self):
+        """Whether the edges are selected as read-only views of the graph.
+
+        Views avoid copying adjacency sets at every visited node, but the
+        graph must not be modified by callbacks while the search is running.
+        """
+        return self._views
+
     @property
     def ingress_func(self):
         """Callback function invoked when Traverser enters a node."""
@@ -83,18 +108,24 @@ class Traversal(object, metaclass=abc.ABCMeta):
 
     def select_inward_edges(self, graph, node):
         """Returns edges inward to given node"""
+        if self._views:
+            return graph.view(node, 'inward')
         return graph.inward(node)
 
     def select_incident_edges(self, graph, node):
         """Returns edges incident to given node"""
+        if self._views:
+            return graph.view(node, 'incident')
         return graph.incident(node)
 
     def select_both_edges(self, graph, node):
         """Returns edges incident to given node"""
-        return graph.incident(node)
+        return self.select_incident_edges(graph, node)
 
     def select_outward_edges(self, graph, node):
         """Returns edges outward to given node"""
+        if self._views:
+            return graph.view(node, 'outward')
         return graph.outward(node)
 
     def callbacks(self, **kw):
@@ -102,6 +133,48 @@ class Traversal(object, metaclass=abc.ABCMeta):
         callbacks = ('ingress_func', 'egress_func', 'backedge_func')
         return {k: kw.get(k, getattr(self, k)) for k in callbacks}
 
+    def make_trail(self, graph, **kw):
+        """Creates a trail for a search invoked with given keyword arguments.
+
+        Besides callbacks, the ``record`` argument may be used to select the
+        lists to be recorded by the trail (see Trail.RECORDABLE).
+        """
+        options = self.callbacks(**kw)
+        if 'record' in kw:
+            options['record'] = kw['record']
+        return trail_.Trail(graph, **options)
+
+    def _csr_rows(self, trail):
+        # FrozenGraph's CSR rows (offsets, indices) to be searched by node
+        # identifiers, if neither callbacks nor edges need to be handled and
+        # one of the predefined edge selectors is used, None otherwise
+        if trail.has_callbacks() or trail.tracks_edges():
+            return None
+        if not isinstance(trail.graph, frozen_.FrozenGraph):
+            return None
+        func = getattr(self._edge_selector, '__func__', None)
+        kinds = self._csr_selectors.get(getattr(func, '__name__', None))
+        if kinds is None or getattr(Traversal, func.__name__) is not func:
+            return None
+        return [trail.graph.ids.rows(kind) for kind in kinds]
+
+    @classmethod
+    def _csr_adjacent(cls, rows, i):
+        # identifiers of the nodes adjacent to node i
+        (offsets, indices) = rows[0]
+        adjacent = indices[offsets[i]:offsets[i+1]]
+        for (offsets, indices) in rows[1:]:
+            adjacent += indices[offsets[i]:offsets[i+1]]
+        return adjacent
+
+    @classmethod
+    def _fill_csr_trail(cls, trail, seen, visited):
+        # translates results of a search run by node identifiers
+        keys = trail.graph.ids.keys
+        trail.explored_nodes.update(k for (k, s) in zip(keys, seen) if s)
+        if trail.records('nodes'):
+            trail.nodes.extend(keys[i] for i in visited)
+
     @abc.abstractmethod
     def __call__(self, graph, startpoint, *args, **kw):
         pass
@@ -0,0 +1,111 @@
+# -*- coding: utf8 -*-
+
+import collections.abc
+
+__all__ = ('NodesView', 'EdgesView')
+
+
+class _View(collections.abc.Set):
+    """Common base for read-only views"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, repr(set(self)))
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+
+class NodesView(_View):
+    """A live, read-only set of nodes related to a given node.
+
+       The view keeps references to relation dictionaries ({node: set}, such
+       as Edges.successors_dict) and consults them each time it's used, so it
+       never copies the related nodes and always reflects the current state.
+    """
+
+    __slots__ = ('_node', '_registries')
+
+    def __init__(self, node, *registries):
+        self._node = node
+        self._registries = registries
+
+    def __contains__(self, other):
+        for registry in self._registries:
+            if other in registry.get(self._node, ()):
+                return True
+        return False
+
+    def __iter__(self):
+        if len(self._registries) == 1:
+            return iter(self._registries[0].get(self._node, ()))
+        return self._iter_distinct()
+
+    def _iter_distinct(self):
+        seen = []
+        for registry in self._registries:
+            nodes = registry.get(self._node, ())
+            for node in nodes:
+                if not any(node in s for s in seen):
+                    yield node
+            seen.append(nodes)
+
+    def __len__(self):
+        if len(self._registries) == 1:
+            return len(self._registries[0].get(self._node, ()))
+        return sum(1 for _ in self)
+
+
+class EdgesView(_View):
+    """A live, read-only set of edges outward and/or inward to a given node.
+
+       Edges are yielded lazily from the relation dictionaries of Edges, none
+       of them is stored by the view.
+    """
+
+    __slots__ = ('_node', '_successors', '_predecessors')
+
+    def __init__(self, node, successors=None, predecessors=None):
+        self._node = node
+        self._successors = successors
+        self._predecessors = predecessors
+
+    def __contains__(self, edge):
+        try:
+            left, right = edge
+        except (TypeError, ValueError):
+            return False
+        if self._successors is not None and left == self._node:
+            if right in self._successors.get(left, ()):
+                return True
+        if self._predecessors is not None and right == self._node:
+            if left in self._predecessors.get(right, ()):
+                return True
+        return False
+
+    def __iter__(self):
+        node = self._node
+        if self._successors is not None:
+            for successor in self._successors.get(node, ()):
+                yield (node, successor)
+        if self._predecessors is not None:
+            for predecessor in self._predecessors.get(node, ()):
+                if predecessor == node and self._successors is not None:
+                    continue  # self-loop, already yielded as outward edge
+                yield (predecessor, node)
+
+    def __len__(self):
+        node = self._node
+        count = 0
+        if self._successors is not None:
+            count += len(self._successors.get(node, ()))
+        if self._predecessors is not None:
+            predecessors = self._predecessors.get(node, ())
+            count += len(predecessors)
+            if self._successors is not None and node in predecessors:
+                count -= 1
+        return count
+
+# vim: set ft=python et ts=4 sw=4:
@@ -4,7 +4,13 @@ from .. import util
 util.inject_symbols_from_modules(__package__, [
     '.lsblk_',
     '.blkdev_',
+    '.blkdevtable_',
     '.exceptions_',
+    '.layoutcache_',
+    '.propindex_',
+    '.ptable_',
+    '.sfdisk_',
+    '.sysfsblk_',
 ])
 
 # vim: set ft=python et ts=4 sw=4:
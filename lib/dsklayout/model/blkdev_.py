@@ -8,14 +8,19 @@ __all__ = ('BlkDev',)
 
 
 class BlkDev(object):
-    """Represents a block device"""
+    """Represents a block device.
 
-    __slots__ = ('_properties', '_convert')
+       Properties are stored as provided (raw lsblk strings). With
+       ``convert=True``, a value is converted on first access and the result
+       is cached, so values that are never read are never converted.
+    """
+
+    __slots__ = ('_properties', '_convert', '_converted')
 
     # these may vary in different occurences of the device in lsblk output,
     _evolving_properties = ('pkname',)
     _converters = {
-            'parttype': lambda x: int(x, 16),  # hex str to int
+            'parttype': lambda x: x if '-' in x else int(x, 16),  # MBR id
             'ra': int,
             'ro': lambda x: bool(int(x)),
             'rm': lambda x: bool(int(x)),
@@ -83,14 +88,21 @@ class BlkDev(object):
     @property
     def properties(self):
         """The properties dictionary provided to constructor"""
-        return self._properties
+        if not self._convert:
+            return self._properties
+        if self._converted is None:
+            self._converted = dict()
+        for key in self._properties:
+            self._property(key)
+        return self._converted
 
     @classmethod
     def convert_value(cls, key, value):
         """Convert single property value"""
-        if value is not None:
-            return (cls._converters.get(key, lambda x:  x))(value)
-        return None
+        converter = cls._converters.get(key)
+        if value is None or converter is None:
+            return value
+        return converter(value)
 
     @classmethod
     def convert_values(cls, items):
@@ -101,49 +113,78 @@ class BlkDev(object):
 
     def appear(self, properties):
         """Called when node appears for the first time in lsblk output"""
-        self._properties = self._convert_if_enabled(properties)
+        self._properties = dict(properties)
+        self._converted = None  # created on first conversion
         self._for_evolving_props(self._assign_evolving_prop, properties)
 
     def reappear(self, properties):
         """Called when node appears again in lsblk output"""
-        properties = self._convert_if_enabled(properties)
-
-        # first verify input
+        # first verify input, raw values are compared before converted ones
         for key in (set(properties) - set(self._evolving_properties)):
-            if self._properties.get(key) == properties[key]:
+            old, new = self._raw_property(key), properties[key]
+            if old == new:
                 continue
+            if self._convert:
+                old = self.convert_value(key, old)
+                new = self.convert_value(key, new)
+                if old == new:
+                    continue
             msg = "Conflicting values for property %s: %s vs %s" % \
-                  (key, repr(self._properties.get(key)), repr(properties[key]))
+                  (key, repr(old), repr(new))
             raise exceptions_.InconsistentDataError(msg)
 
         # then update evolving properties
         self._for_evolving_props(self._update_evolving_prop, properties)
 
-    def _convert_if_enabled(self, properties):
-        if self._convert:
-            return self.convert_values(properties)
-        else:
-            return dict(properties)
+    def evolve(self, properties):
+        """Called when node appears again in flat (list mode) lsblk output.
+
+        Only evolving properties are updated, other properties are same as in
+        the first appearance of the device, so they aren't compared.
+        """
+        self._for_evolving_props(self._update_evolving_prop, properties)
+
+    def _raw_property(self, key):
+        return self._properties.get(key)
+
+    def _property(self, key):
+        value = self._properties[key]
+        if not self._convert:
+            return value
+        converted = self._converted
+        if converted is None:
+            converted = self._converted = dict()
+        elif key in converted:
+            return converted[key]
+        value = converted[key] = self.convert_value(key, value)
+        return value
 
     def _for_evolving_props(self, func, properties):
-        for key in (set(self._evolving_properties) & set(properties)):
-            func(key, properties[key])
+        for key in self._evolving_properties:
+            if key in properties:
+                func(key, properties[key])
 
     def _assign_evolving_prop(self, key, value):
         if value is None:
             self._properties[key] = []
         else:
             self._properties[key] = [value]
+        if self._converted is not None:
+            self._converted.pop(key, None)
 
     def _update_evolving_prop(self, key, value):
         if key not in self._properties:
             self._properties[key] = []
-        if value is not None and value not in self._properties[key]:
+        elif value is None or value in self._properties[key]:
+            return
+        if value is not None:
             self._properties[key].append(value)
+        if self._converted is not None:
+            self._converted.pop(key, None)
 
 
 for attr, key in BlkDev._property_map.items():
-    setattr(BlkDev, attr, property(lambda self, k=key: self._properties[k]))
+    setattr(BlkDev, attr, property(lambda self, k=key: self._property(k)))
 
 
 # vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,328 @@
+# -*- coding: utf8 -*-
+
+from . import blkdev_
+
+import array
+import itertools
+import operator
+
+__all__ = ('BlkDevTable', 'BlkDevRow')
+
+_MISSING = object()  # marks properties missing in a row
+
+
+class BlkDevRow(blkdev_.BlkDev):
+    """A BlkDev whose properties are stored in a row of BlkDevTable"""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+        self._convert = table.convert
+        self._converted = None
+
+    @property
+    def table(self):
+        """The table storing properties of this device"""
+        return self._table
+
+    @property
+    def row(self):
+        """Index of the row storing properties of this device"""
+        return self._row
+
+    @property
+    def properties(self):
+        """A dictionary of properties, as provided to BlkDevTable.add()"""
+        props = self._table.row_properties(self._row)
+        if self._convert:
+            return self.convert_values(props)
+        return props
+
+    def appear(self, properties):
+        self._table.assign(self._row, properties)
+
+    def _raw_property(self, key):
+        try:
+            return self._table.value(self._row, key)
+        except KeyError:
+            return None
+
+    def _property(self, key):
+        value = self._table.value(self._row, key)
+        if self._convert:
+            return self.convert_value(key, value)
+        return value
+
+    def _assign_evolving_prop(self, key, value):
+        self._table.assign_evolving(self._row, key, value)
+
+    def _update_evolving_prop(self, key, value):
+        self._table.update_evolving(self._row, key, value)
+
+
+class BlkDevTable(object):
+    """Stores properties of many block devices in columns.
+
+       Properties with few distinct values (``'disk'``, ``'ext4'``,
+       ``'512'``, ...) get columns of integer codes indexing a list of the
+       distinct values of the column. The codes are kept in the narrowest
+       array that fits them (``array('B')`` for up to 255 values, widened
+       when needed), with code 0 marking rows missing the property.
+       Properties unique to a device (kname, name, uuid, ...) would gain
+       nothing from such a dictionary, so they are stored in plain lists,
+       one value per row. Evolving properties are kept as tuples, other
+       (unknown) properties in a sparse {row: dict} mapping. Devices are
+       accessed through thin BlkDevRow views.
+
+       A row takes roughly one byte per coded column and one pointer per
+       plain column (about 100 bytes for lsblk's properties), which is
+       about 17x less than a BlkDev with its own dict of properties (see
+       bench/dsklayout/model/blkdevtableBench.py). The values themselves
+       are shared with the caller and are not counted.
+
+       select() and where() build a byte mask of matching rows from whole
+       columns (``bytes.translate()`` for byte columns, ``map()``
+       otherwise) and extract the row indices with ``compress()``, without
+       a Python-level loop over the rows.
+    """
+
+    __slots__ = ('_codes', '_values', '_lookup', '_plain', '_extra',
+                 '_size', '_convert')
+
+    _columns = tuple(blkdev_.BlkDev._property_map.values())
+
+    # columns of (mostly) unique values, stored without a dictionary
+    _plain_columns = ('kname', 'name', 'maj:min', 'size', 'uuid', 'partuuid',
+                      'serial', 'wwn')
+
+    # array typecodes used for codes, from the narrowest one
+    _typecodes = ('B', 'H', 'L', 'Q')
+
+    def __init__(self, **kw):
+        coded = [k for k in self._columns if k not in self._plain_columns]
+        self._codes = {k: array.array(self._typecodes[0]) for k in coded}
+        self._values = {k: [_MISSING] for k in coded}
+        self._lookup = {k: {} for k in coded}
+        self._plain = {k: [] for k in self._columns if k not in self._codes}
+        self._extra = dict()
+        self._size = 0
+        self._convert = kw.get('convert', False)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def convert(self):
+        """Whether the rows convert values (see BlkDev)"""
+        return self._convert
+
+    @property
+    def columns(self):
+        """Names of the columns (lsblk property names)"""
+        return self._columns
+
+    def add(self, properties):
+        """Appends a row with given properties and returns its BlkDevRow"""
+        row = self._size
+        for codes in self._codes.values():
+            codes.append(0)
+        for values in self._plain.values():
+            values.append(_MISSING)
+        self._size += 1
+        device = BlkDevRow(self, row)
+        device.appear(properties)
+        return device
+
+    def row(self, row):
+        """Returns a BlkDevRow view of the given row"""
+        if not 0 <= row < self._size:
+            raise IndexError(row)
+        return BlkDevRow(self, row)
+
+    def rows(self, indices=None):
+        """Returns BlkDevRow views of given rows (all rows by default)"""
+        if indices is None:
+            indices = range(self._size)
+        return [BlkDevRow(self, i) for i in indices]
+
+    def assign(self, row, properties):
+        """Replaces all the properties stored in a row"""
+        for codes in self._codes.values():
+            codes[row] = 0
+        for values in self._plain.values():
+            values[row] = _MISSING
+        self._extra.pop(row, None)
+        for (key, value) in dict(properties).items():
+            if key in blkdev_.BlkDev._evolving_properties:
+                self.assign_evolving(row, key, value)
+            else:
+                self._store(row, key, value)
+
+    def assign_evolving(self, row, key, value):
+        """Resets an evolving property of a row to given value"""
+        self._store(row, key, () if value is None else (value,))
+
+    def update_evolving(self, row, key, value):
+        """Adds value to an evolving property of a row"""
+        try:
+            values = tuple(self.value(row, key))
+        except KeyError:
+            values = ()
+        if value is not None and value not in values:
+            values += (value,)
+        self._store(row, key, values)
+
+    def value(self, row, key):
+        """Returns a raw value of a property stored in a row"""
+        value = self._raw_value(row, key)
+        if value is _MISSING:
+            extra = self._extra.get(row)
+            if extra is None:
+                raise KeyError(key)
+            return extra[key]
+        if key in blkdev_.BlkDev._evolving_properties:
+            return list(value)
+        return value
+
+    def row_properties(self, row):
+        """Returns a dict with all the properties stored in a row"""
+        props = dict()
+        for key in self._columns:
+            value = self._raw_value(row, key)
+            if value is not _MISSING:
+                if key in blkdev_.BlkDev._evolving_properties:
+                    value = list(value)
+                props[key] = value
+        props.update(self._extra.get(row, ()))
+        return props
+
+    def column(self, key):
+        """Returns a list of raw values of a column (None where missing)"""
+        values = self._plain.get(key)
+        if values is None:
+            values = self._values[key]
+            values = map(values.__getitem__, self._codes[key])
+        return [None if v is _MISSING else v for v in values]
+
+    def select(self, key, predicate, **kw):
+        """Returns indices of rows whose key property satisfies predicate.
+
+        For coded columns, the predicate is evaluated once per distinct
+        value of the column, for plain columns (see BlkDevTable) once per
+        row. It gets converted values if ``convert=True`` is passed. Rows
+        missing the property are never selected.
+        """
+        convert = kw.get('convert', False)
+
+        def test(value):
+            if value is _MISSING:
+                return False
+            if convert:
+                value = blkdev_.BlkDev.convert_value(key, value)
+            return bool(predicate(value))
+
+        values = self._plain.get(key)
+        if values is not None:
+            return self._rows(bytes(map(test, values)))
+        codes = [c for (c, v) in enumerate(self._values[key]) if test(v)]
+        return self._rows(self._mask(key, codes))
+
+    def where(self, conditions):
+        """Returns indices of rows having all properties equal to conditions.
+
+        For example, ``table.where({'type': 'disk', 'rota': '1'})``.
+        """
+        mask = None
+        for (key, value) in dict(conditions).items():
+            value = self._encodable(key, value)
+            values = self._plain.get(key)
+            if values is not None:
+                found = map(operator.eq, values, itertools.repeat(value))
+                found = bytes(found)
+            else:
+                code = self._lookup[key].get(value)
+                if code is None:
+                    return []
+                found = self._mask(key, (code,))
+            found = int.from_bytes(found, 'little')
+            mask = found if mask is None else mask & found
+        if mask is None:
+            return list(range(self._size))
+        return self._rows(mask.to_bytes(self._size, 'little'))
+
+    def _rows(self, mask):
+        # indices of the rows with non-zero bytes in mask
+        return list(itertools.compress(range(self._size), mask))
+
+    def _mask(self, key, codes):
+        # a byte per row, 1 for rows having one of the codes in a column
+        column = self._codes[key]
+        if column.typecode == 'B':
+            table = bytearray(256)
+            for code in codes:
+                table[code] = 1
+            return column.tobytes().translate(table)
+        return bytes(map(frozenset(codes).__contains__, column))
+
+    def _raw_value(self, row, key):
+        values = self._plain.get(key)
+        if values is not None:
+            return values[row]
+        codes = self._codes.get(key)
+        if codes is None:
+            return _MISSING
+        return self._values[key][codes[row]]
+
+    @classmethod
+    def _encodable(cls, key, value):
+        if key in blkdev_.BlkDev._evolving_properties:
+            return tuple(value)
+        return value
+
+    def _store(self, row, key, value):
+        values = self._plain.get(key)
+        if values is not None:
+            values[row] = value
+            return
+        codes = self._codes.get(key)
+        if codes is not None:
+            try:
+                codes = self._codes[key] = self._fit(codes, key, value)
+                codes[row] = self._encode(key, value)
+            except TypeError:  # unhashable value, kept aside
+                codes[row] = 0
+            else:
+                self._discard_extra(row, key)
+                return
+        self._extra.setdefault(row, dict())[key] = value
+
+    def _discard_extra(self, row, key):
+        # forgets a value kept aside, replaced by a coded one
+        extra = self._extra.get(row)
+        if extra is not None:
+            extra.pop(key, None)
+            if not extra:
+                del self._extra[row]
+
+    def _fit(self, codes, key, value):
+        # widens the array of codes if a new value doesn't fit in
+        if value in self._lookup[key]:
+            return codes
+        limit = 1 << (8 * codes.itemsize)
+        if len(self._values[key]) < limit:
+            return codes
+        typecode = self._typecodes[self._typecodes.index(codes.typecode) + 1]
+        return array.array(typecode, codes)
+
+    def _encode(self, key, value):
+        lookup = self._lookup[key]
+        code = lookup.get(value)
+        if code is None:
+            values = self._values[key]
+            code = lookup[value] = len(values)
+            values.append(value)
+        return code
+
+# vim: set ft=python et ts=4 sw=4:
@@ -1,9 +1,13 @@
 # -*- coding: utf8 -*-
 
-__all__ = ('InconsistentDataError',)
+__all__ = ('InconsistentDataError', 'PartitionTableError')
 
 
 class InconsistentDataError(Exception):
     pass
 
+
+class PartitionTableError(Exception):
+    pass
+
 # vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,154 @@
+# -*- coding: utf8 -*-
+
+from . import blkdev_
+from ..graph import Graph
+
+import hashlib
+import json
+import os
+import tempfile
+
+__all__ = ('LayoutCache',)
+
+
+class LayoutCache(object):
+    """An on-disk cache of block device graphs.
+
+       Graphs are stored as JSON files in a cache directory. The file name
+       is derived from the arguments the graph was built for (devices, lsblk
+       program, ...) and from cheap signals of the current system state: the
+       kernel uevent sequence number (``/sys/kernel/uevent_seqnum``), bumped
+       on every device event, the listing of ``/sys/block`` and a digest of
+       ``/proc/self/mountinfo`` (mount and umount emit no uevents, but change
+       MOUNTPOINT and the FS* columns). An entry is thus reused only until
+       the next device event or mount table change. Filesystem usage
+       (FSAVAIL, FSUSE%, ...) changes without either, so these values are
+       as of the time the entry was stored. If the signals can't be read,
+       nothing is cached.
+    """
+
+    __slots__ = ('_directory', '_sysfs', '_mountinfo')
+
+    def __init__(self, directory, **kw):
+        self._directory = directory
+        self._sysfs = kw.get('sysfs', '/sys')
+        self._mountinfo = kw.get('mountinfo', '/proc/self/mountinfo')
+
+    @property
+    def directory(self):
+        """The cache directory"""
+        return self._directory
+
+    def graph(self, build, *args):
+        """Returns a cached graph for args, calling build() on a cache miss"""
+        key = self.key(*args)
+        if key is None:
+            return build()
+        graph = self.load(key)
+        if graph is None:
+            graph = build()
+            self.store(key, graph)
+        return graph
+
+    def key(self, *args):
+        """Returns a cache key for args and current system state, or None"""
+        state = self._system_state()
+        if state is None:
+            return None
+        return '%s-%s' % (self._digest(args), self._digest(state))
+
+    def load(self, key):
+        """Returns a graph stored under key, or None if there is none"""
+        try:
+            with open(self._path(key)) as f:
+                return self.decode_graph(json.load(f))
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def store(self, key, graph):
+        """Stores graph under key, replacing entries for outdated state"""
+        os.makedirs(self._directory, exist_ok=True)
+        data = json.dumps(self.encode_graph(graph), separators=(',', ':'))
+        fd, tmp = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._discard_outdated(key)
+
+    @classmethod
+    def encode_graph(cls, graph):
+        """Returns a JSON-serializable dict representing graph of BlkDevs.
+
+        The format is same as of test fixtures, i.e. ``{'nodes': {node:
+        properties}, 'edges': [[left, right], ...]}``, with raw (not
+        converted) property values.
+        """
+        nodes = {n: cls._raw_properties(d) for (n, d) in graph.nodes.items()}
+        return {'nodes': nodes, 'edges': [list(e) for e in graph.edges]}
+
+    @classmethod
+    def decode_graph(cls, data, **kw):
+        """Creates graph of BlkDevs from data returned by encode_graph()"""
+        nodes = {n: cls._new_blkdev(p) for (n, p) in data['nodes'].items()}
+        edges = [tuple(e) for e in data['edges']]
+        return Graph(nodes, edges, **kw)
+
+    @classmethod
+    def _raw_properties(cls, device):
+        if device is None:
+            return None
+        if not isinstance(device, blkdev_.BlkDev):
+            return device
+        return {k: device._raw_property(k) for k in device.properties}
+
+    @classmethod
+    def _new_blkdev(cls, properties):
+        if properties is None:
+            return None
+        # evolving properties are stored as lists of values
+        props = dict(properties)
+        evolving = [(k, props[k]) for k in blkdev_.BlkDev._evolving_properties
+                    if k in props]
+        for (key, _) in evolving:
+            props[key] = None
+        device = blkdev_.BlkDev(props)
+        for (key, values) in evolving:
+            for value in values:
+                device.evolve({key: value})
+        return device
+
+    def _system_state(self):
+        seqfile = os.path.join(self._sysfs, 'kernel', 'uevent_seqnum')
+        try:
+            with open(seqfile) as f:
+                seqnum = f.read().strip()
+            devices = sorted(os.listdir(os.path.join(self._sysfs, 'block')))
+            with open(self._mountinfo, 'rb') as f:
+                mounts = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+        return (seqnum, devices, mounts)
+
+    @classmethod
+    def _digest(cls, value):
+        data = json.dumps(value, sort_keys=True).encode('utf8')
+        return hashlib.sha1(data).hexdigest()[:16]
+
+    def _path(self, key):
+        return os.path.join(self._directory, 'layout-%s.json' % key)
+
+    def _discard_outdated(self, key):
+        prefix = 'layout-%s-' % key.split('-')[0]
+        current = os.path.basename(self._path(key))
+        for name in os.listdir(self._directory):
+            if name.startswith(prefix) and name != current:
+                try:
+                    os.unlink(os.path.join(self._directory, name))
+                except OSError:
+                    pass
+
+# vim: set ft=python et ts=4 sw=4:
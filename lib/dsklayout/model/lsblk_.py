@@ -1,46 +1,94 @@
 # -*- coding: utf8 -*-
 
 from . import blkdev_
-from ..util import backtick
+from ..util import backtick, pipe, async_backtick
 from ..graph import Graph
 
 import json
+import re
 
 __all__ = ('LsBlk',)
 
 
 class LsBlk(object):
 
-    __slots__ = ('_content',)
+    __slots__ = ('_content', '_flat')
 
-    def __init__(self, content):
+    # separators between consecutive devices in "blockdevices" array
+    _separators = re.compile(r'[\s,]*')
+
+    def __init__(self, content, **kw):
         self._content = content
+        self._flat = kw.get('flat', False)
 
     @property
     def content(self):
         return self._content
 
-    def _graph_add(self, graph, device, parent=None, **kw):
+    @property
+    def flat(self):
+        """True if content is a flat list-mode (lsblk -l) output"""
+        return self._flat
+
+    @classmethod
+    def _graph_add(cls, graph, device, parent=None, **kw):
         keyattr = kw.get('keyattr', 'kname')
         key = device[keyattr]
         props = {k:  v for (k, v) in device.items() if k != 'children'}
         if not graph.has_node(key):
-            graph.add_node(key, blkdev_.BlkDev(props))
+            graph.add_node(key, cls._new_blkdev(props, **kw))
         else:
             graph.node(key).reappear(props)
         if parent is not None:
             graph.add_edge((parent[keyattr], key))
 
-    def _graph_add_walk(self, graph, device, parent=None, **kw):
-        self._graph_add(graph, device, parent, **kw)
+    @classmethod
+    def _new_blkdev(cls, properties, **kw):
+        table = kw.get('table')
+        if table is not None:
+            return table.add(properties)
+        return blkdev_.BlkDev(properties)
+
+    @classmethod
+    def _graph_add_walk(cls, graph, device, parent=None, **kw):
+        cls._graph_add(graph, device, parent, **kw)
         for child in device.get('children', []):
-            self._graph_add_walk(graph, child, device, **kw)
+            cls._graph_add_walk(graph, child, device, **kw)
+
+    @classmethod
+    def _graph_add_flat(cls, graph, devices, **kw):
+        # Each device line is added once, repeated lines (one per parent) only
+        # contribute their pkname. Edges are resolved after all the lines are
+        # read, parents missing in the output are skipped (as in tree mode).
+        keyattr = kw.get('keyattr', 'kname')
+        keys = dict()
+        parents = []
+        for device in devices:
+            key = device[keyattr]
+            if not graph.has_node(key):
+                graph.add_node(key, cls._new_blkdev(device, **kw))
+                keys[device['kname']] = key
+            else:
+                graph.node(key).evolve(device)
+            pkname = device.get('pkname')
+            if pkname is not None:
+                parents.append((pkname, key))
+        for (pkname, key) in parents:
+            if pkname in keys:
+                graph.add_edge((keys[pkname], key))
 
     def graph(self, **kw):
-        """Builds and returns graph with nodes representing block devices"""
+        """Builds and returns graph with nodes representing block devices.
+
+        If a BlkDevTable is passed as ``table``, the device properties are
+        stored in the table and nodes are its row views.
+        """
         graph = Graph(**kw)
-        for device in self._content['blockdevices']:
-            self._graph_add_walk(graph, device, **kw)
+        if self._flat:
+            self._graph_add_flat(graph, self._content['blockdevices'], **kw)
+        else:
+            for device in self._content['blockdevices']:
+                self._graph_add_walk(graph, device, **kw)
         return graph
 
     @staticmethod
@@ -50,16 +98,10 @@ class LsBlk(object):
         If ``devices`` is missing (or None), the program will be invoked
         without device arguments. The program is ran with -J, -O, -p flags
         (json output with all fields and full device paths instead of short
-        names). Additional flags may be provided via ``flags`` parameter.
+        names). Additional flags may be provided via ``flags`` parameter. With
+        ``flat=True``, the program is also given -l flag (list mode output).
         """
-        if devices is None:
-            devices = []
-        elif isinstance(devices, str):
-            devices = [devices]
-        if flags is None:
-            flags = []
-        lsblk = kw.get('lsblk', 'lsblk')
-        return backtick([lsblk, '-J', '-O', '-p'] + flags + devices)
+        return backtick(LsBlk._command(devices, flags, **kw))
 
     @staticmethod
     def new(devices=None, flags=None, **kw):
@@ -67,6 +109,96 @@ class LsBlk(object):
            interpreting the output of lsblk(8) program."""
         output = LsBlk.run(devices, flags, **kw)
         content = json.loads(output)
-        return LsBlk(content)
+        return LsBlk(content, flat=kw.get('flat', False))
+
+    @staticmethod
+    async def anew(devices=None, flags=None, **kw):
+        """Asynchronous variant of new(), to be awaited in asyncio.
+
+        The lsblk(8) program is ran with async_backtick(), or with
+        ``runner.backtick()`` if a CommandRunner is given as ``runner``, so
+        it may run concurrently with other collectors.
+        """
+        runner = kw.get('runner')
+        run = async_backtick if runner is None else runner.backtick
+        output = await run(LsBlk._command(devices, flags, **kw))
+        content = json.loads(output)
+        return LsBlk(content, flat=kw.get('flat', False))
+
+    @staticmethod
+    def new_graph(devices=None, flags=None, **kw):
+        """Runs lsblk(8) for specified devices and builds graph of its output.
+
+        Unlike ``LsBlk.new(devices, flags, **kw).graph(**kw)``, the output is
+        read from a pipe and the graph is built incrementally, one top-level
+        device at a time, so neither the whole output nor its parsed content
+        is kept in memory.
+        """
+        with pipe(LsBlk._command(devices, flags, **kw)) as stream:
+            return LsBlk.graph_from_stream(stream, **kw)
+
+    @classmethod
+    def graph_from_stream(cls, stream, **kw):
+        """Builds graph from lsblk JSON output read from a text stream"""
+        graph = Graph(**kw)
+        devices = cls.iter_blockdevices(stream, **kw)
+        if kw.get('flat', False):
+            cls._graph_add_flat(graph, devices, **kw)
+        else:
+            for device in devices:
+                cls._graph_add_walk(graph, device, **kw)
+        return graph
+
+    @classmethod
+    def iter_blockdevices(cls, stream, **kw):
+        """Yields top-level devices from lsblk JSON output read from stream.
+
+        Each device (with its children) is decoded as soon as its JSON object
+        is complete, and the text consumed so far is then dropped.
+        """
+        chunk_size = kw.get('chunk_size', 65536)
+        decoder = json.JSONDecoder()
+        buf = ''
+        # skip everything up to the opening bracket of "blockdevices" array
+        while True:
+            start = buf.find('"blockdevices"')
+            if start >= 0:
+                start = buf.find('[', start)
+            if start >= 0:
+                buf = buf[start+1:]
+                break
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise ValueError('"blockdevices" not found in lsblk output')
+            buf += chunk
+        while True:
+            pos = cls._separators.match(buf).end()
+            if buf[pos:pos+1] == ']':
+                return
+            try:
+                device, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # incomplete object, unless there is nothing more to read;
+                # buffer grows geometrically to bound the number of retries
+                chunk = stream.read(max(chunk_size, len(buf)))
+                if not chunk:
+                    raise
+                buf += chunk
+                continue
+            buf = buf[end:]
+            yield device
+
+    @staticmethod
+    def _command(devices=None, flags=None, **kw):
+        if devices is None:
+            devices = []
+        elif isinstance(devices, str):
+            devices = [devices]
+        if flags is None:
+            flags = []
+        lsblk = kw.get('lsblk', 'lsblk')
+        if kw.get('flat', False):
+            flags = ['-l'] + flags
+        return [lsblk, '-J', '-O', '-p'] + flags + devices
 
 # vim: set ft=python et ts=4 sw=4:
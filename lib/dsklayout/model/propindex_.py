@@ -0,0 +1,104 @@
+# -*- coding: utf8 -*-
+
+from ..graph import Index
+
+import collections.abc
+
+__all__ = ('PropertyIndex',)
+
+
+class PropertyIndex(Index):
+    """An index mapping values of selected device properties to nodes.
+
+       For each indexed property (lsblk name, such as 'uuid' or 'fstype') the
+       index keeps a ``{value: {node, ...}}`` dictionary built from node data
+       (BlkDev objects or plain property dictionaries). Once attached to a
+       graph (``graph.indexes.add(PropertyIndex())``), it's updated by
+       add_node() and del_node(). Node data modified in place is not tracked,
+       re-add the node or rebuild the index after such changes.
+    """
+
+    __slots__ = ('_keys', '_nodes', '_entries')
+
+    _default_keys = ('uuid', 'partuuid', 'label', 'partlabel', 'wwn',
+                     'serial', 'fstype', 'type')
+
+    # fstab/crypttab tags -> indexed properties
+    _tags = {
+        'UUID': 'uuid',
+        'PARTUUID': 'partuuid',
+        'LABEL': 'label',
+        'PARTLABEL': 'partlabel',
+    }
+
+    def __init__(self, keys=None):
+        if keys is None:
+            keys = self._default_keys
+        self._keys = tuple(keys)
+        self._clear()
+
+    @property
+    def keys(self):
+        """Names of the indexed properties"""
+        return self._keys
+
+    def rebuild(self, graph):
+        """Builds the index from scratch for the given graph"""
+        self._clear()
+        for (node, data) in graph.nodes.items():
+            self._insert(node, data)
+
+    def node_added(self, graph, node):
+        self._remove(node)
+        self._insert(node, graph.node(node))
+
+    def node_deleted(self, graph, node):
+        self._remove(node)
+
+    def lookup(self, key, value):
+        """Returns a set of nodes having property key equal to value"""
+        return set(self._nodes[key].get(value, ()))
+
+    def values(self, key):
+        """Returns a set of distinct (not None) values of property key"""
+        return set(self._nodes[key])
+
+    def resolve(self, spec):
+        """Returns a set of nodes referred to by a tag, e.g. 'UUID=1234'.
+
+        The tags are same as in fstab(5): UUID, PARTUUID, LABEL, PARTLABEL.
+        """
+        tag, sep, value = spec.partition('=')
+        key = self._tags.get(tag)
+        if not sep or key is None:
+            raise ValueError("unsupported device reference: %s" % repr(spec))
+        return self.lookup(key, value.strip('"'))
+
+    def _clear(self):
+        self._nodes = {k: dict() for k in self._keys}
+        self._entries = dict()
+
+    def _insert(self, node, data):
+        entries = list(self._indexed_values(data))
+        for (key, value) in entries:
+            self._nodes[key].setdefault(value, set()).add(node)
+        if entries:
+            self._entries[node] = entries
+
+    def _remove(self, node):
+        for (key, value) in self._entries.pop(node, ()):
+            nodes = self._nodes[key][value]
+            nodes.discard(node)
+            if not nodes:
+                del self._nodes[key][value]
+
+    def _indexed_values(self, data):
+        props = getattr(data, 'properties', data)
+        if not isinstance(props, collections.abc.Mapping):
+            return
+        for key in self._keys:
+            value = props.get(key)
+            if value is not None:
+                yield (key, value)
+
+# vim: set ft=python et ts=4 sw=4:
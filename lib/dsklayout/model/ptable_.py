@@ -0,0 +1,355 @@
+# -*- coding: utf8 -*-
+
+from . import exceptions_
+from . import propindex_
+
+import concurrent.futures
+import struct
+import uuid
+import zlib
+import os
+
+__all__ = ('Partition', 'PartitionTable')
+
+
+class Partition(object):
+    """A partition found in a partition table.
+
+       Values are given in the form used by lsblk(8): ``type`` is a lowercase
+       GUID (GPT) or a hexadecimal id such as '0x83' (MBR), and ``uuid`` is
+       the PARTUUID. The ``start`` and ``size`` are given in sectors.
+    """
+
+    __slots__ = ('_number', '_start', '_size', '_type', '_uuid', '_name',
+                 '_flags')
+
+    def __init__(self, number, start, size, type, uuid, name=None, flags=0):
+        self._number = number
+        self._start = start
+        self._size = size
+        self._type = type
+        self._uuid = uuid
+        self._name = name
+        self._flags = flags
+
+    @property
+    def number(self):
+        """Partition number (1-4 primary, 5+ logical in MBR)"""
+        return self._number
+
+    @property
+    def start(self):
+        """First sector of the partition"""
+        return self._start
+
+    @property
+    def size(self):
+        """Number of sectors in the partition"""
+        return self._size
+
+    @property
+    def type(self):
+        """Partition type (lsblk's parttype)"""
+        return self._type
+
+    @property
+    def uuid(self):
+        """Partition UUID (lsblk's partuuid)"""
+        return self._uuid
+
+    @property
+    def name(self):
+        """Partition name (GPT only, lsblk's partlabel)"""
+        return self._name
+
+    @property
+    def flags(self):
+        """GPT attribute bits, or MBR boot indicator (0x80)"""
+        return self._flags
+
+    def __repr__(self):
+        return "%s(%d, %d, %d, %s, %s)" % (self.__class__.__name__,
+                                           self._number, self._start,
+                                           self._size, repr(self._type),
+                                           repr(self._uuid))
+
+
+class PartitionTable(object):
+    """A GPT or MBR partition table read directly from a disk or an image.
+
+       The protective MBR, GPT headers and partition entry arrays are read
+       with os.pread() into preallocated buffers and their CRC32 sums are
+       verified. If the primary GPT header (or its entries) is damaged, the
+       backup one is used instead. Logical partitions of MBR are read by
+       following the chain of extended boot records.
+    """
+
+    __slots__ = ('_device', '_label', '_uuid', '_sector_size', '_partitions',
+                 '_primary_valid', '_backup_valid')
+
+    _mbr_entry = struct.Struct('<B3sB3sII')
+    _gpt_header = struct.Struct('<8sIIIIQQQQ16sQIII')
+    _gpt_entry = struct.Struct('<16s16sQQQ72s')
+    _gpt_signature = b'EFI PART'
+    _mbr_signature = b'\x55\xaa'
+    _protective_type = 0xee
+    _extended_types = (0x05, 0x0f, 0x85)
+    _sector_sizes = (512, 4096)
+    # MBR, GPT header and 128 entries of 128 bytes (with 512 byte sectors)
+    _head_sectors = 34
+
+    def __init__(self, device, label, uuid, sector_size, partitions, **kw):
+        self._device = device
+        self._label = label
+        self._uuid = uuid
+        self._sector_size = sector_size
+        self._partitions = list(partitions)
+        self._primary_valid = kw.get('primary_valid', True)
+        self._backup_valid = kw.get('backup_valid', True)
+
+    @property
+    def device(self):
+        """The disk or image file the table was read from"""
+        return self._device
+
+    @property
+    def label(self):
+        """Partition table type, 'gpt' or 'dos' (lsblk's pttype)"""
+        return self._label
+
+    @property
+    def uuid(self):
+        """Disk GUID (GPT) or hexadecimal disk signature (lsblk's ptuuid)"""
+        return self._uuid
+
+    @property
+    def sector_size(self):
+        """Logical sector size the table was read with"""
+        return self._sector_size
+
+    @property
+    def partitions(self):
+        """A list of partitions, ordered by partition number"""
+        return self._partitions
+
+    @property
+    def primary_valid(self):
+        """False if the primary GPT header or entries are damaged"""
+        return self._primary_valid
+
+    @property
+    def backup_valid(self):
+        """False if the backup GPT header or entries are damaged"""
+        return self._backup_valid
+
+    def partition(self, number):
+        """Returns partition with given number"""
+        for partition in self._partitions:
+            if partition.number == number:
+                return partition
+        raise KeyError(number)
+
+    def link(self, graph):
+        """Returns a list of (partition, node) pairs linking partitions to
+           graph nodes (BlkDevs) by PARTUUID.
+
+        The node is None for partitions not present in graph. A PropertyIndex
+        attached to graph is used for lookups, if there is one.
+        """
+        lookup = self._partuuid_lookup(graph)
+        return [(p, lookup(p.uuid)) for p in self._partitions]
+
+    @classmethod
+    def read(cls, device, **kw):
+        """Reads partition table from a disk or image file.
+
+        The ``sector_size`` is detected for GPT (512 or 4096), and defaults
+        to 512 for MBR. It may be given as a keyword argument.
+        """
+        fd = os.open(device, os.O_RDONLY)
+        try:
+            return cls._read(fd, device, kw.get('sector_size'))
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def read_all(cls, devices, jobs=4, **kw):
+        """Reads partition tables of multiple disks concurrently.
+
+        Returns a ``{device: table}`` dict, where table is a PartitionTable
+        or the exception (OSError or PartitionTableError) raised by read().
+        """
+        devices = list(devices)
+        results = dict()
+        with concurrent.futures.ThreadPoolExecutor(max(1, jobs)) as executor:
+            futures = {executor.submit(cls.read, d, **kw): d for d in devices}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except (OSError, exceptions_.PartitionTableError) as e:
+                    results[futures[future]] = e
+        return results
+
+    @classmethod
+    def _read(cls, fd, device, sector_size):
+        sizes = cls._sector_sizes if sector_size is None else (sector_size,)
+        head = bytearray(cls._head_sectors * max(sizes))
+        head = memoryview(head)[:cls._pread(fd, head, 0)]
+        if len(head) < 512 or head[510:512] != cls._mbr_signature:
+            msg = "%s: no partition table found" % device
+            raise exceptions_.PartitionTableError(msg)
+        entries = cls._mbr_entries(head)
+        if any(e[1] == cls._protective_type for e in entries):
+            for size in sizes:
+                if head[size:size+8] == cls._gpt_signature:
+                    return cls._read_gpt(fd, device, size, head)
+            for size in sizes:  # primary header lost, look for the backup
+                if cls._gpt(fd, cls._last_lba(fd, size), size, head):
+                    return cls._read_gpt(fd, device, size, head)
+            msg = "%s: protective MBR without GPT header" % device
+            raise exceptions_.PartitionTableError(msg)
+        return cls._read_mbr(fd, device, sizes[0], head, entries)
+
+    @classmethod
+    def _read_gpt(cls, fd, device, sector_size, head):
+        primary = cls._gpt(fd, 1, sector_size, head)
+        if primary is not None:
+            backup_lba = primary[0][6]
+        else:
+            backup_lba = cls._last_lba(fd, sector_size)
+        backup = cls._gpt(fd, backup_lba, sector_size, head)
+        if primary is None and backup is None:
+            msg = "%s: both GPT headers are damaged" % device
+            raise exceptions_.PartitionTableError(msg)
+        header, entries = primary or backup
+        disk_guid, count, entry_size = header[9], header[11], header[12]
+        partitions = []
+        for i in range(count):
+            fields = cls._gpt_entry.unpack_from(entries, i * entry_size)
+            (type, guid, first, last, attrs, name) = fields
+            if not any(type):
+                continue
+            name = name.decode('utf-16-le', 'replace').split('\0', 1)[0]
+            partitions.append(Partition(i + 1, first, last - first + 1,
+                                        cls._guid(type), cls._guid(guid),
+                                        name, attrs))
+        return cls(device, 'gpt', cls._guid(disk_guid), sector_size,
+                   partitions, primary_valid=primary is not None,
+                   backup_valid=backup is not None)
+
+    @classmethod
+    def _gpt(cls, fd, lba, sector_size, head):
+        # returns (header fields, entries) if GPT header at lba is valid
+        raw = cls._read_at(fd, lba * sector_size, sector_size, head)
+        size = cls._gpt_header.size
+        if len(raw) < size or raw[:8] != cls._gpt_signature:
+            return None
+        header = cls._gpt_header.unpack_from(raw)
+        (header_size, header_crc, my_lba) = (header[2], header[3], header[5])
+        (entries_lba, count, entry_size, entries_crc) = header[10:14]
+        if not size <= header_size <= len(raw) or my_lba != lba:
+            return None
+        check = bytearray(raw[:header_size])
+        check[16:20] = bytes(4)
+        if zlib.crc32(check) != header_crc:
+            return None
+        if entry_size < cls._gpt_entry.size or count * entry_size > 2**24:
+            return None
+        entries = cls._read_at(fd, entries_lba * sector_size,
+                               count * entry_size, head)
+        if zlib.crc32(entries) != entries_crc:
+            return None
+        return (header, entries)
+
+    @classmethod
+    def _read_mbr(cls, fd, device, sector_size, head, entries):
+        signature = struct.unpack_from('<I', head, 440)[0]
+        partitions = []
+        for (i, (status, type, start, size)) in enumerate(entries):
+            if not type:
+                continue
+            partitions.append(cls._mbr_partition(signature, i + 1, status,
+                                                 type, start, size))
+            if type in cls._extended_types:
+                partitions.extend(cls._logical_partitions(fd, signature,
+                                                          start, sector_size))
+        return cls(device, 'dos', '%08x' % signature, sector_size, partitions)
+
+    @classmethod
+    def _logical_partitions(cls, fd, signature, extended, sector_size):
+        # Each EBR describes a logical partition (relative to the EBR) and
+        # points to the next EBR (relative to the extended partition).
+        partitions = []
+        buf = bytearray(512)
+        ebr, number, seen = extended, 5, set()
+        while ebr not in seen:
+            seen.add(ebr)
+            if cls._pread(fd, buf, ebr * sector_size) < len(buf) \
+                    or buf[510:512] != cls._mbr_signature:
+                break
+            entries = cls._mbr_entries(buf)
+            (status, type, start, size) = entries[0]
+            if type:
+                partitions.append(cls._mbr_partition(signature, number,
+                                                     status, type,
+                                                     ebr + start, size))
+                number += 1
+            (_, type, start, _) = entries[1]
+            if not type or not start:
+                break
+            ebr = extended + start
+        return partitions
+
+    @classmethod
+    def _mbr_partition(cls, signature, number, status, type, start, size):
+        uuid = '%08x-%02x' % (signature, number)
+        return Partition(number, start, size, '0x%x' % type, uuid,
+                         flags=status & 0x80)
+
+    @classmethod
+    def _mbr_entries(cls, sector):
+        entries = []
+        for i in range(4):
+            fields = cls._mbr_entry.unpack_from(sector, 446 + 16 * i)
+            (status, _, type, _, start, size) = fields
+            entries.append((status, type, start, size))
+        return entries
+
+    @classmethod
+    def _partuuid_lookup(cls, graph):
+        for index in graph.indexes:
+            if isinstance(index, propindex_.PropertyIndex) \
+                    and 'partuuid' in index.keys:
+                return lambda u: next(iter(index.lookup('partuuid', u)), None)
+        nodes = dict()
+        for (node, data) in graph.nodes.items():
+            props = getattr(data, 'properties', data) or {}
+            if props.get('partuuid') is not None:
+                nodes[props['partuuid'].lower()] = node
+        return nodes.get
+
+    @classmethod
+    def _guid(cls, raw):
+        return str(uuid.UUID(bytes_le=bytes(raw)))
+
+    @classmethod
+    def _last_lba(cls, fd, sector_size):
+        return os.lseek(fd, 0, os.SEEK_END) // sector_size - 1
+
+    @classmethod
+    def _read_at(cls, fd, offset, size, head):
+        # reuses data already read into head buffer
+        if offset + size <= len(head):
+            return head[offset:offset+size]
+        buf = bytearray(size)
+        return memoryview(buf)[:cls._pread(fd, buf, offset)]
+
+    @classmethod
+    def _pread(cls, fd, buf, offset):
+        if hasattr(os, 'preadv'):
+            return os.preadv(fd, [buf], offset)
+        data = os.pread(fd, len(buf), offset)
+        buf[:len(data)] = data
+        return len(data)
+
+# vim: set ft=python et ts=4 sw=4:
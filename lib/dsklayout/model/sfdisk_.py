@@ -0,0 +1,62 @@
+# -*- coding: utf8 -*-
+
+from ..util import backtick
+
+import subprocess
+
+__all__ = ('SfDisk',)
+
+
+class SfDisk(object):
+    """Partition table of a disk, as dumped by ``sfdisk --dump``.
+
+       The dump is kept as text, in a form accepted back by sfdisk(8) when
+       the partition table is to be restored.
+    """
+
+    __slots__ = ('_device', '_dump')
+
+    def __init__(self, device, dump):
+        self._device = device
+        self._dump = dump
+
+    @property
+    def device(self):
+        """The disk the partition table was read from"""
+        return self._device
+
+    @property
+    def dump(self):
+        """The output of ``sfdisk --dump``"""
+        return self._dump
+
+    def restore(self, device=None, **kw):
+        """Writes the partition table back to disk with sfdisk(8).
+
+        The table is written to the disk it was read from, unless another
+        device is given. The program may be changed with ``sfdisk`` keyword
+        argument.
+        """
+        device = self._device if device is None else device
+        subprocess.run([kw.get('sfdisk', 'sfdisk'), device], input=self._dump,
+                       stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                       universal_newlines=True, check=True)
+
+    @staticmethod
+    def run(device, **kw):
+        """Runs ``sfdisk --dump`` for device and returns its output.
+
+        The program may be changed with ``sfdisk`` keyword argument.
+        """
+        return backtick(SfDisk._command(device, **kw))
+
+    @staticmethod
+    def new(device, **kw):
+        """Creates a new instance of SfDisk by running sfdisk(8)"""
+        return SfDisk(device, SfDisk.run(device, **kw))
+
+    @staticmethod
+    def _command(device, **kw):
+        return [kw.get('sfdisk', 'sfdisk'), '--dump', device]
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,412 @@
+# -*- coding: utf8 -*-
+
+from . import lsblk_
+
+import collections
+import functools
+import grp
+import locale
+import os
+import pwd
+import re
+import stat
+
+__all__ = ('SysfsBlk',)
+
+
+class SysfsBlk(object):
+    """Block devices read directly from sysfs, without running lsblk(8).
+
+       The content has same form as flat (list mode) lsblk output, i.e. a
+       ``{'blockdevices': [...]}`` dict with one entry per device and parent,
+       so the resulting graph is built same way as for LsBlk. Property values
+       are formatted as by ``lsblk -J -O -p`` (sizes are human-readable, such
+       as '3,8G'). Properties maintained by udev (fstype, uuid, label, ...)
+       are taken from the udev database, mount points from mountinfo and
+       owner, group and mode from device nodes. The hotplug, tran and
+       subsystems properties are not determined and are None, as are the
+       udev ones when the udev database has no entry for a device.
+    """
+
+    __slots__ = ('_content',)
+
+    # lsblk property -> attribute file, relative to device's sysfs directory
+    _attributes = (
+        ('maj:min',     'dev'),
+        ('size',        'size'),
+        ('ro',          'ro'),
+        ('rm',          'removable'),
+        ('alignment',   'alignment_offset'),
+        ('disc-aln',    'discard_alignment'),
+        ('ra',          'queue/read_ahead_kb'),
+        ('min-io',      'queue/minimum_io_size'),
+        ('opt-io',      'queue/optimal_io_size'),
+        ('phy-sec',     'queue/physical_block_size'),
+        ('log-sec',     'queue/logical_block_size'),
+        ('rota',        'queue/rotational'),
+        ('sched',       'queue/scheduler'),
+        ('rq-size',     'queue/nr_requests'),
+        ('disc-gran',   'queue/discard_granularity'),
+        ('disc-max',    'queue/discard_max_bytes'),
+        ('disc-zero',   'queue/discard_zeroes_data'),
+        ('wsame',       'queue/write_same_max_bytes'),
+        ('rand',        'queue/add_random'),
+        ('model',       'device/model'),
+        ('serial',      'device/serial'),
+        ('state',       'device/state'),
+        ('rev',         'device/rev'),
+        ('vendor',      'device/vendor'),
+        ('wwn',         'device/wwid'),
+    )
+
+    # all the files read for a device
+    _files = tuple(f for (_, f) in _attributes) + \
+        ('partition', 'uevent', 'dm/name', 'dm/uuid', 'dm/suspended',
+         'md/level')
+
+    # files a partition shares with its disk (read from disk's directory)
+    _inherited = tuple(f for f in _files if f.startswith('queue/')) + \
+        ('removable',)
+
+    # properties shown by lsblk as human-readable sizes
+    _sizes = ('size', 'disc-gran', 'disc-max', 'wsame')
+
+    # lsblk property -> udev properties, the first one present is used
+    _udev = (
+        ('fstype',      ('ID_FS_TYPE',)),
+        ('label',       ('ID_FS_LABEL_ENC',)),
+        ('uuid',        ('ID_FS_UUID_ENC',)),
+        ('parttype',    ('ID_PART_ENTRY_TYPE',)),
+        ('partlabel',   ('ID_PART_ENTRY_NAME',)),
+        ('partuuid',    ('ID_PART_ENTRY_UUID',)),
+        ('partflags',   ('ID_PART_ENTRY_FLAGS',)),
+        ('wwn',         ('ID_WWN_WITH_EXTENSION', 'ID_WWN')),
+        ('serial',      ('ID_SCSI_SERIAL', 'ID_SERIAL_SHORT')),
+    )
+
+    # properties not read from attribute files (None, unless found later)
+    _other = ('fstype', 'mountpoint', 'label', 'uuid', 'parttype',
+              'partuuid', 'partflags', 'hotplug', 'owner', 'group', 'mode',
+              'hctl', 'tran', 'subsystems')
+
+    _hctl_re = re.compile(r'^\d+:\d+:\d+:\d+$')
+    _hex_re = re.compile(br'\\x([0-9a-fA-F]{2})')
+    _octal_re = re.compile(r'\\([0-7]{3})')
+
+    # device-mapper uuid prefix -> device type
+    _dm_types = (('CRYPT-', 'crypt'), ('LVM-', 'lvm'), ('mpath-', 'mpath'),
+                 ('part', 'part'))
+
+    def __init__(self, content):
+        self._content = content
+
+    @property
+    def content(self):
+        return self._content
+
+    def graph(self, **kw):
+        """Builds and returns graph with nodes representing block devices"""
+        return lsblk_.LsBlk(self._content, flat=True).graph(**kw)
+
+    @classmethod
+    def read(cls, devices=None, **kw):
+        """Reads block devices from sysfs and returns content (see SysfsBlk).
+
+        If ``devices`` are given, only these devices and their descendants
+        (holders and partitions) are read. The locations read may be changed
+        with keyword arguments ``sysfs`` (defaults to '/sys'), ``udev``
+        (udev database, '/run/udev/data'), ``mountinfo``
+        ('/proc/self/mountinfo') and ``devfs`` ('/dev'). The decimal point of
+        sizes is ``decimal_point``, by default the one of current locale.
+        """
+        sysfs = kw.get('sysfs', '/sys')
+        classdir = os.path.join(sysfs, 'class', 'block')
+        mounts = cls._read_mounts(kw.get('mountinfo', '/proc/self/mountinfo'))
+        if devices is None:
+            # start with the top-level devices, to follow lsblk's order
+            names = [n for n in sorted(os.listdir(classdir))
+                     if cls._is_toplevel(os.path.join(classdir, n))]
+        else:
+            if isinstance(devices, str):
+                devices = [devices]
+            names = [cls._device_name(sysfs, d) for d in devices]
+        entries = []
+        seen = set()
+        pending = list(reversed(names))
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            path = os.path.join(classdir, name)
+            values = cls._read_files(path, cls._files)
+            parents = cls._parents(path, values)
+            if values['partition'] is not None:
+                disk = os.path.join(classdir, parents[0])
+                inherited = cls._read_files(disk, cls._inherited)
+                values.update((f, v) for (f, v) in inherited.items()
+                              if values[f] is None)
+            props = cls._device_properties(name, values, **kw)
+            props['hctl'] = cls._hctl(path, values)
+            props['mountpoint'] = mounts.get(props['maj:min'])
+            props.update(cls._node_properties(props['kname'], **kw))
+            for parent in parents or [None]:
+                entry = dict(props)
+                entry['pkname'] = cls._kname(parent) if parent else None
+                entries.append(entry)
+            pending.extend(reversed(cls._children(path, name)))
+        return {'blockdevices': entries}
+
+    @classmethod
+    def new(cls, devices=None, **kw):
+        """Creates a new instance of SysfsBlk for specified devices by reading
+           sysfs."""
+        return cls(cls.read(devices, **kw))
+
+    @classmethod
+    def _device_name(cls, sysfs, device):
+        # sda, /dev/sda or any other path to device node (/dev/mapper/foo)
+        name = os.path.basename(device)
+        if os.path.exists(os.path.join(sysfs, 'class', 'block', name)):
+            return name
+        rdev = os.stat(device).st_rdev
+        devno = '%d:%d' % (os.major(rdev), os.minor(rdev))
+        path = os.path.realpath(os.path.join(sysfs, 'dev', 'block', devno))
+        return os.path.basename(path)
+
+    @classmethod
+    def _kname(cls, name):
+        return '/dev/%s' % name.replace('!', '/')
+
+    @classmethod
+    def _device_properties(cls, name, values, **kw):
+        props = dict.fromkeys(cls._other)
+        for (key, file) in cls._attributes:
+            props[key] = values[file]
+        if props['size'] is not None:
+            # sysfs gives the size in 512-byte sectors
+            props['size'] = str(int(props['size']) * 512)
+        point = kw.get('decimal_point') or \
+            locale.localeconv()['decimal_point'] or '.'
+        for key in cls._sizes:
+            if props[key] is not None:
+                props[key] = cls._human_size(int(props[key]), point)
+        if props['sched'] is not None:
+            props['sched'] = cls._selected_scheduler(props['sched'])
+        if values['partition'] is not None:
+            # lsblk shows device/ attributes of whole disks only
+            for key in ('model', 'serial', 'state', 'rev', 'vendor', 'wwn'):
+                props[key] = None
+        elif values['dm/suspended'] is not None:
+            suspended = values['dm/suspended'] == '1'
+            props['state'] = 'suspended' if suspended else 'running'
+        uevent = cls._key_values(values['uevent'] or '')
+        props['kname'] = props['name'] = cls._kname(name)
+        if values['dm/name'] is not None:
+            props['name'] = '/dev/mapper/%s' % values['dm/name']
+        props['partlabel'] = uevent.get('PARTNAME')
+        props['type'] = cls._device_type(name, values)
+        udev = cls._read_udev(kw.get('udev', '/run/udev/data'),
+                              props['maj:min'])
+        for (key, names) in cls._udev:
+            if values['partition'] is not None and key in ('serial', 'wwn'):
+                continue
+            value = next((udev[n] for n in names if n in udev), None)
+            if value is not None:
+                props[key] = cls._unhexmangle(value)
+        return props
+
+    @classmethod
+    def _human_size(cls, nbytes, point='.'):
+        # same as size_to_human_string() of util-linux, used by lsblk(8)
+        exp = 0
+        while exp < 60 and nbytes >= 1 << (exp + 10):
+            exp += 10
+        dec = nbytes >> exp
+        frac = nbytes & ((1 << exp) - 1)
+        suffix = 'BKMGTPE'[exp // 10]
+        if frac:
+            # round to one digit, in 1/1024 units of the suffix
+            frac = ((frac >> (exp - 10)) + 50) // 100
+            if frac == 10:
+                dec += 1
+                frac = 0
+        if frac:
+            return '%d%s%d%s' % (dec, point, frac, suffix)
+        return '%d%s' % (dec, suffix)
+
+    @classmethod
+    def _hctl(cls, path, values):
+        # SCSI devices are linked to their H:C:T:L directory
+        if values['partition'] is not None:
+            return None
+        try:
+            link = os.readlink(os.path.join(path, 'device'))
+        except OSError:
+            return None
+        hctl = os.path.basename(link)
+        return hctl if cls._hctl_re.match(hctl) else None
+
+    @classmethod
+    def _node_properties(cls, kname, **kw):
+        devfs = kw.get('devfs', '/dev')
+        try:
+            st = os.stat(os.path.join(devfs, os.path.relpath(kname, '/dev')))
+        except OSError:
+            return {}
+        try:
+            owner = pwd.getpwuid(st.st_uid).pw_name
+        except KeyError:
+            owner = str(st.st_uid)
+        try:
+            group = grp.getgrgid(st.st_gid).gr_name
+        except KeyError:
+            group = str(st.st_gid)
+        return {'owner': owner, 'group': group,
+                'mode': stat.filemode(st.st_mode)}
+
+    @classmethod
+    def _read_udev(cls, udev, devno):
+        # udev database entry, with "E:KEY=value" lines for properties
+        try:
+            with open(os.path.join(udev, 'b%s' % devno)) as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return {}
+        return cls._key_values(line[2:] for line in lines
+                               if line.startswith('E:'))
+
+    @classmethod
+    def _read_mounts(cls, mountinfo):
+        # maj:min -> mount point, the first one listed in mountinfo(5)
+        mounts = dict()
+        try:
+            with open(mountinfo) as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return mounts
+        for line in lines:
+            fields = line.split()
+            if len(fields) > 4:
+                mounts.setdefault(fields[2], cls._unoctal(fields[4]))
+        return mounts
+
+    @classmethod
+    def _key_values(cls, lines):
+        if isinstance(lines, str):
+            lines = lines.splitlines()
+        return dict(line.split('=', 1) for line in lines if '=' in line)
+
+    @classmethod
+    def _unhexmangle(cls, value):
+        # "\x20" escapes, as in udev's *_ENC properties
+        data = cls._hex_re.sub(lambda m: bytes([int(m.group(1), 16)]),
+                               value.encode('utf8'))
+        return data.decode('utf8', 'replace')
+
+    @classmethod
+    def _unoctal(cls, value):
+        # "\040" escapes, as in mountinfo
+        return cls._octal_re.sub(lambda m: chr(int(m.group(1), 8)), value)
+
+    @classmethod
+    def _device_type(cls, name, values):
+        if values['partition'] is not None:
+            return 'part'
+        if values['dm/name'] is not None:
+            uuid = values['dm/uuid'] or ''
+            for (prefix, type) in cls._dm_types:
+                if uuid.startswith(prefix):
+                    return type
+            return 'dm'
+        if values['md/level'] is not None:
+            return values['md/level']
+        if name.startswith('loop'):
+            return 'loop'
+        if name.startswith('sr'):
+            return 'rom'
+        return 'disk'
+
+    @classmethod
+    def _selected_scheduler(cls, value):
+        # e.g. "noop deadline [cfq]"
+        for word in value.split():
+            if word.startswith('[') and word.endswith(']'):
+                return word[1:-1]
+        return value or None
+
+    @classmethod
+    def _is_toplevel(cls, path):
+        if os.path.exists(os.path.join(path, 'partition')):
+            return False
+        return not cls._list_dir(os.path.join(path, 'slaves'))
+
+    @classmethod
+    def _parents(cls, path, values):
+        if values['partition'] is not None:
+            # partition's directory is nested in its disk's directory
+            try:
+                disk = os.path.dirname(os.readlink(path))
+            except OSError:
+                disk = os.path.dirname(os.path.realpath(path))
+            return [os.path.basename(disk)]
+        return cls._list_dir(os.path.join(path, 'slaves'))
+
+    @classmethod
+    def _children(cls, path, name):
+        # partitions are subdirectories named after the disk (sda1, md0p1)
+        partitions = [e for e in cls._list_dir(path) if e.startswith(name)
+                      and os.path.exists(os.path.join(path, e, 'partition'))]
+        return partitions + cls._list_dir(os.path.join(path, 'holders'))
+
+    @classmethod
+    def _list_dir(cls, path):
+        try:
+            return sorted(os.listdir(path))
+        except OSError:
+            return []
+
+    @classmethod
+    def _read_files(cls, path, files):
+        # Reads a batch of small attribute files with a single os.read()
+        # each; missing or unreadable attributes are None. Files are opened
+        # relative to directory descriptors, and whole groups of files in a
+        # missing subdirectory (dm/, md/, device/) are skipped at once.
+        values = dict.fromkeys(files)
+        for (head, group) in cls._group_files(files):
+            try:
+                dirfd = os.open(os.path.join(path, head), os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                for (file, tail) in group:
+                    values[file] = cls._read_file(tail, dirfd)
+            finally:
+                os.close(dirfd)
+        return values
+
+    @classmethod
+    @functools.lru_cache()
+    def _group_files(cls, files):
+        groups = collections.OrderedDict()
+        for file in files:
+            head, tail = os.path.split(file)
+            groups.setdefault(head, []).append((file, tail))
+        return tuple(groups.items())
+
+    @classmethod
+    def _read_file(cls, name, dirfd):
+        try:
+            fd = os.open(name, os.O_RDONLY, dir_fd=dirfd)
+        except OSError:
+            return None
+        try:
+            data = os.read(fd, 65536)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+        # only the newline is stripped, lsblk keeps the padding (model, ...)
+        return data.decode('utf8', 'replace').rstrip('\n')
+
+# vim: set ft=python et ts=4 sw=4:
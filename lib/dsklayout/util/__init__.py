@@ -1,10 +1,15 @@
 # -*- coding: utf8 -*-
 
 import subprocess
+import asyncio
+import contextlib
 import importlib
+import io
+import locale
+import tempfile
 import sys
 
-__all__ = ('backtick',)
+__all__ = ('backtick', 'pipe', 'async_backtick', 'CommandRunner')
 
 
 def backtick(cmd, input=None, timeout=None):
@@ -20,6 +25,152 @@ def backtick(cmd, input=None, timeout=None):
                                    timeout=timeout)
 
 
+@contextlib.contextmanager
+def pipe(cmd, timeout=None):
+    """Executes external command and yields a text stream of its output.
+
+    The output may be consumed incrementally while the command is running.
+    Once the context is left, the rest of the output is discarded and the
+    command is waited for. If it exits with non-zero exit status, a
+    ``CalledProcessError`` exception is raised (with stderr attached).
+
+    If an exception is raised within the context, e.g. because the output
+    of a failing command couldn't be parsed, and the command exits with
+    non-zero status, ``CalledProcessError`` is raised instead. A command
+    still running shortly after the exception is killed and the original
+    exception is propagated.
+    """
+    with tempfile.TemporaryFile() as stderr, \
+         subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr,
+                          universal_newlines=True) as process:
+        try:
+            yield process.stdout
+            while process.stdout.read(io.DEFAULT_BUFFER_SIZE):
+                pass
+            retcode = process.wait(timeout=timeout)
+        except BaseException:
+            retcode = _pipe_exit_status(process)
+            if retcode:
+                raise _called_process_error(retcode, cmd, stderr)
+            raise
+        if retcode:
+            raise _called_process_error(retcode, cmd, stderr)
+
+
+# how long pipe() waits for a command to exit after an exception
+_PIPE_GRACE = 0.2
+
+
+def _pipe_exit_status(process):
+    # exit status of a command that exits by itself, None if it's killed
+    try:
+        return process.wait(timeout=_PIPE_GRACE)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        return None
+
+
+def _called_process_error(retcode, cmd, stderr):
+    stderr.seek(0)
+    return subprocess.CalledProcessError(retcode, cmd,
+                                         stderr=stderr.read().decode())
+
+
+async def async_backtick(cmd, input=None, timeout=None):
+    """Executes external command in asyncio and returns its output.
+
+    An asynchronous counterpart of backtick(). If the command doesn't finish
+    within ``timeout`` seconds, it's killed and ``TimeoutExpired`` raised.
+    The command is also killed if the coroutine gets cancelled.
+    """
+    PIPE = subprocess.PIPE
+    stdin = PIPE if input is not None else None
+    process = await asyncio.create_subprocess_exec(*cmd, stdin=stdin,
+                                                   stdout=PIPE, stderr=PIPE)
+    encoding = locale.getpreferredencoding(False)
+    if input is not None:
+        input = input.encode(encoding)
+    try:
+        output, stderr = await asyncio.wait_for(process.communicate(input),
+                                                timeout)
+    except asyncio.TimeoutError:
+        await _async_kill(process)
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    except BaseException:
+        await _async_kill(process)
+        raise
+    output, stderr = output.decode(encoding), stderr.decode(encoding)
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd,
+                                            output=output, stderr=stderr)
+    return output
+
+
+async def _async_kill(process):
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+
+class CommandRunner(object):
+    """Runs external commands concurrently, at most ``limit`` at a time.
+
+       For example, outputs of several tools are collected with::
+
+           runner = CommandRunner(limit=4, timeout=30)
+           outputs = await runner.backticks([['blkid'], ['lsblk', '-J']])
+
+       If any of the commands fails, the remaining ones are cancelled (and
+       their processes killed) before the exception is propagated.
+    """
+
+    __slots__ = ('_limit', '_timeout', '_semaphore')
+
+    def __init__(self, limit=4, timeout=None):
+        self._limit = limit
+        self._timeout = timeout
+        self._semaphore = None
+
+    @property
+    def limit(self):
+        """Maximum number of commands running at once"""
+        return self._limit
+
+    @property
+    def timeout(self):
+        """Default timeout of a single command (in seconds)"""
+        return self._timeout
+
+    async def backtick(self, cmd, input=None, timeout=None):
+        """Executes command (see async_backtick), waiting for a free slot"""
+        if timeout is None:
+            timeout = self._timeout
+        if self._semaphore is None:
+            # created lazily, so that it belongs to the running event loop
+            self._semaphore = asyncio.Semaphore(self._limit)
+        async with self._semaphore:
+            return await async_backtick(cmd, input, timeout)
+
+    async def backticks(self, cmds):
+        """Executes commands concurrently and returns a list of outputs"""
+        return await self.gather(*(self.backtick(cmd) for cmd in cmds))
+
+    async def gather(self, *aws):
+        """Awaits all the awaitables, cancelling the rest if one fails"""
+        tasks = [asyncio.ensure_future(aw) for aw in aws]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+
 def inject_symbols_from_modules(target, modules, module_package=None, **kw):
     """Imports symbols from multiple modules. See inject_symbols_from_module"""
     for module in modules:
@@ -0,0 +1,5 @@
+#!/bin/sh
+
+SCRIPTDIR="`dirname $0`"
+
+(cd $SCRIPTDIR && for B in `find bench -name '*Bench.py' | sort`; do echo "== $B"; PYTHONPATH=lib python3 "$B" || exit 1; done)
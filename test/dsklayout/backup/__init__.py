@@ -0,0 +1,3 @@
+# -*- coding: utf8 -*-
+
+# vim: set ft=python et ts=4 sw=4:
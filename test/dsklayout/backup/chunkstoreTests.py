@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import tempfile
+import hashlib
+import shutil
+import os
+
+import dsklayout.backup.chunkstore_ as chunkstore_
+import dsklayout.backup.exceptions_ as exceptions_
+
+
+class Test__ChunkStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = chunkstore_.ChunkStore(os.path.join(self.tmpdir, 'store'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def files(self):
+        return [os.path.join(d, f) for (d, _, fs) in os.walk(self.store.directory)
+                for f in fs]
+
+    def test__directory(self):
+        self.assertEqual(self.store.directory, os.path.join(self.tmpdir, 'store'))
+
+    def test__digest(self):
+        self.assertEqual(chunkstore_.ChunkStore.digest(b'foo'),
+                         hashlib.sha256(b'foo').hexdigest())
+
+    def test__put__get(self):
+        digest = self.store.put(b'foo')
+        self.assertEqual(digest, hashlib.sha256(b'foo').hexdigest())
+        self.assertTrue(self.store.has(digest))
+        self.assertEqual(self.store.get(digest), b'foo')
+        self.assertEqual(self.store.path(digest),
+                         os.path.join(self.store.directory, digest[:2], digest))
+
+    def test__put__deduplicates(self):
+        first = self.store.put(b'foo')
+        mtime = os.stat(self.store.path(first)).st_mtime_ns
+        self.assertEqual(self.store.put(b'foo'), first)
+        self.assertEqual(os.stat(self.store.path(first)).st_mtime_ns, mtime)
+        self.store.put(b'bar')
+        self.assertEqual(len(self.files()), 2)
+
+    def test__has(self):
+        self.assertFalse(self.store.has(chunkstore_.ChunkStore.digest(b'x')))
+
+    def test__get__missing(self):
+        with self.assertRaises(OSError):
+            self.store.get(chunkstore_.ChunkStore.digest(b'x'))
+
+    def test__get__corrupted(self):
+        digest = self.store.put(b'foo')
+        with open(self.store.path(digest), 'wb') as f:
+            f.write(b'bar')
+        with self.assertRaises(exceptions_.CorruptedChunkError) as context:
+            self.store.get(digest)
+        self.assertEqual(str(context.exception), "corrupted chunk %s" % digest)
+        self.assertEqual(self.store.get(digest, verify=False), b'bar')
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
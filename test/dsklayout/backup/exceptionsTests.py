@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+
+import dsklayout.backup.exceptions_ as exceptions_
+
+class Test__CorruptedChunkError(unittest.TestCase):
+
+    def test__base(self):
+        self.assertIsInstance(exceptions_.CorruptedChunkError(), Exception)
+
+    def test__str(self):
+        self.assertEqual(str(exceptions_.CorruptedChunkError("foo bar")), "foo bar")
+
+class Test__RestoreError(unittest.TestCase):
+
+    def test__base(self):
+        self.assertIsInstance(exceptions_.RestoreError(), Exception)
+
+    def test__str(self):
+        self.assertEqual(str(exceptions_.RestoreError("foo bar")), "foo bar")
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
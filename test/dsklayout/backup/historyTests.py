@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import tempfile
+import shutil
+import json
+import os
+
+import dsklayout.backup.history_ as history_
+import dsklayout.model.lsblk_ as lsblk_
+import dsklayout.model.blkdev_ as blkdev_
+
+class Test__LayoutHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.history = history_.LayoutHistory(os.path.join(self.tmpdir, 'backup'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def graph(self):
+        mydir = os.path.dirname(__file__)
+        path = os.path.join(mydir, '..', 'model', 'fixtures', 'lsblk_1_all.json')
+        with open(path) as f:
+            return lsblk_.LsBlk(json.loads(f.read())).graph()
+
+    def files(self):
+        return sorted(os.listdir(self.history.directory))
+
+    def assertSameGraph(self, first, second):
+        self.assertEqual(set(first.edges), set(second.edges))
+        self.assertEqual({n: d.properties for (n, d) in first.nodes.items()},
+                         {n: d.properties for (n, d) in second.nodes.items()})
+
+    def test__empty(self):
+        self.assertEqual(self.history.diffs(), [])
+        self.assertFalse(self.history.has_full())
+
+    def test__write__full_first(self):
+        self.assertEqual(self.history.write(self.graph()), 'layout.json')
+        self.assertTrue(self.history.has_full())
+        self.assertSameGraph(self.history.graph(), self.graph())
+
+    def test__write__diffs(self):
+        graph = self.graph()
+        self.history.write(graph)
+        self.assertEqual(self.history.write(graph), 'layout.1.diff.json')
+        self.assertFalse(self.history.diff(1))
+        graph.del_node('/dev/sdb1')
+        graph.add_node('/dev/sdc', blkdev_.BlkDev({'name': 'sdc', 'type': 'disk'}))
+        self.assertEqual(self.history.write(graph), 'layout.2.diff.json')
+        self.assertEqual(self.history.diffs(), [1, 2])
+        diff = self.history.diff(2)
+        self.assertEqual(diff.deleted_nodes, ['/dev/sdb1'])
+        self.assertEqual(list(diff.added_nodes), ['/dev/sdc'])
+        self.assertLess(os.path.getsize(os.path.join(self.history.directory, 'layout.2.diff.json')),
+                        os.path.getsize(os.path.join(self.history.directory, 'layout.json')) // 10)
+        self.assertSameGraph(self.history.graph(), graph)
+        self.assertSameGraph(self.history.graph(1), self.graph())
+        self.assertSameGraph(self.history.graph(0), self.graph())
+
+    def test__write__evolving_properties(self):
+        graph = self.graph()
+        self.history.write(graph)
+        graph.add_node('/dev/sda1', blkdev_.BlkDev({'name': 'sda1', 'pkname': None}))
+        graph.node('/dev/sda1').evolve({'pkname': 'sda'})
+        graph.node('/dev/sda1').evolve({'pkname': 'sdb'})
+        self.history.write(graph)
+        self.assertEqual(self.history.graph().node('/dev/sda1').pkname, ['sda', 'sdb'])
+
+    def test__write__compact(self):
+        graph = self.graph()
+        self.history.write(graph, compact=2)
+        self.history.write(graph, compact=2)
+        self.history.write(graph, compact=2)
+        self.assertEqual(self.files(), ['layout.1.diff.json', 'layout.2.diff.json', 'layout.json'])
+        graph.del_node('/dev/sdb1')
+        self.assertEqual(self.history.write(graph, compact=2), 'layout.json')
+        self.assertEqual(self.files(), ['layout.json'])
+        self.assertSameGraph(self.history.graph(), graph)
+
+    def test__write__compact_disabled(self):
+        graph = self.graph()
+        for _ in range(4):
+            self.history.write(graph, compact=0)
+        self.assertEqual(self.history.diffs(), [1, 2, 3])
+
+    def test__write_full(self):
+        graph = self.graph()
+        self.history.write(graph)
+        self.history.write(graph)
+        self.assertEqual(self.history.write_full(graph), 'layout.json')
+        self.assertEqual(self.files(), ['layout.json'])
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
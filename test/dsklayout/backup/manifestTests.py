@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import tempfile
+import shutil
+import json
+import os
+
+import dsklayout.backup.manifest_ as manifest_
+import dsklayout.backup.chunkstore_ as chunkstore_
+import dsklayout.backup.regions_ as regions_
+import dsklayout.model.lsblk_ as lsblk_
+
+CHUNK = manifest_.Manifest.chunk_size
+
+
+class Test__Manifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = chunkstore_.ChunkStore(os.path.join(self.tmpdir, 'store'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def graph(self):
+        mydir = os.path.dirname(__file__)
+        path = os.path.join(mydir, '..', 'model', 'fixtures', 'lsblk_1_all.json')
+        with open(path) as f:
+            return lsblk_.LsBlk(json.loads(f.read())).graph()
+
+    def stored_chunks(self):
+        return sum(len(fs) for (_, _, fs) in os.walk(self.store.directory))
+
+    def test__init__(self):
+        manifest = manifest_.Manifest(host='foo')
+        self.assertEqual(manifest.properties, {'host': 'foo'})
+        self.assertEqual(manifest.blobs, [])
+        self.assertEqual(manifest.regions, [])
+        self.assertEqual(len(manifest.graph().nodes), 0)
+
+    def test__graph(self):
+        graph = self.graph()
+        manifest = manifest_.Manifest(graph)
+        copy = manifest.graph()
+        self.assertEqual(set(copy.edges), set(graph.edges))
+        for node in graph.nodes:
+            self.assertEqual(copy.nodes[node].properties, graph.nodes[node].properties)
+
+    def test__add_blob__read_blob(self):
+        data = os.urandom(CHUNK) + bytes(CHUNK) + b'tail'
+        manifest = manifest_.Manifest()
+        manifest.add_blob('foo', data, self.store)
+        self.assertEqual(manifest.blobs, ['foo'])
+        self.assertEqual(manifest.blob_size('foo'), len(data))
+        self.assertEqual(len(manifest.chunks()), 2)  # the zero chunk isn't stored
+        self.assertEqual(self.stored_chunks(), 2)
+        self.assertEqual(manifest.read_blob('foo', self.store), data)
+
+    def test__read_blob__random_access(self):
+        data = bytes(range(256)) * (3 * CHUNK // 256)
+        manifest = manifest_.Manifest()
+        manifest.add_blob('foo', data, self.store)
+        for (offset, length) in [(0, 10), (CHUNK - 5, 10), (2 * CHUNK + 7, 100),
+                                 (len(data) - 3, 100), (len(data), 1), (5, 0)]:
+            self.assertEqual(manifest.read_blob('foo', self.store, offset, length),
+                             data[offset:offset+length])
+
+    def test__read_blob__only_needed_chunks(self):
+        data = os.urandom(3 * CHUNK)
+        manifest = manifest_.Manifest()
+        manifest.add_blob('foo', data, self.store)
+        chunks = manifest.to_dict()['blobs']['foo']['chunks']
+        os.unlink(self.store.path(chunks[0]))
+        self.assertEqual(manifest.read_blob('foo', self.store, CHUNK, CHUNK),
+                         data[CHUNK:2*CHUNK])
+        with self.assertRaises(OSError):
+            manifest.read_blob('foo', self.store)
+
+    def test__deduplication(self):
+        data = os.urandom(2 * CHUNK)
+        first = manifest_.Manifest(host='a')
+        first.add_blob('sfdisk:/dev/sda', data, self.store)
+        second = manifest_.Manifest(host='b')
+        second.add_blob('sfdisk:/dev/sda', data, self.store)
+        second.add_blob('sfdisk:/dev/sdb', data[:CHUNK], self.store)
+        self.assertEqual(self.stored_chunks(), 2)
+
+    def test__add_regions__read_region(self):
+        device = os.path.join(self.tmpdir, 'sda')
+        with open(device, 'wb') as f:
+            f.truncate(4 * CHUNK)
+            f.write(b'boot')
+        path = os.path.join(self.tmpdir, 'regions.bin')
+        with regions_.RegionWriter(path) as writer:
+            writer.add_device(device, CHUNK, CHUNK)
+        manifest = manifest_.Manifest()
+        manifest.add_regions(regions_.RegionArchive(path), self.store)
+        head, tail = manifest.regions
+        self.assertEqual((head.device, head.offset, head.length), (device, 0, CHUNK))
+        self.assertEqual(tail.offset, 3 * CHUNK)
+        self.assertEqual(head.extents[0][2], 0)
+        self.assertEqual(manifest.read_region(head, self.store),
+                         b'boot' + bytes(CHUNK - 4))
+        self.assertEqual(manifest.read_region(tail, self.store), bytes(CHUNK))
+        self.assertEqual(self.stored_chunks(), 1)
+
+    def test__save__load(self):
+        path = os.path.join(self.tmpdir, 'manifest.json')
+        manifest = manifest_.Manifest(self.graph(), host='foo')
+        manifest.add_blob('foo', b'bar', self.store)
+        manifest.save(path)
+        loaded = manifest_.Manifest.load(path)
+        self.assertEqual(loaded.to_dict(), manifest.to_dict())
+        self.assertEqual(loaded.read_blob('foo', self.store), b'bar')
+
+    def test__from_dict__version(self):
+        data = manifest_.Manifest().to_dict()
+        data['version'] = 2
+        with self.assertRaises(ValueError):
+            manifest_.Manifest.from_dict(data)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import unittest.mock as mock
+import tempfile
+import shutil
+import errno
+import json
+import os
+
+import dsklayout.backup.regions_ as regions_
+import dsklayout.graph.graph_ as graph_
+import dsklayout.model.lsblk_ as lsblk_
+
+MiB = 2**20
+
+
+class Test__copy(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmpdir, 'src')
+        self.dst = os.path.join(self.tmpdir, 'dst')
+        with open(self.src, 'wb') as f:
+            f.write(bytes(range(256)) * 64)
+        open(self.dst, 'wb').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def copy(self, *args):
+        src = os.open(self.src, os.O_RDONLY)
+        dst = os.open(self.dst, os.O_WRONLY)
+        try:
+            return regions_._copy(src, dst, *args)
+        finally:
+            os.close(src)
+            os.close(dst)
+
+    def dst_data(self):
+        with open(self.dst, 'rb') as f:
+            return f.read()
+
+    def test__copy(self):
+        self.assertEqual(self.copy(100, 10, 1000), 1000)
+        self.assertEqual(self.dst_data()[10:], (bytes(range(256)) * 64)[100:1100])
+
+    def test__copy__eof(self):
+        self.assertEqual(self.copy(16000, 0, 1000), 384)
+
+    def test__copy__fallback(self):
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, 'unsupported')
+        with mock.patch.object(regions_, '_copy_methods',
+                               return_value=[unsupported, unsupported,
+                                             regions_._pread_pwrite]):
+            self.assertEqual(self.copy(0, 0, 300), 300)
+        self.assertEqual(self.dst_data(), bytes(range(256)) + bytes(range(44)))
+
+    def test__copy__error(self):
+        def failing(*args):
+            raise OSError(errno.EIO, 'io error')
+        with mock.patch.object(regions_, '_copy_methods',
+                               return_value=[failing, regions_._pread_pwrite]):
+            with self.assertRaises(OSError):
+                self.copy(0, 0, 300)
+
+
+class Test__RegionArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.archive = os.path.join(self.tmpdir, 'regions.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def sparse_device(self, name, size, chunks):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'wb') as f:
+            f.truncate(size)
+            for (offset, data) in chunks:
+                f.seek(offset)
+                f.write(data)
+        return path
+
+    def device_data(self, path, offset, length):
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def test__add_device(self):
+        dev = self.sparse_device('sda', 64 * MiB, [(0, b'MBR' * 100),
+                                                   (MiB, b'\x01' * 4096),
+                                                   (64 * MiB - 512, b'GPT' * 100)])
+        with regions_.RegionWriter(self.archive) as writer:
+            regions = writer.add_device(dev, 4 * MiB, 4 * MiB)
+        self.assertEqual([(r.offset, r.length) for r in regions],
+                         [(0, 4 * MiB), (60 * MiB, 4 * MiB)])
+        archive = regions_.RegionArchive(self.archive)
+        self.assertEqual(len(archive.regions), 2)
+        for region in archive.regions:
+            self.assertEqual(region.device, dev)
+            self.assertEqual(region.device_size, 64 * MiB)
+            self.assertEqual(archive.read(region),
+                             self.device_data(dev, region.offset, region.length))
+
+    def test__holes_are_skipped(self):
+        dev = self.sparse_device('sda', 64 * MiB, [(0, b'x' * 512),
+                                                   (64 * MiB - 512, b'y' * 512)])
+        with regions_.RegionWriter(self.archive) as writer:
+            writer.add_device(dev, 4 * MiB, 4 * MiB)
+        self.assertLess(os.path.getsize(self.archive), MiB)
+        archive = regions_.RegionArchive(self.archive)
+        head, tail = archive.regions
+        self.assertEqual(archive.read(head)[:513], b'x' * 512 + b'\0')
+        self.assertEqual(archive.read(tail)[-512:], b'y' * 512)
+
+    def test__add_device__small(self):
+        dev = self.sparse_device('sdb', 5 * MiB, [(0, b'a' * (5 * MiB))])
+        with regions_.RegionWriter(self.archive) as writer:
+            regions = writer.add_device(dev, 4 * MiB, 4 * MiB)
+            self.assertEqual([(r.offset, r.length) for r in regions], [(0, 5 * MiB)])
+            regions = writer.add_device(dev, 4 * MiB, 0)
+            self.assertEqual([(r.offset, r.length) for r in regions], [(0, 4 * MiB)])
+
+    def test__add(self):
+        dev = self.sparse_device('sdc', MiB, [(1000, b'abc')])
+        with regions_.RegionWriter(self.archive) as writer:
+            writer.add(dev, 999, 10)
+            clamped = writer.add(dev, MiB - 5, 100)
+        self.assertEqual((clamped.offset, clamped.length), (MiB - 5, 5))
+        archive = regions_.RegionArchive(self.archive)
+        self.assertEqual(archive.read(archive.regions[0]), b'\0abc' + bytes(6))
+
+    def test__extract(self):
+        dev = self.sparse_device('sda', 8 * MiB, [(512, b'label'), (8 * MiB - 5, b'end')])
+        with regions_.RegionWriter(self.archive) as writer:
+            writer.add_device(dev, MiB, MiB)
+        target = self.sparse_device('target', 8 * MiB, [])
+        archive = regions_.RegionArchive(self.archive)
+        for region in archive.regions:
+            archive.extract(region, target)
+        self.assertEqual(self.device_data(target, 0, 8 * MiB),
+                         self.device_data(dev, 0, 8 * MiB))
+
+    def test__add_graph(self):
+        sda = self.sparse_device('sda', 16 * MiB, [(0, b'disk')])
+        sda1 = self.sparse_device('sda1', 8 * MiB, [(0, b'part')])
+        missing = os.path.join(self.tmpdir, 'missing')
+        graph = graph_.Graph({sda: {'type': 'disk'}, sda1: {'type': 'part'},
+                              missing: {'type': 'part'}},
+                             [(sda, sda1), (sda1, missing)])
+        with regions_.RegionWriter(self.archive) as writer:
+            errors = writer.add_graph(graph, MiB, MiB)
+        self.assertEqual(list(errors), [missing])
+        self.assertIsInstance(errors[missing], OSError)
+        archive = regions_.RegionArchive(self.archive)
+        self.assertEqual([r.device for r in archive.regions], [sda, sda, sda1, sda1])
+
+    def test__add_graph__cyclic(self):
+        sda = self.sparse_device('sda', 16 * MiB, [(0, b'disk')])
+        dm0 = self.sparse_device('dm0', 8 * MiB, [(0, b'dm0')])
+        dm1 = self.sparse_device('dm1', 8 * MiB, [(0, b'dm1')])
+        graph = graph_.Graph(dict.fromkeys([sda, dm0, dm1], {'type': 'disk'}),
+                             [(sda, dm0), (dm0, dm1), (dm1, dm0)])
+        with regions_.RegionWriter(self.archive) as writer:
+            self.assertEqual(writer.add_graph(graph, MiB, 0), {})
+        archive = regions_.RegionArchive(self.archive)
+        self.assertEqual([r.device for r in archive.regions], [sda, dm0, dm1])
+
+    def test__add_graph__disks_and_partitions_only(self):
+        path = os.path.join(os.path.dirname(__file__), '..', 'model',
+                            'fixtures', 'lsblk_1_all.json')
+        with open(path) as f:
+            lsblk = lsblk_.LsBlk(json.load(f))
+        graph = lsblk.graph()
+        with regions_.RegionWriter(self.archive) as writer, \
+             mock.patch.object(regions_.RegionWriter, 'add_device',
+                               return_value=[]) as add:
+            self.assertEqual(writer.add_graph(graph, MiB, MiB), {})
+        devices = sorted(c[0][0] for c in add.call_args_list)
+        self.assertEqual(devices, ['/dev/sda', '/dev/sda1', '/dev/sda2',
+                                   '/dev/sda3', '/dev/sdb', '/dev/sdb1',
+                                   '/dev/sdb2', '/dev/sdb3'])
+        self.assertIn('/dev/sr0', graph.nodes)
+        self.assertIn('/dev/md2', graph.nodes)
+
+    def test__add_graph__untyped(self):
+        sda = self.sparse_device('sda', MiB, [(0, b'disk')])
+        with regions_.RegionWriter(self.archive) as writer:
+            self.assertEqual(writer.add_graph(graph_.Graph([sda]), MiB, 0), {})
+        self.assertEqual(regions_.RegionArchive(self.archive).regions, [])
+
+    def test__not_an_archive(self):
+        path = self.sparse_device('junk', 100, [])
+        with self.assertRaises(ValueError):
+            regions_.RegionArchive(path)
+
+    def test__truncated(self):
+        dev = self.sparse_device('sda', MiB, [(0, b'x')])
+        with regions_.RegionWriter(self.archive) as writer:
+            writer.add_device(dev, MiB, 0)
+        with open(self.archive, 'r+b') as f:
+            f.truncate(os.path.getsize(self.archive) - 1)
+        with self.assertRaises(ValueError):
+            regions_.RegionArchive(self.archive)
+
+    def test__region__dict(self):
+        region = regions_.Region('/dev/sda', 0, 10, 100, [(0, 5, 8)])
+        copy = regions_.Region.from_dict(region.to_dict())
+        self.assertEqual(copy.to_dict(), region.to_dict())
+        self.assertEqual(copy.extents, [(0, 5, 8)])
+        self.assertEqual(repr(copy), "Region('/dev/sda', 0, 10)")
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
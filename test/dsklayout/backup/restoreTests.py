@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import threading
+import time
+
+import dsklayout.backup.restore_ as restore_
+import dsklayout.backup.exceptions_ as exceptions_
+import dsklayout.graph.graph_ as graph_
+import dsklayout.graph.exceptions_ as graph_exceptions_
+
+COSTS = {'sda': 1, 'sda1': 1, 'sdb': 1, 'sdb1': 1, 'md0': 2, 'vg-lv': 3,
+         'crypt': 1, 'sdc': 2, 'sdc1': 1}
+
+
+class Test__RestorePlan(unittest.TestCase):
+
+    def graph(self):
+        # sda -> sda1 -> md0 -> vg-lv -> crypt, sdb -> sdb1 -> md0, sdc -> sdc1
+        edges = [('sda', 'sda1'), ('sda1', 'md0'), ('sdb', 'sdb1'),
+                 ('sdb1', 'md0'), ('md0', 'vg-lv'), ('vg-lv', 'crypt'),
+                 ('sdc', 'sdc1')]
+        return graph_.Graph(list(COSTS), edges)
+
+    def plan(self, jobs=4):
+        return restore_.RestorePlan(self.graph(), COSTS.get, jobs)
+
+    def assertRespectsDependencies(self, plan, schedule):
+        times = {node: (start, finish) for (start, finish, _, node) in schedule}
+        self.assertEqual(set(times), set(COSTS))
+        for (left, right) in plan.graph.edges:
+            self.assertLessEqual(times[left][1], times[right][0])
+
+    def test__init__(self):
+        plan = self.plan(jobs=2)
+        self.assertEqual(plan.jobs, 2)
+        self.assertEqual(len(plan.order), len(COSTS))
+        self.assertEqual(plan.cost('md0'), 2)
+
+    def test__init__jobs(self):
+        self.assertEqual(self.plan(jobs=0).jobs, 1)
+
+    def test__init__cycle(self):
+        graph = graph_.Graph(['a', 'b'], [('a', 'b'), ('b', 'a')])
+        with self.assertRaises(graph_exceptions_.CyclicGraphError):
+            restore_.RestorePlan(graph, lambda n: 1)
+
+    def test__rank(self):
+        plan = self.plan()
+        self.assertEqual(plan.rank('crypt'), 1)
+        self.assertEqual(plan.rank('md0'), 6)
+        self.assertEqual(plan.rank('sda'), 8)
+        self.assertEqual(plan.rank('sdc'), 3)
+
+    def test__critical_path(self):
+        self.assertEqual(self.plan().critical_path(),
+                         ['sda', 'sda1', 'md0', 'vg-lv', 'crypt'])
+
+    def test__critical_path__empty(self):
+        plan = restore_.RestorePlan(graph_.Graph(), lambda n: 1)
+        self.assertEqual(plan.critical_path(), [])
+        self.assertEqual(plan.schedule, [])
+        self.assertEqual(plan.makespan, 0)
+
+    def test__schedule(self):
+        plan = self.plan()
+        schedule = plan.schedule
+        self.assertRespectsDependencies(plan, schedule)
+        self.assertEqual([s[0] for s in schedule], sorted(s[0] for s in schedule))
+        self.assertEqual(schedule[0][3], 'sda')  # longest path first
+        self.assertEqual(plan.makespan, 8)  # the critical path
+
+    def test__schedule__one_job(self):
+        plan = self.plan(jobs=1)
+        self.assertRespectsDependencies(plan, plan.schedule)
+        self.assertEqual({s[2] for s in plan.schedule}, {0})
+        self.assertEqual(plan.makespan, sum(COSTS.values()))
+
+    def test__schedule__two_jobs(self):
+        plan = self.plan(jobs=2)
+        schedule = plan.schedule
+        self.assertRespectsDependencies(plan, schedule)
+        for (start, _, _, _) in schedule:
+            self.assertLessEqual(sum(1 for s in schedule if s[0] <= start < s[1]), 2)
+        # sdc's branch fits in while md0, vg-lv and crypt run on one worker
+        self.assertEqual(plan.makespan, 8)
+
+    def test__execute(self):
+        plan = self.plan()
+        lock = threading.Lock()
+        done = []
+        running = [0, 0]
+        def action(node):
+            with lock:
+                for (left, right) in plan.graph.edges:
+                    if right == node:
+                        self.assertIn(left, done)
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.001)
+            with lock:
+                running[0] -= 1
+                done.append(node)
+        self.assertEqual(plan.execute(action), {})
+        self.assertEqual(set(done), set(COSTS))
+        self.assertLessEqual(running[1], 4)
+
+    def test__execute__failure(self):
+        plan = self.plan(jobs=2)
+        error = OSError(5, 'I/O error')
+        done = []
+        def action(node):
+            if node == 'sdb1':
+                raise error
+            done.append(node)
+        errors = plan.execute(action)
+        self.assertEqual(set(errors), {'sdb1', 'md0', 'vg-lv', 'crypt'})
+        self.assertIs(errors['sdb1'], error)
+        self.assertIsInstance(errors['md0'], exceptions_.RestoreError)
+        self.assertEqual(str(errors['md0']),
+                         "md0: skipped, a device it depends on failed")
+        self.assertEqual(set(done), {'sda', 'sda1', 'sdb', 'sdc', 'sdc1'})
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import dsklayout.backup as backup
+
+class Test__backup__PackageSymbols(unittest.TestCase):
+
+    def test__chunkstore__symbols(self):
+        self.assertIs(backup.ChunkStore, backup.chunkstore_.ChunkStore)
+
+    def test__exceptions__symbols(self):
+        self.assertIs(backup.CorruptedChunkError, backup.exceptions_.CorruptedChunkError)
+        self.assertIs(backup.RestoreError, backup.exceptions_.RestoreError)
+
+    def test__history__symbols(self):
+        self.assertIs(backup.LayoutHistory, backup.history_.LayoutHistory)
+
+    def test__manifest__symbols(self):
+        self.assertIs(backup.Manifest, backup.manifest_.Manifest)
+
+    def test__regions__symbols(self):
+        self.assertIs(backup.Region, backup.regions_.Region)
+        self.assertIs(backup.RegionWriter, backup.regions_.RegionWriter)
+        self.assertIs(backup.RegionArchive, backup.regions_.RegionArchive)
+
+    def test__restore__symbols(self):
+        self.assertIs(backup.RestorePlan, backup.restore_.RestorePlan)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
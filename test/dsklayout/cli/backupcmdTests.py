@@ -3,9 +3,23 @@
 
 import unittest
 import unittest.mock as mock
+import subprocess
+import tempfile
+import argparse
+import shutil
+import json
+import os
+import io
 
 import dsklayout.cli.backupcmd_ as backupcmd_
 import dsklayout.cli.cmd_ as cmd_
+import dsklayout.model.lsblk_ as lsblk_
+import dsklayout.backup.regions_ as regions_
+import dsklayout.backup.history_ as history_
+import dsklayout.backup.manifest_ as manifest_
+import dsklayout.backup.chunkstore_ as chunkstore_
+import dsklayout.graph.graph_ as graph_
+import dsklayout.model.blkdev_ as blkdev_
 
 class Test__BackupCmd(unittest.TestCase):
 
@@ -28,12 +42,185 @@ class Test__BackupCmd(unittest.TestCase):
         self.assertIsNone(cmd.add_cmd_arguments(parser))
         parser.add_argument.assert_has_calls([
             mock.call("devices", metavar='DEV', nargs="*",
-                      help="block device to be included in backup")
+                      help="block device to be included in backup"),
+            mock.call("-o", "--output", dest='output', metavar='DIR',
+                      default='.', help="directory where the backup is written"),
+            mock.call("-j", "--jobs", dest='jobs', metavar='N', type=int,
+                      default=4, help="number of partition tables dumped at once"),
+            mock.call("--region-size", dest='region_size', metavar='BYTES',
+                      type=int, default=4 * 2**20,
+                      help="size of the head and tail regions of each disk "
+                           "and partition copied to regions.bin (0 disables)"),
+            mock.call("--store", dest='store', metavar='DIR', default=None,
+                      help="chunk store where the backup data is deduplicated, "
+                           "the output directory gets manifest.json only"),
+            mock.call("--incremental", dest='incremental', action='store_true',
+                      default=False,
+                      help="store the layout as a diff against the last full "
+                           "snapshot (not used with --store)"),
+            mock.call("--compact", dest='compact', metavar='N', type=int,
+                      default=7, help="write a new full snapshot after N "
+                                      "incremental backups (0 disables)"),
+            mock.call("--sfdisk", dest='sfdisk', metavar='PROG',
+                      default='sfdisk', help="name or path to sfdisk program"),
         ])
 
-    def test__run(self):
+
+class Test__BackupCmd__run(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmpdir, 'backup')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def graph(self):
+        mydir = os.path.dirname(__file__)
+        path = os.path.join(mydir, '..', 'model', 'fixtures', 'lsblk_1_all.json')
+        with open(path) as f:
+            return lsblk_.LsBlk(json.loads(f.read())).graph()
+
+    def command(self, jobs=4, region_size=0, store=None, incremental=False):
         cmd = backupcmd_.BackupCmd()
-        self.assertEqual(cmd.run(), 0)
+        cmd.arguments = argparse.Namespace(devices=[], output=self.output,
+                                           jobs=jobs, sfdisk='sfdisk',
+                                           lsblk='lsblk', cache_dir=None,
+                                           region_size=region_size,
+                                           store=store, compact=2,
+                                           incremental=incremental)
+        return cmd
+
+    def sfdisk(self, cmd):
+        return 'label: gpt\ndevice: %s\n' % cmd[-1]
+
+    def test__partitioned_disks(self):
+        graph = self.graph()
+        self.assertEqual(backupcmd_.BackupCmd.partitioned_disks(graph),
+                         ['/dev/sda', '/dev/sdb'])
+
+    def test__filename(self):
+        self.assertEqual(backupcmd_.BackupCmd._filename('/dev/sda'), 'sda')
+        self.assertEqual(backupcmd_.BackupCmd._filename('/dev/mapper/vg-a'), 'mapper!vg-a')
+
+    def test__run(self):
+        cmd = self.command()
+        with mock.patch.object(lsblk_.LsBlk, 'graph', return_value=self.graph()), \
+             mock.patch.object(lsblk_.LsBlk, 'run', return_value='{}'), \
+             mock.patch('dsklayout.model.sfdisk_.backtick', side_effect=self.sfdisk) as backtick:
+            self.assertEqual(cmd.run(), 0)
+        self.assertEqual(sorted(os.listdir(self.output)),
+                         ['layout.json', 'sda.sfdisk', 'sdb.sfdisk'])
+        with open(os.path.join(self.output, 'sdb.sfdisk')) as f:
+            self.assertEqual(f.read(), 'label: gpt\ndevice: /dev/sdb\n')
+        with open(os.path.join(self.output, 'layout.json')) as f:
+            layout = json.load(f)
+        self.assertEqual(set(layout['nodes']), set(self.graph().nodes))
+        backtick.assert_has_calls([mock.call(['sfdisk', '--dump', '/dev/sda']),
+                                   mock.call(['sfdisk', '--dump', '/dev/sdb'])],
+                                  any_order=True)
+
+    def test__run__jobs(self):
+        cmd = self.command(jobs=1)
+        with mock.patch.object(lsblk_.LsBlk, 'graph', return_value=self.graph()), \
+             mock.patch.object(lsblk_.LsBlk, 'run', return_value='{}'), \
+             mock.patch('concurrent.futures.ThreadPoolExecutor', wraps=backupcmd_.concurrent.futures.ThreadPoolExecutor) as executor, \
+             mock.patch('dsklayout.model.sfdisk_.backtick', side_effect=self.sfdisk):
+            self.assertEqual(cmd.run(), 0)
+        executor.assert_called_once_with(1)
+
+    def test__run__failure(self):
+        def sfdisk(cmd):
+            if cmd[-1] == '/dev/sda':
+                raise subprocess.CalledProcessError(1, cmd)
+            return self.sfdisk(cmd)
+        cmd = self.command()
+        with mock.patch.object(lsblk_.LsBlk, 'graph', return_value=self.graph()), \
+             mock.patch.object(lsblk_.LsBlk, 'run', return_value='{}'), \
+             mock.patch('sys.stderr', new_callable=io.StringIO) as stderr, \
+             mock.patch('dsklayout.model.sfdisk_.backtick', side_effect=sfdisk):
+            self.assertEqual(cmd.run(), 1)
+        self.assertEqual(sorted(os.listdir(self.output)),
+                         ['layout.json', 'sdb.sfdisk'])
+        self.assertTrue(stderr.getvalue().startswith('/dev/sda: '))
+
+    def test__run__regions(self):
+        disk = os.path.join(self.tmpdir, 'disk.img')
+        with open(disk, 'wb') as f:
+            f.truncate(2**20)
+            f.write(b'boot')
+        missing = os.path.join(self.tmpdir, 'missing.img')
+        graph = graph_.Graph({disk: blkdev_.BlkDev({'type': 'disk'}),
+                              missing: blkdev_.BlkDev({'type': 'disk'})})
+        cmd = self.command(region_size=4096)
+        with mock.patch.object(lsblk_.LsBlk, 'graph', return_value=graph), \
+             mock.patch.object(lsblk_.LsBlk, 'run', return_value='{}'), \
+             mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(cmd.run(), 1)
+        self.assertEqual(sorted(os.listdir(self.output)),
+                         ['layout.json', 'regions.bin'])
+        self.assertTrue(stderr.getvalue().startswith('%s: ' % missing))
+        archive = regions_.RegionArchive(os.path.join(self.output, 'regions.bin'))
+        self.assertEqual([(r.device, r.offset) for r in archive.regions],
+                         [(disk, 0), (disk, 2**20 - 4096)])
+        self.assertEqual(archive.read(archive.regions[0])[:4], b'boot')
+
+    def test__run__incremental(self):
+        graph = self.graph()
+        cmd = self.command(incremental=True)
+        def run():
+            with mock.patch.object(lsblk_.LsBlk, 'graph', return_value=graph), \
+                 mock.patch.object(lsblk_.LsBlk, 'run', return_value='{}'), \
+                 mock.patch('dsklayout.model.sfdisk_.backtick', side_effect=self.sfdisk):
+                self.assertEqual(cmd.run(), 0)
+            return sorted(n for n in os.listdir(self.output) if n.startswith('layout'))
+        self.assertEqual(run(), ['layout.json'])
+        graph.del_node('/dev/sdb1')
+        self.assertEqual(run(), ['layout.1.diff.json', 'layout.json'])
+        history = history_.LayoutHistory(self.output)
+        self.assertEqual(history.diff(1).deleted_nodes, ['/dev/sdb1'])
+        self.assertNotIn('/dev/sdb1', history.graph().nodes)
+        self.assertIn('/dev/sdb1', history.graph(0).nodes)
+        self.assertEqual(run(), ['layout.1.diff.json', 'layout.2.diff.json', 'layout.json'])
+        self.assertEqual(run(), ['layout.json'])  # compacted (--compact 2)
+        self.assertNotIn('/dev/sdb1', history.graph().nodes)
+
+    def run_with_store(self, store, host):
+        disk = os.path.join(self.tmpdir, 'disk.img')
+        if not os.path.exists(disk):
+            with open(disk, 'wb') as f:
+                f.truncate(2**20)
+                f.write(b'boot')
+        cmd = self.command(region_size=4096, store=store)
+        with mock.patch.object(lsblk_.LsBlk, 'graph', return_value=graph_.Graph({disk: blkdev_.BlkDev({'type': 'disk'})})), \
+             mock.patch.object(lsblk_.LsBlk, 'run', return_value='{}'), \
+             mock.patch.object(backupcmd_.BackupCmd, 'partitioned_disks', return_value=[disk]), \
+             mock.patch('socket.gethostname', return_value=host), \
+             mock.patch('dsklayout.model.sfdisk_.backtick', side_effect=self.sfdisk):
+            self.assertEqual(cmd.run(), 0)
+        return manifest_.Manifest.load(os.path.join(self.output, 'manifest.json'))
+
+    def test__run__store(self):
+        disk = os.path.join(self.tmpdir, 'disk.img')
+        store = os.path.join(self.tmpdir, 'store')
+        manifest = self.run_with_store(store, 'host1')
+        self.assertEqual(os.listdir(self.output), ['manifest.json'])
+        self.assertEqual(manifest.properties['host'], 'host1')
+        self.assertEqual(list(manifest.graph().nodes), [disk])
+        chunks = chunkstore_.ChunkStore(store)
+        self.assertEqual(manifest.read_blob('sfdisk:%s' % disk, chunks),
+                         ('label: gpt\ndevice: %s\n' % disk).encode())
+        self.assertEqual([(r.device, r.offset) for r in manifest.regions],
+                         [(disk, 0), (disk, 2**20 - 4096)])
+        self.assertEqual(manifest.read_region(manifest.regions[0], chunks)[:4], b'boot')
+
+    def test__run__store__deduplicates(self):
+        store = os.path.join(self.tmpdir, 'store')
+        first = self.run_with_store(store, 'host1')
+        count = sum(len(fs) for (_, _, fs) in os.walk(store))
+        second = self.run_with_store(store, 'host2')
+        self.assertEqual(sum(len(fs) for (_, _, fs) in os.walk(store)), count)
+        self.assertEqual(first.chunks(), second.chunks())
 
 if __name__ == '__backupcmd__':
     unittest.main()
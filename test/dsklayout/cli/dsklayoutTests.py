@@ -7,6 +7,7 @@ import unittest.mock as mock
 import dsklayout.cli.dsklayout_ as dsklayout_
 import dsklayout.cli.app_ as app_
 import dsklayout.cli.backupcmd_ as backupcmd_
+import dsklayout.cli.restorecmd_ as restorecmd_
 
 class Test__DskLayout(unittest.TestCase):
 
@@ -23,7 +24,8 @@ class Test__DskLayout(unittest.TestCase):
     def test__subcommands(self):
         app = dsklayout_.DskLayout()
         self.assertEqual(app.subcommands, [
-            backupcmd_.BackupCmd
+            backupcmd_.BackupCmd,
+            restorecmd_.RestoreCmd,
         ])
 
     def test__add_arguments(self):
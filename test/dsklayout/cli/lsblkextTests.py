@@ -7,6 +7,7 @@ import unittest.mock as mock
 import dsklayout.cli.lsblkext_ as lsblkext_
 import dsklayout.cli.cmdext_ as cmdext_
 import dsklayout.model.lsblk_ as lsblk_
+import dsklayout.model.layoutcache_ as layoutcache_
 
 class Test__LsBlkExt(unittest.TestCase):
 
@@ -25,6 +26,9 @@ class Test__LsBlkExt(unittest.TestCase):
         parser.add_argument.assert_has_calls([
             mock.call('--lsblk', dest='lsblk', metavar='PROG', default='lsblk',
                       help='name or path to lsblk program'),
+            mock.call('--cache-dir', dest='cache_dir', metavar='DIR',
+                      default=None,
+                      help='directory where parsed layouts are cached'),
         ])
 
     def test__new(self):
@@ -39,9 +43,24 @@ class Test__LsBlkExt(unittest.TestCase):
     def test__graph(self):
         lsblk = mock.Mock()
         lsblk.graph = mock.Mock(return_value = 'ok')
-        with mock.patch.object(lsblkext_.LsBlkExt, 'new', return_value = lsblk) as new:
+        with mock.patch.object(lsblkext_.LsBlkExt, 'arguments') as arguments, \
+             mock.patch.object(lsblkext_.LsBlkExt, 'new', return_value = lsblk) as new:
+            arguments.cache_dir = None
+            self.assertEqual(lsblkext_.LsBlkExt().graph(), 'ok')
+            new.assert_called_once_with()
+
+    def test__graph__cache_dir(self):
+        lsblk = mock.Mock()
+        lsblk.graph = mock.Mock(return_value = 'ok')
+        with mock.patch.object(lsblkext_.LsBlkExt, 'arguments') as arguments, \
+             mock.patch.object(lsblkext_.LsBlkExt, 'new', return_value = lsblk) as new, \
+             mock.patch.object(layoutcache_.LayoutCache, 'graph', side_effect = lambda build, *args: build()) as graph:
+            arguments.cache_dir = '/var/cache/dsklayout'
+            arguments.devices = ['/dev/sda']
+            arguments.lsblk = 'lsblk'
             self.assertEqual(lsblkext_.LsBlkExt().graph(), 'ok')
             new.assert_called_once_with()
+            graph.assert_called_once_with(mock.ANY, ['/dev/sda'], 'lsblk')
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import unittest.mock as mock
+import subprocess
+import tempfile
+import argparse
+import shutil
+import errno
+import os
+import io
+
+import dsklayout.cli.restorecmd_ as restorecmd_
+import dsklayout.cli.backupcmd_ as backupcmd_
+import dsklayout.cli.cmd_ as cmd_
+import dsklayout.backup.history_ as history_
+import dsklayout.backup.regions_ as regions_
+import dsklayout.graph.graph_ as graph_
+
+class Test__RestoreCmd(unittest.TestCase):
+
+    def test__isinstance_cmd(self):
+        cmd = restorecmd_.RestoreCmd()
+        self.assertIsInstance(cmd, cmd_.Cmd)
+
+    def test__name(self):
+        cmd = restorecmd_.RestoreCmd()
+        self.assertEqual(cmd.name, 'restore')
+
+    def test__properties(self):
+        cmd = restorecmd_.RestoreCmd()
+        self.assertEqual(cmd.properties, {'description': 'restore disk layout from backup'})
+
+    def test__add_cmd_arguments(self):
+        cmd = restorecmd_.RestoreCmd()
+        parser = mock.Mock(spec =[])
+        parser.add_argument = mock.Mock()
+        self.assertIsNone(cmd.add_cmd_arguments(parser))
+        parser.add_argument.assert_has_calls([
+            mock.call("backup", metavar='DIR',
+                      help="directory with a backup written by the backup "
+                           "command (without --store)"),
+            mock.call("devices", metavar='DEVICE', nargs='*',
+                      help="disk or partition to be restored (with its "
+                           "partitions), all of them by default"),
+            mock.call("-j", "--jobs", dest='jobs', metavar='N', type=int,
+                      default=4, help="number of devices restored at once"),
+            mock.call("-n", "--dry-run", dest='dry_run', action='store_true',
+                      default=False, help="print the schedule and its estimated "
+                                          "makespan, restore nothing"),
+            mock.call("-f", "--force", dest='force', action='store_true',
+                      default=False, help="restore all the disks and "
+                                          "partitions, if no DEVICE is given"),
+            mock.call("--sfdisk", dest='sfdisk', metavar='PROG',
+                      default='sfdisk', help="name or path to sfdisk program"),
+        ])
+
+
+class Test__RestoreCmd__run(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.backup = os.path.join(self.tmpdir, 'backup')
+        self.disk = os.path.join(self.tmpdir, 'disk.img')
+        self.part = os.path.join(self.tmpdir, 'part.img')
+        self.md = os.path.join(self.tmpdir, 'md.img')
+        self.write_backup()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def image(self, path, data=b''):
+        with open(path, 'wb') as f:
+            f.truncate(2**20)
+            f.write(data)
+
+    def write_backup(self):
+        self.image(self.disk, b'boot')
+        self.image(self.part, b'part')
+        graph = graph_.Graph({self.disk: {'type': 'disk'},
+                              self.part: {'type': 'part'},
+                              self.md: {'type': 'raid1'}},
+                             [(self.disk, self.part), (self.part, self.md)])
+        history_.LayoutHistory(self.backup).write_full(graph)
+        with regions_.RegionWriter(os.path.join(self.backup, 'regions.bin')) as writer:
+            writer.add_device(self.disk, 4096, 4096)
+            writer.add_device(self.part, 4096, 4096)
+        name = '%s.sfdisk' % backupcmd_.BackupCmd._filename(self.disk)
+        with open(os.path.join(self.backup, name), 'w') as f:
+            f.write('label: gpt\n')
+        # wipe the devices
+        self.image(self.disk)
+        self.image(self.part)
+
+    def command(self, jobs=4, dry_run=False, force=True, devices=(),
+                backup=None):
+        cmd = restorecmd_.RestoreCmd()
+        cmd.arguments = argparse.Namespace(backup=backup or self.backup,
+                                           devices=list(devices), jobs=jobs,
+                                           dry_run=dry_run, force=force,
+                                           sfdisk='sfdisk')
+        return cmd
+
+    def read(self, path, length=4):
+        with open(path, 'rb') as f:
+            return f.read(length)
+
+    def test__partition_table(self):
+        cmd = self.command()
+        self.assertEqual(cmd.partition_table(self.disk).dump, 'label: gpt\n')
+        self.assertIsNone(cmd.partition_table(self.part))
+
+    def test__regions(self):
+        archive = self.command().region_archive()
+        self.assertEqual(len(restorecmd_.RestoreCmd.regions(archive, self.disk)), 2)
+        self.assertEqual(restorecmd_.RestoreCmd.regions(archive, self.md), [])
+        self.assertEqual(restorecmd_.RestoreCmd.regions(None, self.disk), [])
+
+    def test__region_archive__missing(self):
+        os.unlink(os.path.join(self.backup, 'regions.bin'))
+        self.assertIsNone(self.command().region_archive())
+
+    def test__cost(self):
+        cmd = self.command()
+        archive = cmd.region_archive()
+        self.assertAlmostEqual(cmd.cost(archive, self.md), cmd.step_cost)
+        self.assertGreater(cmd.cost(archive, self.disk),
+                           cmd.step_cost + cmd.sfdisk_cost)
+
+    def test__run__dry_run(self):
+        cmd = self.command(dry_run=True)
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout, \
+             mock.patch('subprocess.run') as run:
+            self.assertEqual(cmd.run(), 0)
+        self.assertFalse(run.called)
+        self.assertEqual(self.read(self.disk), bytes(4))
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[0].split(), ['START', 'FINISH', 'JOB', 'DEVICE'])
+        self.assertEqual([l.split()[-1] for l in lines[1:3]],
+                         [self.disk, self.part])
+        self.assertTrue(lines[3].startswith('estimated makespan: 0.'))
+        self.assertTrue(lines[3].endswith('s with 4 jobs'))
+        self.assertEqual(lines[4], 'critical path: %s -> %s' %
+                         (self.disk, self.part))
+
+    def test__run(self):
+        cmd = self.command()
+        self.image(self.md)
+        with mock.patch('subprocess.run') as run:
+            self.assertEqual(cmd.run(), 0)
+        run.assert_called_once_with(['sfdisk', self.disk], input='label: gpt\n',
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    universal_newlines=True, check=True)
+        self.assertEqual(self.read(self.disk), b'boot')
+        self.assertEqual(self.read(self.part), b'part')
+        self.assertEqual(self.read(self.md), bytes(4))
+
+    def test__run__not_forced(self):
+        cmd = self.command(force=False)
+        with mock.patch('subprocess.run') as run, \
+             mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(cmd.run(), 1)
+        self.assertFalse(run.called)
+        self.assertEqual(self.read(self.disk), bytes(4))
+        self.assertEqual(self.read(self.part), bytes(4))
+        self.assertIn('select DEVICEs or use --force', stderr.getvalue())
+
+    def test__run__devices(self):
+        cmd = self.command(force=False, devices=[self.part])
+        with mock.patch('subprocess.run') as run:
+            self.assertEqual(cmd.run(), 0)
+        self.assertFalse(run.called)
+        self.assertEqual(self.read(self.disk), bytes(4))
+        self.assertEqual(self.read(self.part), b'part')
+
+    def test__run__devices__partitions(self):
+        cmd = self.command(force=False, devices=[self.disk])
+        with mock.patch('subprocess.run') as run:
+            self.assertEqual(cmd.run(), 0)
+        self.assertTrue(run.called)
+        self.assertEqual(self.read(self.disk), b'boot')
+        self.assertEqual(self.read(self.part), b'part')
+
+    def test__run__devices__not_disk_or_partition(self):
+        for device in (self.md, '/dev/nonexistent'):
+            cmd = self.command(devices=[device])
+            with mock.patch('subprocess.run') as run, \
+                 mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                self.assertEqual(cmd.run(), 1)
+            self.assertFalse(run.called)
+            self.assertEqual(stderr.getvalue(),
+                             '%s: not a disk or partition in backup\n' % device)
+
+    def test__run__in_use(self):
+        cmd = self.command()
+        open_ = os.open
+
+        def fake_open(path, flags, *args):
+            if path == self.part and flags & os.O_EXCL:
+                raise OSError(errno.EBUSY, os.strerror(errno.EBUSY), path)
+            return open_(path, flags, *args)
+
+        with mock.patch('os.open', side_effect=fake_open), \
+             mock.patch('subprocess.run') as run, \
+             mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(cmd.run(), 1)
+        self.assertFalse(run.called)
+        self.assertEqual(self.read(self.disk), bytes(4))
+        self.assertEqual(stderr.getvalue(),
+                         '%s: device is mounted or in use\n' % self.part)
+
+    def test__in_use(self):
+        self.assertFalse(restorecmd_.RestoreCmd.in_use(self.disk))
+        self.assertFalse(restorecmd_.RestoreCmd.in_use(self.md))  # missing
+        error = OSError(errno.EBUSY, os.strerror(errno.EBUSY))
+        with mock.patch('os.open', side_effect=error):
+            self.assertTrue(restorecmd_.RestoreCmd.in_use(self.disk))
+
+    def test__run__no_layout(self):
+        store = self.command(backup=os.path.join(self.tmpdir, 'store'))
+        os.makedirs(store.arguments.backup)
+        with open(os.path.join(store.arguments.backup, 'manifest.json'), 'w') as f:
+            f.write('{}')
+        missing = self.command(backup=os.path.join(self.tmpdir, 'missing'))
+        empty = self.command(backup=self.tmpdir)
+        plan = [(store, "backups written with --store can't be restored"),
+                (missing, os.strerror(errno.ENOENT)),
+                (empty, 'no layout.json in backup')]
+        for (cmd, message) in plan:
+            for dry_run in (False, True):
+                cmd.arguments.dry_run = dry_run
+                with mock.patch('subprocess.run') as run, \
+                     mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                    self.assertEqual(cmd.run(), 1)
+                self.assertFalse(run.called)
+                self.assertEqual(stderr.getvalue(), '%s: %s\n' %
+                                 (cmd.arguments.backup, message))
+
+    def test__run__failure(self):
+        cmd = self.command()
+        error = subprocess.CalledProcessError(1, ['sfdisk', self.disk])
+        with mock.patch('subprocess.run', side_effect=error), \
+             mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(cmd.run(), 1)
+        self.assertEqual(self.read(self.part), bytes(4))
+        lines = stderr.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('%s: ' % self.disk))
+        self.assertTrue(lines[1].endswith('skipped, a device it depends on failed'))
+
+    def test__run__cyclic(self):
+        graph = graph_.Graph({self.disk: {'type': 'disk'},
+                              self.part: {'type': 'part'},
+                              self.md: {'type': 'part'}},
+                             [(self.disk, self.part), (self.part, self.md),
+                              (self.md, self.part)])
+        history_.LayoutHistory(self.backup).write_full(graph)
+        for dry_run in (False, True):
+            cmd = self.command(dry_run=dry_run)
+            with mock.patch('subprocess.run') as run, \
+                 mock.patch('sys.stdout', new_callable=io.StringIO) as stdout, \
+                 mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                self.assertEqual(cmd.run(), 1)
+            self.assertFalse(run.called)
+            self.assertEqual(stdout.getvalue(), '')
+            self.assertTrue(stderr.getvalue().startswith(
+                '%s: graph has cycles, back edges: ' % self.backup))
+        self.assertEqual(self.read(self.disk), bytes(4))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
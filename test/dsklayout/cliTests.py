@@ -9,6 +9,9 @@ class Test__cli__PackageSymbols(unittest.TestCase):
     def test__backupcmd__symbols(self):
         self.assertIs(cli.BackupCmd, cli.backupcmd_.BackupCmd)
 
+    def test__restorecmd__symbols(self):
+        self.assertIs(cli.RestoreCmd, cli.restorecmd_.RestoreCmd)
+
     def test__main__symbols(self):
         self.assertIs(cli.Cmd, cli.cmd_.Cmd)
 
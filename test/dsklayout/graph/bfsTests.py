@@ -2,6 +2,7 @@
 # -*- coding: utf8 -*-
 
 import unittest
+import itertools
 
 import dsklayout.graph.bfs_ as bfs_
 import dsklayout.graph.traversal_ as traversal_
@@ -221,6 +222,104 @@ class Test__Bfs(unittest.TestCase):
         self.assertEqual(cb.egress_edges, trail.edges)
         self.assertEqual(cb.backedges, trail.backedges)
 
+    def test__views(self):
+        graph = self.graph1()
+        for direction in ('outward', 'inward', 'incident'):
+            search = bfs_.Bfs(direction = direction, views = True)
+            trail = search(graph, ['p', 'x'])
+            expct = bfs_.Bfs(direction = direction)(graph, ['p', 'x'])
+            self.assertEqual(set(trail.nodes), set(expct.nodes))
+            self.assertEqual(set(trail.edges + trail.backedges),
+                             set(expct.edges + expct.backedges))
+
+
+    def test__record_nodes(self):
+        klass = bfs_.Bfs
+        for graph in (self.graph1(), self.graph2()):
+            for direction in ('outward', 'inward', 'incident'):
+                cb, cb2 = Callbacks(), Callbacks()
+                search = klass(direction = direction,
+                               ingress_func = cb.ingress_func,
+                               egress_func = cb.egress_func)
+                trail = search(graph, ['p', 'x'], record = ('nodes',))
+                expct = klass(direction = direction, **cb2.callbacks)(graph, ['p', 'x'])
+                self.assertEqual(trail.nodes, expct.nodes)
+                self.assertEqual(trail.edges, [])
+                self.assertEqual(trail.backedges, [])
+                self.assertEqual(trail.explored_edges, set())
+                self.assertEqual(cb.ingress_nodes, cb2.ingress_nodes)
+                self.assertEqual(cb.egress_nodes, cb2.egress_nodes)
+                self.assertEqual(cb.egress_edges, cb2.egress_edges)
+
+    def test__record_nodes__stop(self):
+        klass = bfs_.Bfs
+        cb, cb2 = Callbacks(ingress_func = lambda g,n,e: n == 'r'), \
+                  Callbacks(ingress_func = lambda g,n,e: n == 'r')
+        search = klass(direction = 'outward',
+                       ingress_func = cb.ingress_func,
+                       egress_func = cb.egress_func)
+        trail = search(self.graph1(), ['p', 'x'], record = ('nodes',))
+        expct = klass(direction = 'outward', **cb2.callbacks)(self.graph1(), ['p', 'x'])
+        self.assertEqual(trail.result, 'r')
+        self.assertEqual(trail.nodes, expct.nodes)
+        self.assertEqual(cb.egress_nodes, cb2.egress_nodes)
+
+    def test__record_nodes__with_backedge_func(self):
+        klass = bfs_.Bfs
+        cb = Callbacks()
+        search = klass(direction = 'outward', **cb.callbacks)
+        trail = search(self.graph1(), ['p', 'x'], record = ('nodes',))
+        self.assertEqual(cb.backedges, [('s','p')])
+        self.assertEqual(trail.backedges, [])
+        self.assertEqual(trail.edges, [])
+
+    def test__without_callbacks(self):
+        klass = bfs_.Bfs
+        records = [None, ('nodes',), ('edges',), ('nodes', 'backedges'), ()]
+        for graph in (self.graph1(), self.graph2()):
+            for direction in ('outward', 'inward', 'incident'):
+                for record in records:
+                    kw = {} if record is None else {'record': record}
+                    trail = klass(direction = direction)(graph, ['p', 'x'], **kw)
+                    expct = klass(direction = direction, **Callbacks().callbacks)(graph, ['p', 'x'], **kw)
+                    self.assertIsNone(trail.result)
+                    self.assertEqual(trail.nodes, expct.nodes)
+                    self.assertEqual(trail.edges, expct.edges)
+                    self.assertEqual(trail.backedges, expct.backedges)
+                    self.assertEqual(trail.explored_nodes, expct.explored_nodes)
+                    if trail.tracks_edges():
+                        self.assertEqual(trail.explored_edges, expct.explored_edges)
+                    else:
+                        self.assertEqual(trail.explored_edges, set())
+
+    def test__iter_events(self):
+        klass = bfs_.Bfs
+        for graph in (self.graph1(), self.graph2()):
+            for direction in ('outward', 'inward', 'incident'):
+                cb = Callbacks()
+                trail = klass(direction = direction, **cb.callbacks)(graph, ['p', 'x'])
+                events = list(klass(direction = direction).iter_events(graph, ['p', 'x']))
+                def select(kind, index):
+                    return [e[index] for e in events if e[0] == kind]
+                self.assertEqual(select(klass.ENTER, 1), cb.ingress_nodes)
+                self.assertEqual(select(klass.LEAVE, 1), cb.egress_nodes)
+                self.assertEqual([e for e in select(klass.LEAVE, 2) if e], cb.egress_edges)
+                self.assertEqual(select(klass.EDGE, 2), trail.edges)
+                self.assertEqual(select(klass.BACKEDGE, 2), trail.backedges)
+
+    def test__iter_events__lazy(self):
+        klass = bfs_.Bfs
+        graph = self.graph1()
+        calls = []
+        def selector(g, n):
+            calls.append(n)
+            return g.outward(n)
+        events = klass(direction = selector).iter_events(graph, ['p', 'x'])
+        self.assertEqual(next(events), (klass.ENTER, 'p', None))
+        self.assertEqual(calls, [])
+        first = list(itertools.islice(events, 2))
+        self.assertEqual(len(first), 2)
+        self.assertEqual(calls, ['p'])
 
 if __name__ == '__main__':
     unittest.main()
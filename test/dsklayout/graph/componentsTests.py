@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import unittest.mock
+import concurrent.futures
+
+import dsklayout.graph.components_ as components_
+import dsklayout.graph.graph_ as graph_
+import dsklayout.graph.frozen_ as frozen_
+
+def count_nodes(graph):
+    return len(graph.nodes)
+
+class Test__components(unittest.TestCase):
+
+    def graph1(self):
+        # two disk trees, one of them with a multi-disk md, and a lone disk
+        edges = [('sda','sda1'), ('sdb','sdb1'), ('sda1','md0'),
+                 ('sdb1','md0'), ('sdc','sdc1')]
+        return graph_.Graph(['sda','sda1','sdb','sdb1','md0','sdc','sdc1',
+                             'sdd'], edges)
+
+    def test__components__empty(self):
+        self.assertEqual(components_.components(graph_.Graph()), [])
+
+    def test__components(self):
+        result = components_.components(self.graph1())
+        self.assertEqual(result, [{'sda','sda1','sdb','sdb1','md0'},
+                                  {'sdc','sdc1'}, {'sdd'}])
+
+    def test__components__ignores_direction(self):
+        graph = graph_.Graph('abcd', [('a','b'), ('c','b'), ('d','c')])
+        self.assertEqual(components_.components(graph), [set('abcd')])
+
+    def test__components__consistency_false(self):
+        graph = graph_.Graph(['a'], [('a','b'), ('c','d')], consistency=False)
+        self.assertEqual(components_.components(graph), [{'a','b'}, {'c','d'}])
+
+    def test__components__long_chain(self):
+        nodes = list(range(10000))
+        graph = graph_.Graph(nodes, list(zip(nodes[1:], nodes[:-1])))
+        self.assertEqual(components_.components(graph), [set(nodes)])
+
+    def test__map_components(self):
+        graph = self.graph1()
+        seen = []
+        def func(component):
+            seen.append(component)
+            return sorted(component.nodes)
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            result = components_.map_components(func, graph, executor)
+        self.assertEqual(result, [['md0','sda','sda1','sdb','sdb1'],
+                                  ['sdc','sdc1'], ['sdd']])
+        for component in seen:
+            self.assertIsInstance(component, frozen_.FrozenGraph)
+        self.assertEqual(sorted(seen[0].edges), [('sda','sda1'), ('sda1','md0'),
+                                                 ('sdb','sdb1'), ('sdb1','md0')])
+
+    def test__map_components__data(self):
+        graph = graph_.Graph({'a': 'A', 'b': 'B', 'c': None},
+                             {('a', 'b'): 'ab', ('c', 'd'): 'cd'},
+                             consistency=False)
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            result = components_.map_components(
+                lambda g: (sorted(g.nodes), {e: g.edge(e) for e in g.edges},
+                           {n: g.node(n) for n in g.nodes}), graph, executor)
+        self.assertEqual(result, [
+            (['a', 'b'], {('a', 'b'): 'ab'}, {'a': 'A', 'b': 'B'}),
+            (['c', 'd'], {('c', 'd'): 'cd'}, {'c': None, 'd': None}),
+        ])
+
+    def test__map_components__many(self):
+        # components are extracted in linear time, not per component
+        graph = graph_.Graph()
+        for i in range(2000):
+            graph.add_edge(('sd%d' % i, 'sd%dp1' % i))
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            result = components_.map_components(count_nodes, graph, executor)
+        self.assertEqual(result, [2] * 2000)
+
+    def test__map_components__process_pool(self):
+        result = components_.map_components(count_nodes, self.graph1())
+        self.assertEqual(result, [5, 2, 1])
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
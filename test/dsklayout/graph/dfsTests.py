@@ -2,6 +2,9 @@
 # -*- coding: utf8 -*-
 
 import unittest
+import itertools
+import random
+import sys
 
 import dsklayout.graph.dfs_ as dfs_
 import dsklayout.graph.traversal_ as traversal_
@@ -41,6 +44,29 @@ class Callbacks(object):
                  'backedge_func':  self.backedge}
 
 
+class RecursiveDfs(dfs_.Dfs):
+    """Former recursive implementation, used as a reference"""
+
+    def _dfs(self, trail, node, edge):
+        trail.explore_and_append_node(node)
+        stop = self._invoke_callback(trail.ingress_func, trail, node, edge)
+        if not stop:
+            for edge2 in self.select_edges(trail.graph, node):
+                if trail.edge_explored(edge2):
+                    continue
+                adjacent_node = trail.graph.adjacent(node, edge2)
+                if not trail.node_explored(adjacent_node):
+                    trail.explore_and_append_edge(edge2)
+                    stop = self._dfs(trail, adjacent_node, edge2)
+                else:
+                    trail.explore_and_append_backedge(edge2)
+                    stop = self._invoke_callback(trail.backedge_func, trail, edge2)
+                if stop:
+                    break
+        stop |= self._invoke_callback(trail.egress_func, trail, node, edge)
+        return stop
+
+
 class Test__Dfs(unittest.TestCase):
 
     def graph1(self):
@@ -198,6 +224,125 @@ class Test__Dfs(unittest.TestCase):
         self.assertEqual(cb.egress_edges, [('p','q')])
         self.assertEqual(cb.backedges, [])
 
+    def test__deep_chain(self):
+        depth = sys.getrecursionlimit() * 2
+        graph = graph_.Graph(range(depth), [(i, i+1) for i in range(depth-1)])
+        cb = Callbacks()
+        trail = dfs_.Dfs(direction = 'outward', **cb.callbacks)(graph, [0])
+        self.assertEqual(trail.nodes, list(range(depth)))
+        self.assertEqual(cb.egress_nodes, list(reversed(range(depth))))
+
+    def test__same_as_recursive(self):
+        rng = random.Random(1234)
+        for i in range(30):
+            nodes = list(range(25))
+            edges = set((rng.choice(nodes), rng.choice(nodes)) for j in range(40))
+            graph = graph_.Graph(nodes, edges)
+            stop_at = rng.choice(nodes + [None] * 5)
+            for direction in ('outward', 'inward', 'incident'):
+                for kind in ('ingress_func', 'egress_func', 'backedge_func'):
+                    results = []
+                    for klass in (dfs_.Dfs, RecursiveDfs):
+                        func = {kind: (lambda g, n, e=None: n == stop_at
+                                       if kind != 'backedge_func' else
+                                       n[1] == stop_at)}
+                        cb = Callbacks(**func)
+                        search = klass(direction = direction, **cb.callbacks)
+                        trail = search(graph, nodes)
+                        results.append((trail.nodes, trail.edges, trail.backedges,
+                                        trail.result, cb.ingress_nodes,
+                                        cb.egress_nodes, cb.egress_edges,
+                                        cb.backedges))
+                    self.assertEqual(results[0], results[1])
+
+    def test__record_nodes(self):
+        klass = dfs_.Dfs
+        for graph in (self.graph1(), self.graph2()):
+            for direction in ('outward', 'inward', 'incident'):
+                cb, cb2 = Callbacks(), Callbacks()
+                search = klass(direction = direction,
+                               ingress_func = cb.ingress_func,
+                               egress_func = cb.egress_func)
+                trail = search(graph, ['p', 'x'], record = ('nodes',))
+                expct = klass(direction = direction, **cb2.callbacks)(graph, ['p', 'x'])
+                self.assertEqual(trail.nodes, expct.nodes)
+                self.assertEqual(trail.edges, [])
+                self.assertEqual(trail.backedges, [])
+                self.assertEqual(trail.explored_edges, set())
+                self.assertEqual(cb.ingress_nodes, cb2.ingress_nodes)
+                self.assertEqual(cb.egress_nodes, cb2.egress_nodes)
+                self.assertEqual(cb.egress_edges, cb2.egress_edges)
+
+    def test__record_nodes__stop(self):
+        klass = dfs_.Dfs
+        cb, cb2 = Callbacks(ingress_func = lambda g,n,e: n == 'r'), \
+                  Callbacks(ingress_func = lambda g,n,e: n == 'r')
+        search = klass(direction = 'outward',
+                       ingress_func = cb.ingress_func,
+                       egress_func = cb.egress_func)
+        trail = search(self.graph1(), ['p', 'x'], record = ('nodes',))
+        expct = klass(direction = 'outward', **cb2.callbacks)(self.graph1(), ['p', 'x'])
+        self.assertEqual(trail.result, 'r')
+        self.assertEqual(trail.nodes, expct.nodes)
+        self.assertEqual(cb.egress_nodes, cb2.egress_nodes)
+
+    def test__record_nodes__with_backedge_func(self):
+        klass = dfs_.Dfs
+        cb = Callbacks()
+        search = klass(direction = 'outward', **cb.callbacks)
+        trail = search(self.graph1(), ['p', 'x'], record = ('nodes',))
+        self.assertEqual(cb.backedges, [('s','p')])
+        self.assertEqual(trail.backedges, [])
+        self.assertEqual(trail.edges, [])
+
+    def test__without_callbacks(self):
+        klass = dfs_.Dfs
+        records = [None, ('nodes',), ('edges',), ('nodes', 'backedges'), ()]
+        for graph in (self.graph1(), self.graph2()):
+            for direction in ('outward', 'inward', 'incident'):
+                for record in records:
+                    kw = {} if record is None else {'record': record}
+                    trail = klass(direction = direction)(graph, ['p', 'x'], **kw)
+                    expct = klass(direction = direction, **Callbacks().callbacks)(graph, ['p', 'x'], **kw)
+                    self.assertIsNone(trail.result)
+                    self.assertEqual(trail.nodes, expct.nodes)
+                    self.assertEqual(trail.edges, expct.edges)
+                    self.assertEqual(trail.backedges, expct.backedges)
+                    self.assertEqual(trail.explored_nodes, expct.explored_nodes)
+                    if trail.tracks_edges():
+                        self.assertEqual(trail.explored_edges, expct.explored_edges)
+                    else:
+                        self.assertEqual(trail.explored_edges, set())
+
+    def test__iter_events(self):
+        klass = dfs_.Dfs
+        for graph in (self.graph1(), self.graph2()):
+            for direction in ('outward', 'inward', 'incident'):
+                cb = Callbacks()
+                trail = klass(direction = direction, **cb.callbacks)(graph, ['p', 'x'])
+                events = list(klass(direction = direction).iter_events(graph, ['p', 'x']))
+                def select(kind, index):
+                    return [e[index] for e in events if e[0] == kind]
+                self.assertEqual(select(klass.ENTER, 1), cb.ingress_nodes)
+                self.assertEqual(select(klass.LEAVE, 1), cb.egress_nodes)
+                self.assertEqual([e for e in select(klass.LEAVE, 2) if e], cb.egress_edges)
+                self.assertEqual(select(klass.EDGE, 2), trail.edges)
+                self.assertEqual(select(klass.BACKEDGE, 2), trail.backedges)
+
+    def test__iter_events__lazy(self):
+        klass = dfs_.Dfs
+        graph = self.graph1()
+        calls = []
+        def selector(g, n):
+            calls.append(n)
+            return g.outward(n)
+        events = klass(direction = selector).iter_events(graph, ['p', 'x'])
+        self.assertEqual(next(events), (klass.ENTER, 'p', None))
+        self.assertEqual(calls, [])
+        first = list(itertools.islice(events, 2))
+        self.assertEqual(len(first), 2)
+        self.assertEqual(calls, ['p'])
+
 if __name__ == '__main__':
     unittest.main()
 
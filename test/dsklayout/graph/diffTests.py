@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import json
+
+import dsklayout.graph.diff_ as diff_
+import dsklayout.graph.graph_ as graph_
+import dsklayout.model.blkdev_ as blkdev_
+import dsklayout.model.propindex_ as propindex_
+
+class Test__GraphDiff(unittest.TestCase):
+
+    def old(self):
+        nodes = {'sda': {'type': 'disk', 'size': 100},
+                 'sda1': {'type': 'part', 'uuid': 'a', 'label': 'root'},
+                 'sda2': {'type': 'part'},
+                 'sdb': None}
+        return graph_.Graph(nodes, [('sda', 'sda1'), ('sda', 'sda2')])
+
+    def new(self):
+        nodes = {'sda': {'type': 'disk', 'size': 100},
+                 'sda1': {'type': 'part', 'uuid': 'b'},
+                 'sdb': {},
+                 'sdb1': {'type': 'part'}}
+        return graph_.Graph(nodes, [('sda', 'sda1'), ('sdb', 'sdb1')])
+
+    def test__init__(self):
+        diff = diff_.GraphDiff()
+        self.assertEqual(diff.added_nodes, {})
+        self.assertEqual(diff.deleted_nodes, [])
+        self.assertEqual(diff.changed_nodes, {})
+        self.assertEqual(diff.added_edges, [])
+        self.assertEqual(diff.deleted_edges, [])
+        self.assertFalse(diff)
+
+    def test__between(self):
+        diff = diff_.GraphDiff.between(self.old(), self.new())
+        self.assertTrue(diff)
+        self.assertEqual(diff.added_nodes, {'sdb1': {'type': 'part'}})
+        self.assertEqual(diff.deleted_nodes, ['sda2'])
+        self.assertEqual(diff.changed_nodes, {'sda1': ({'uuid': 'b'}, ['label'])})
+        self.assertEqual(diff.added_edges, [('sdb', 'sdb1')])
+        self.assertEqual(diff.deleted_edges, [('sda', 'sda2')])
+        self.assertEqual(repr(diff), "GraphDiff(+1 -1 ~1 nodes, +1 -1 edges)")
+
+    def test__between__same(self):
+        self.assertFalse(diff_.GraphDiff.between(self.old(), self.old()))
+
+    def test__between__blkdevs(self):
+        old = graph_.Graph({'sda': blkdev_.BlkDev({'name': 'sda', 'ro': '0'})})
+        new = graph_.Graph({'sda': blkdev_.BlkDev({'name': 'sda', 'ro': '1'})})
+        diff = diff_.GraphDiff.between(old, new)
+        self.assertEqual(list(diff.changed_nodes), ['sda'])
+
+    def test__between__properties(self):
+        diff = diff_.GraphDiff.between(self.old(), self.new(),
+                                       properties=lambda d: {'x': 1})
+        self.assertEqual(diff.changed_nodes, {})
+
+    def test__apply(self):
+        graph = self.old()
+        diff = diff_.GraphDiff.between(graph, self.new())
+        self.assertIs(diff.apply(graph), graph)
+        expected = dict(self.new().nodes.items(), sdb=None)  # None same as {}
+        self.assertEqual(dict(graph.nodes.items()), expected)
+        self.assertEqual(set(graph.edges), set(self.new().edges))
+        self.assertEqual(graph.roots(), {'sda', 'sdb'})
+
+    def test__apply__node(self):
+        graph = self.old()
+        diff = diff_.GraphDiff.between(graph, self.new())
+        diff.apply(graph, node=blkdev_.BlkDev)
+        self.assertIsInstance(graph.node('sda1'), blkdev_.BlkDev)
+        self.assertEqual(graph.node('sda1').properties, {'type': 'part', 'uuid': 'b'})
+        self.assertIsInstance(graph.node('sdb1'), blkdev_.BlkDev)
+        self.assertEqual(graph.node('sda'), {'type': 'disk', 'size': 100})
+
+    def test__apply__updates_indexes(self):
+        graph = self.old()
+        index = propindex_.PropertyIndex(keys=['uuid'])
+        graph.indexes.add(index)
+        diff_.GraphDiff.between(graph, self.new()).apply(graph)
+        self.assertEqual(index.lookup('uuid', 'b'), {'sda1'})
+        self.assertEqual(index.lookup('uuid', 'a'), set())
+
+    def test__to_dict__from_dict(self):
+        diff = diff_.GraphDiff.between(self.old(), self.new())
+        data = json.loads(json.dumps(diff.to_dict()))
+        copy = diff_.GraphDiff.from_dict(data)
+        self.assertEqual(copy.to_dict(), diff.to_dict())
+        graph = copy.apply(self.old())
+        self.assertEqual(set(graph.edges), set(self.new().edges))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
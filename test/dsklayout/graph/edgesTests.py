@@ -491,6 +491,16 @@ class Test__Edges(unittest.TestCase):
             edges.del_incident('s')
         self.assertEqual(repr('s'), str(context.exception))
 
+    def test__views(self):
+        edges = edges_.Edges([('p','q'), ('p','r'), ('s','r')])
+        self.assertEqual(edges.successors_view('p'), set(['q','r']))
+        self.assertEqual(edges.predecessors_view('r'), set(['p','s']))
+        self.assertEqual(edges.neighbors_view('r'), set(['p','s']))
+        self.assertEqual(edges.outward_view('p'), set([('p','q'), ('p','r')]))
+        self.assertEqual(edges.inward_view('r'), set([('p','r'), ('s','r')]))
+        self.assertEqual(edges.incident_view('p'), set([('p','q'), ('p','r')]))
+        self.assertEqual(edges.successors_view('x'), set())
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -5,6 +5,19 @@ import unittest
 
 import dsklayout.graph.exceptions_ as exceptions_
 
+class Test__CyclicGraphError(unittest.TestCase):
+
+    def test__base(self):
+        self.assertIsInstance(exceptions_.CyclicGraphError("foo"), Exception)
+
+    def test__str(self):
+        self.assertEqual(str(exceptions_.CyclicGraphError("foo bar")), "foo bar")
+
+    def test__backedges(self):
+        self.assertEqual(exceptions_.CyclicGraphError("foo").backedges, [])
+        error = exceptions_.CyclicGraphError("foo", (('a','b'),))
+        self.assertEqual(error.backedges, [('a','b')])
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import unittest.mock as mock
+import array
+import pickle
+
+import dsklayout.graph.frozen_ as frozen_
+import dsklayout.graph.graph_ as graph_
+import dsklayout.graph.bfs_ as bfs_
+import dsklayout.graph.dfs_ as dfs_
+
+class Test__FrozenGraph(unittest.TestCase):
+
+    def graph1(self):
+        nodes = {'p':'P', 'q':'Q', 'r':'R', 's':'S', 't':'T'}
+        edges = {('p','q'):'1', ('p','r'):None, ('s','r'):'3'}
+        return graph_.Graph(nodes, edges)
+
+    def test__init__0(self):
+        frozen = frozen_.FrozenGraph(graph_.Graph())
+        self.assertEqual(dict(frozen.nodes), dict())
+        self.assertEqual(dict(frozen.edges), dict())
+        self.assertEqual(frozen.roots(), set())
+
+    def test__init__1(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        self.assertEqual(dict(frozen.nodes), {'p':'P', 'q':'Q', 'r':'R', 's':'S', 't':'T'})
+        self.assertEqual(dict(frozen.edges), {('p','q'):'1', ('p','r'):None, ('s','r'):'3'})
+        self.assertEqual(len(frozen.nodes), 5)
+        self.assertEqual(len(frozen.edges), 3)
+
+    def test__init__consistency_false(self):
+        graph = graph_.Graph(['p'], [('p','q')], consistency=False)
+        frozen = frozen_.FrozenGraph(graph)
+        self.assertEqual(frozen.successors('p'), {'q'})
+        self.assertEqual(frozen.predecessors('q'), {'p'})
+        self.assertIsNone(frozen.node('q'))
+
+    def test__csr_buffers(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        for buf in (frozen._succ_offsets, frozen._succ_indices,
+                    frozen._pred_offsets, frozen._pred_indices):
+            self.assertIsInstance(buf, array.array)
+            self.assertEqual(buf.typecode, 'l')
+
+    def test__ids__key(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        ids = [frozen.ids[n] for n in 'pqrst']
+        self.assertEqual(sorted(ids), [0, 1, 2, 3, 4])
+        self.assertEqual([frozen.ids.key(i) for i in ids], list('pqrst'))
+        with self.assertRaises(KeyError):
+            frozen.ids['x']
+
+    def test__ids__successors__predecessors(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        p, q, r, s = (frozen.ids[n] for n in 'pqrs')
+        self.assertEqual(sorted(frozen.ids.successors(p)), sorted([q, r]))
+        self.assertEqual(sorted(frozen.ids.predecessors(r)), sorted([p, s]))
+        self.assertEqual(list(frozen.ids.successors(q)), [])
+
+    def test__ids__rows(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        offsets, indices = frozen.ids.rows('predecessors')
+        r = frozen.ids['r']
+        self.assertEqual(len(offsets), 6)
+        self.assertEqual(sorted(indices[offsets[r]:offsets[r+1]]),
+                         sorted([frozen.ids['p'], frozen.ids['s']]))
+        self.assertEqual(frozen.ids.keys, tuple(frozen.nodes))
+        with self.assertRaises(ValueError):
+            frozen.ids.rows('neighbors')
+
+    def test__has_node__node(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        self.assertTrue(frozen.has_node('p'))
+        self.assertFalse(frozen.has_node('x'))
+        self.assertEqual(frozen.node('q'), 'Q')
+        with self.assertRaises(KeyError) as context:
+            frozen.node('x')
+        self.assertEqual(repr('x'), str(context.exception))
+
+    def test__has_edge__edge(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        self.assertTrue(frozen.has_edge(('p','q')))
+        self.assertFalse(frozen.has_edge(('q','p')))
+        self.assertFalse(frozen.has_edge(('x','y')))
+        self.assertFalse(frozen.has_edge(('x',)))
+        self.assertEqual(frozen.edge(('p','q')), '1')
+        self.assertIsNone(frozen.edge(('p','r')))
+        self.assertIn(('s','r'), frozen.edges)
+        with self.assertRaises(KeyError) as context:
+            frozen.edge(('q','p'))
+        self.assertEqual(repr(('q','p')), str(context.exception))
+
+    def test__read_api(self):
+        graph = self.graph1()
+        frozen = frozen_.FrozenGraph(graph)
+        for node in graph.nodes:
+            self.assertEqual(frozen.has_successors(node), graph.has_successors(node))
+            self.assertEqual(frozen.has_predecessors(node), graph.has_predecessors(node))
+            self.assertEqual(frozen.has_neighbors(node), graph.has_neighbors(node))
+            self.assertEqual(frozen.successors(node), graph.successors(node))
+            self.assertEqual(frozen.predecessors(node), graph.predecessors(node))
+            self.assertEqual(frozen.neighbors(node), graph.neighbors(node))
+            self.assertEqual(frozen.outward(node), graph.outward(node))
+            self.assertEqual(frozen.inward(node), graph.inward(node))
+            self.assertEqual(frozen.incident(node), graph.incident(node))
+        self.assertEqual(frozen.roots(), graph.roots())
+        self.assertEqual(frozen.leafs(), graph.leafs())
+        self.assertEqual(frozen.isolated(), graph.isolated())
+
+    def test__views(self):
+        graph = self.graph1()
+        graph.add_edge(('t','t'))
+        frozen = frozen_.FrozenGraph(graph)
+        for node in graph.nodes:
+            self.assertEqual(frozen.view(node, 'successors'), graph.successors(node))
+            self.assertEqual(frozen.view(node, 'predecessors'), graph.predecessors(node))
+            self.assertEqual(frozen.view(node, 'neighbors'), graph.neighbors(node))
+            self.assertEqual(frozen.view(node, 'outward'), graph.outward(node))
+            self.assertEqual(frozen.view(node, 'inward'), graph.inward(node))
+            self.assertEqual(frozen.view(node, 'incident'), graph.incident(node))
+            self.assertEqual(len(frozen.view(node, 'neighbors')), len(graph.neighbors(node)))
+            self.assertEqual(len(frozen.view(node, 'incident')), len(graph.incident(node)))
+        self.assertIn('q', frozen.view('p', 'successors'))
+        self.assertNotIn('x', frozen.view('p', 'successors'))
+        self.assertIn(('s','r'), frozen.view('r', 'incident'))
+        self.assertNotIn(('r','s'), frozen.view('r', 'incident'))
+        with self.assertRaises(KeyError):
+            frozen.view('x', 'incident')
+        with self.assertRaises(ValueError):
+            frozen.view('p', 'incident_view')
+
+    def test__view__degree(self):
+        graph = self.graph1()
+        graph.add_edge(('r','r'))
+        frozen = frozen_.FrozenGraph(graph)
+        for node in graph.nodes:
+            for kind in ('inward', 'outward'):
+                self.assertEqual(len(frozen.view(node, kind)),
+                                 len(graph.view(node, kind)))
+
+    def test__successors__KeyError(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        with self.assertRaises(KeyError) as context:
+            frozen.successors('x')
+        self.assertEqual(repr('x'), str(context.exception))
+
+    def test__cache__get(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        func = mock.Mock(return_value='x')
+        self.assertEqual(frozen.cache.get('key', func), 'x')
+        self.assertEqual(frozen.cache.get('key', func), 'x')
+        self.assertEqual(frozen.cache.version, 0)
+        func.assert_called_once_with(frozen)
+
+    def test__pickle(self):
+        frozen = frozen_.FrozenGraph(self.graph1())
+        copy = pickle.loads(pickle.dumps(frozen))
+        self.assertEqual(dict(copy.nodes), dict(frozen.nodes))
+        self.assertEqual(dict(copy.edges), dict(frozen.edges))
+        self.assertEqual(copy.ids['r'], frozen.ids['r'])
+        self.assertEqual(copy.successors('p'), {'q', 'r'})
+
+    def test__adjacent(self):
+        self.assertEqual(frozen_.FrozenGraph.adjacent('p', ('p','q')), 'q')
+        self.assertEqual(frozen_.FrozenGraph.adjacent('q', ('p','q')), 'p')
+
+    def test__thaw(self):
+        graph = self.graph1()
+        thawed = graph_.Graph(graph.freeze().nodes, graph.freeze().edges)
+        self.assertEqual(thawed.nodes.data, graph.nodes.data)
+        self.assertEqual(thawed.edges.data, graph.edges.data)
+
+    def test__bfs(self):
+        graph = self.graph1()
+        trail = bfs_.Bfs(direction='outward')(graph.freeze(), ['p'])
+        self.assertEqual(trail.nodes[0], 'p')
+        self.assertEqual(set(trail.nodes), {'p', 'q', 'r'})
+        self.assertEqual(set(trail.edges), {('p','q'), ('p','r')})
+
+    def test__dfs(self):
+        graph = self.graph1()
+        trail = dfs_.Dfs(direction='incident')(graph.freeze(), ['p'])
+        self.assertEqual(set(trail.nodes), {'p', 'q', 'r', 's'})
+        self.assertEqual(set(trail.edges), set(graph.edges))
+
+    def test__bfs__record_nodes(self):
+        graph = self.graph1()
+        graph.add_edge(('q','q'))
+        frozen = graph.freeze()
+        for direction in ('inward', 'outward', 'incident', 'both'):
+            search = bfs_.Bfs(direction=direction)
+            expect = search(graph, ['p', 't', 'r'], record=('nodes',))
+            selector = 'incident' if direction == 'both' else direction
+            with mock.patch.object(frozen_.FrozenGraph, 'view') as view, \
+                 mock.patch.object(frozen_.FrozenGraph, selector) as select:
+                trail = search(frozen, ['p', 't', 'r'], record=('nodes',))
+            self.assertFalse(view.called or select.called)
+            self.assertEqual(trail.nodes[0], 'p')
+            self.assertEqual(sorted(trail.nodes), sorted(expect.nodes))
+            self.assertEqual(trail.explored_nodes, expect.explored_nodes)
+            self.assertEqual(trail.edges, [])
+
+    def test__dfs__record_nodes(self):
+        graph = self.graph1()
+        graph.add_edge(('q','q'))
+        frozen = graph.freeze()
+        for direction in ('inward', 'outward', 'incident'):
+            search = dfs_.Dfs(direction=direction)
+            expect = search(graph, ['s', 'q'], record=())
+            trail = search(frozen, ['s', 'q'], record=())
+            self.assertEqual(trail.nodes, [])
+            self.assertEqual(trail.explored_nodes, expect.explored_nodes)
+        trail = dfs_.Dfs(direction='outward')(frozen, ['p'], record=('nodes',))
+        self.assertIn(trail.nodes, (['p', 'q', 'r'], ['p', 'r', 'q']))
+
+    def test__dfs__record_nodes__custom_selector(self):
+        frozen = self.graph1().freeze()
+        search = dfs_.Dfs(edge_selector=lambda g, n: g.outward(n))
+        with mock.patch.object(frozen_.FrozenGraph, 'outward',
+                               wraps=frozen.outward) as outward:
+            trail = search(frozen, ['p'], record=('nodes',))
+        self.assertTrue(outward.called)
+        self.assertEqual(set(trail.nodes), {'p', 'q', 'r'})
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
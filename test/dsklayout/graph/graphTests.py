@@ -2,10 +2,13 @@
 # -*- coding: utf8 -*-
 
 import unittest
+import unittest.mock as mock
 
 import dsklayout.graph.graph_ as graph_
 import dsklayout.graph.edges_ as edges_
 import dsklayout.graph.nodes_ as nodes_
+import dsklayout.graph.frozen_ as frozen_
+import dsklayout.graph.views_ as views_
 
 class Test__Graph(unittest.TestCase):
 
@@ -360,6 +363,41 @@ class Test__Graph(unittest.TestCase):
             graph.incident('x')
         self.assertEqual(repr('x'), str(context.exception))
 
+    def test__views(self):
+        graph = graph_.Graph(['p','q','r','s','t'], [('p','q'), ('p','r'), ('s','r')])
+        for node in graph.nodes:
+            self.assertEqual(graph.view(node, 'successors'), graph.successors(node))
+            self.assertEqual(graph.view(node, 'predecessors'), graph.predecessors(node))
+            self.assertEqual(graph.view(node, 'neighbors'), graph.neighbors(node))
+            self.assertEqual(graph.view(node, 'outward'), graph.outward(node))
+            self.assertEqual(graph.view(node, 'inward'), graph.inward(node))
+            self.assertEqual(graph.view(node, 'incident'), graph.incident(node))
+        self.assertIsInstance(graph.view('p', 'successors'), views_.NodesView)
+        self.assertIsInstance(graph.view('p', 'incident'), views_.EdgesView)
+
+    def test__views__live(self):
+        graph = graph_.Graph(['p','q','t'], [('p','q')])
+        successors = graph.view('t', 'successors')
+        incident = graph.view('q', 'incident')
+        graph.add_edge(('t','q'))
+        self.assertEqual(successors, set(['q']))
+        self.assertEqual(incident, set([('p','q'), ('t','q')]))
+        graph.del_node('t')
+        self.assertEqual(incident, set([('p','q')]))
+
+    def test__views__KeyError(self):
+        graph = graph_.Graph(['p','q'], [('p','q')])
+        for kind in ('successors', 'predecessors', 'neighbors',
+                     'outward', 'inward', 'incident'):
+            with self.assertRaises(KeyError) as context:
+                graph.view('x', kind)
+            self.assertEqual(repr('x'), str(context.exception))
+
+    def test__views__ValueError(self):
+        graph = graph_.Graph(['p','q'], [('p','q')])
+        with self.assertRaises(ValueError):
+            graph.view('p', 'successors_view')
+
     def test__adjacent__1(self):
         self.assertEqual(graph_.Graph.adjacent('p',('p','q')), 'q')
         self.assertEqual(graph_.Graph.adjacent('q',('p','q')), 'p')
@@ -381,6 +419,84 @@ class Test__Graph(unittest.TestCase):
         graph = graph_.Graph(['p','q','r','s','t'], [('p','q'), ('p','r'), ('s','r')])
         self.assertEqual(graph.isolated(), set(['t']))
 
+    def test__del_node__isolated(self):
+        graph = graph_.Graph(['p','q','x'], [('p','q')])
+        graph.del_node('x')
+        self.assertEqual(graph.nodes.data, {'p':None, 'q':None})
+        self.assertEqual(graph.edges.data, {('p','q'):None})
+
+    def test__cache__version(self):
+        graph = graph_.Graph(['p','q'], [('p','q')])
+        self.assertEqual(graph.cache.version, 0)
+        graph.add_node('r')
+        self.assertEqual(graph.cache.version, 1)
+        graph.add_edge(('q','r'))
+        self.assertEqual(graph.cache.version, 2)
+        graph.del_edge(('q','r'))
+        self.assertEqual(graph.cache.version, 3)
+        graph.del_node('r')
+        self.assertEqual(graph.cache.version, 4)
+        graph.discard_edge(('q','r'))
+        graph.discard_node('r')
+        self.assertEqual(graph.cache.version, 4)
+
+    def test__view__degree(self):
+        graph = graph_.Graph(['p','q','r','s','t'], [('p','q'), ('p','r'), ('s','r'), ('r','r')])
+        self.assertEqual(len(graph.view('p', 'outward')), 2)
+        self.assertEqual(len(graph.view('p', 'inward')), 0)
+        self.assertEqual(len(graph.view('r', 'inward')), 3)
+        self.assertEqual(len(graph.view('r', 'outward')), 1)
+        self.assertEqual(len(graph.view('t', 'inward')), 0)
+
+    def test__roots_leafs_isolated__cached(self):
+        graph = graph_.Graph(['p','q','r','s','t'], [('p','q'), ('p','r'), ('s','r')])
+        self.assertEqual(graph.roots(), set(['p','s','t']))
+        with mock.patch.object(graph_._Cache, '_items') as select:
+            self.assertEqual(graph.roots(), set(['p','s','t']))
+            self.assertEqual(graph.leafs(), set(['q','r','t']))
+            self.assertEqual(graph.isolated(), set(['t']))
+            self.assertFalse(select.called)
+
+    def test__roots_leafs_isolated__returns_copy(self):
+        graph = graph_.Graph(['p','q'], [('p','q')])
+        graph.roots().add('x')
+        self.assertEqual(graph.roots(), set(['p']))
+
+    def test__roots_leafs_isolated__incremental(self):
+        graph = graph_.Graph(['p','q','r','s','t'], [('p','q'), ('p','r'), ('s','r')])
+        graph.roots()  # populate cache
+        def check():
+            fresh = graph_.Graph(graph.nodes, graph.edges)
+            self.assertEqual(graph.roots(), fresh.roots())
+            self.assertEqual(graph.leafs(), fresh.leafs())
+            self.assertEqual(graph.isolated(), fresh.isolated())
+        graph.add_edge(('t','p'));  check()
+        graph.add_edge(('r','u'));  check()
+        graph.add_node('v');        check()
+        graph.del_edge(('s','r'));  check()
+        graph.del_node('p');        check()
+        graph.add_edge(('v','v'));  check()
+        graph.discard_node('r');    check()
+        graph.del_edge(('v','v'));  check()
+
+    def test__cache__get(self):
+        graph = graph_.Graph(['p','q'], [('p','q')])
+        func = mock.Mock(side_effect=lambda g: len(g.nodes))
+        self.assertEqual(graph.cache.get('count', func), 2)
+        self.assertEqual(graph.cache.get('count', func), 2)
+        self.assertEqual(func.call_count, 1)
+        graph.add_node('r')
+        self.assertEqual(graph.cache.get('count', func), 3)
+        self.assertEqual(func.call_count, 2)
+        func.assert_called_with(graph)
+
+    def test__freeze(self):
+        graph = graph_.Graph({'p':'P', 'q':'Q', 'r':'R'}, {('p','q'):'1', ('q','r'):'2'})
+        frozen = graph.freeze()
+        self.assertIsInstance(frozen, frozen_.FrozenGraph)
+        self.assertEqual(dict(frozen.nodes), graph.nodes.data)
+        self.assertEqual(dict(frozen.edges), graph.edges.data)
+
 if __name__ == '__main__':
     unittest.main()
 
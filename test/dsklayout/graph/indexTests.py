@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+
+import dsklayout.graph.index_ as index_
+import dsklayout.graph.graph_ as graph_
+
+class RecordingIndex(index_.Index):
+
+    __slots__ = ('events',)
+
+    def __init__(self):
+        self.events = []
+
+    def rebuild(self, graph):
+        self.events.append(('rebuild',))
+
+    def node_added(self, graph, node):
+        self.events.append(('node_added', node))
+
+    def node_deleted(self, graph, node):
+        self.events.append(('node_deleted', node))
+
+    def edge_added(self, graph, edge):
+        self.events.append(('edge_added', edge))
+
+    def edge_deleted(self, graph, edge):
+        self.events.append(('edge_deleted', edge))
+
+class Test__Index(unittest.TestCase):
+
+    def test__abstract(self):
+        with self.assertRaises(TypeError):
+            index_.Index()
+
+    def test__hooks__noop(self):
+        class Index(index_.Index):
+            def rebuild(self, graph):
+                pass
+        index = Index()
+        graph = graph_.Graph()
+        self.assertIsNone(index.node_added(graph, 'a'))
+        self.assertIsNone(index.node_deleted(graph, 'a'))
+        self.assertIsNone(index.edge_added(graph, ('a','b')))
+        self.assertIsNone(index.edge_deleted(graph, ('a','b')))
+
+class Test__Graph__Index(unittest.TestCase):
+
+    def test__indexes__add(self):
+        graph = graph_.Graph()
+        index = RecordingIndex()
+        self.assertIs(graph.indexes.add(index), index)
+        self.assertEqual(list(graph.indexes), [index])
+        self.assertEqual(index.events, [('rebuild',)])
+
+    def test__indexes__remove(self):
+        graph = graph_.Graph()
+        index = graph.indexes.add(RecordingIndex())
+        graph.indexes.remove(index)
+        self.assertEqual(list(graph.indexes), [])
+        graph.add_node('a')
+        self.assertEqual(index.events, [('rebuild',)])
+
+    def test__add_node(self):
+        graph = graph_.Graph()
+        index = graph.indexes.add(RecordingIndex())
+        graph.add_node('a')
+        self.assertEqual(index.events[1:], [('node_added', 'a')])
+
+    def test__add_edge(self):
+        graph = graph_.Graph(['a'])
+        index = graph.indexes.add(RecordingIndex())
+        graph.add_edge(('a','b'))
+        self.assertEqual(index.events[1:], [('node_added', 'b'),
+                                            ('edge_added', ('a','b'))])
+
+    def test__add_edge__self_loop(self):
+        graph = graph_.Graph()
+        index = graph.indexes.add(RecordingIndex())
+        graph.add_edge(('a','a'))
+        self.assertEqual(index.events[1:], [('node_added', 'a'),
+                                            ('edge_added', ('a','a'))])
+
+    def test__del_edge(self):
+        graph = graph_.Graph(['a', 'b'], [('a','b')])
+        index = graph.indexes.add(RecordingIndex())
+        graph.del_edge(('a','b'))
+        self.assertEqual(index.events[1:], [('edge_deleted', ('a','b'))])
+
+    def test__del_node(self):
+        graph = graph_.Graph(['a', 'b', 'c'], [('a','b'), ('b','c')])
+        index = graph.indexes.add(RecordingIndex())
+        graph.del_node('b')
+        self.assertEqual(sorted(index.events[1:-1]),
+                         [('edge_deleted', ('a','b')),
+                          ('edge_deleted', ('b','c'))])
+        self.assertEqual(index.events[-1], ('node_deleted', 'b'))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
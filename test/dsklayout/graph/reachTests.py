@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import random
+
+import dsklayout.graph.reach_ as reach_
+import dsklayout.graph.graph_ as graph_
+import dsklayout.graph.bfs_ as bfs_
+
+class Test__Reachability(unittest.TestCase):
+
+    def graph1(self):
+        # a -> b -> c -> d, b -> e, f -> c, g isolated
+        edges = [('a','b'), ('b','c'), ('c','d'), ('b','e'), ('f','c')]
+        return graph_.Graph('abcdefg', edges)
+
+    def expected(self, graph, node, direction):
+        # nodes visited from node's neighbors, node itself only via a cycle
+        if direction == 'outward':
+            start = graph.successors(node)
+        else:
+            start = graph.predecessors(node)
+        trail = bfs_.Bfs(direction=direction)(graph, list(start))
+        return set(trail.nodes)
+
+    def check(self, graph, index):
+        for node in graph.nodes:
+            self.assertEqual(index.descendants(node),
+                             self.expected(graph, node, 'outward'))
+            self.assertEqual(index.ancestors(node),
+                             self.expected(graph, node, 'inward'))
+
+    def test__rebuild(self):
+        graph = self.graph1()
+        index = graph.indexes.add(reach_.Reachability())
+        self.assertEqual(index.descendants('a'), set('bcde'))
+        self.assertEqual(index.descendants('d'), set())
+        self.assertEqual(index.ancestors('c'), set('abf'))
+        self.assertEqual(index.ancestors('g'), set())
+        self.check(graph, index)
+
+    def test__rebuild__cycle(self):
+        graph = graph_.Graph('abcd', [('a','b'), ('b','c'), ('c','a'),
+                                      ('c','d')])
+        index = graph.indexes.add(reach_.Reachability())
+        self.assertEqual(index.descendants('a'), set('abcd'))
+        self.assertEqual(index.ancestors('d'), set('abc'))
+        self.assertEqual(index.descendants('d'), set())
+
+    def test__rebuild__self_loop(self):
+        graph = graph_.Graph('ab', [('a','a'), ('a','b')])
+        index = graph.indexes.add(reach_.Reachability())
+        self.assertEqual(index.descendants('a'), set('ab'))
+        self.assertEqual(index.ancestors('a'), set('a'))
+
+    def test__is_reachable(self):
+        index = self.graph1().indexes.add(reach_.Reachability())
+        self.assertTrue(index.is_reachable('a', 'd'))
+        self.assertTrue(index.is_reachable('f', 'd'))
+        self.assertTrue(index.is_reachable('g', 'g'))
+        self.assertFalse(index.is_reachable('d', 'a'))
+        self.assertFalse(index.is_reachable('f', 'e'))
+
+    def test__KeyError(self):
+        index = self.graph1().indexes.add(reach_.Reachability())
+        with self.assertRaises(KeyError):
+            index.descendants('x')
+        with self.assertRaises(KeyError):
+            index.ancestors('x')
+        with self.assertRaises(KeyError):
+            index.is_reachable('a', 'x')
+
+    def test__add_edge(self):
+        graph = self.graph1()
+        index = graph.indexes.add(reach_.Reachability())
+        graph.add_edge(('d','g'))
+        self.assertEqual(index.descendants('a'), set('bcdeg'))
+        self.assertEqual(index.ancestors('g'), set('abcdf'))
+        graph.add_edge(('g','x'))
+        self.assertEqual(index.descendants('f'), set('cdgx'))
+        self.check(graph, index)
+
+    def test__del_edge(self):
+        graph = self.graph1()
+        index = graph.indexes.add(reach_.Reachability())
+        graph.del_edge(('b','c'))
+        self.assertEqual(index.descendants('a'), set('be'))
+        self.assertEqual(index.ancestors('d'), set('cf'))
+        self.check(graph, index)
+
+    def test__del_edge__cycle(self):
+        graph = graph_.Graph('abc', [('a','b'), ('b','c'), ('c','a')])
+        index = graph.indexes.add(reach_.Reachability())
+        graph.del_edge(('c','a'))
+        self.assertEqual(index.descendants('a'), set('bc'))
+        self.assertEqual(index.descendants('c'), set())
+        self.assertEqual(index.ancestors('a'), set())
+        self.check(graph, index)
+
+    def test__del_node(self):
+        graph = self.graph1()
+        index = graph.indexes.add(reach_.Reachability())
+        graph.del_node('c')
+        self.assertEqual(index.descendants('a'), set('be'))
+        self.assertEqual(index.ancestors('d'), set())
+        with self.assertRaises(KeyError):
+            index.descendants('c')
+        graph.add_edge(('d','y'))
+        self.check(graph, index)
+
+    def test__random_updates(self):
+        rnd = random.Random(1234)
+        nodes = list(range(12))
+        graph = graph_.Graph(nodes)
+        index = graph.indexes.add(reach_.Reachability())
+        for _ in range(300):
+            action = rnd.random()
+            if action < 0.5:
+                graph.add_edge((rnd.choice(nodes), rnd.choice(nodes)))
+            elif action < 0.85 and graph.edges:
+                graph.del_edge(rnd.choice(sorted(graph.edges)))
+            elif action < 0.95 and graph.nodes:
+                graph.del_node(rnd.choice(sorted(graph.nodes)))
+            else:
+                node = rnd.choice(nodes)
+                if not graph.has_node(node):
+                    graph.add_node(node)
+            self.check(graph, index)
+        fresh = reach_.Reachability()
+        fresh.rebuild(graph)
+        for node in graph.nodes:
+            self.assertEqual(index.descendants(node), fresh.descendants(node))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+
+import dsklayout.graph.scc_ as scc_
+import dsklayout.graph.graph_ as graph_
+import dsklayout.graph.topo_ as topo_
+
+class Test__scc(unittest.TestCase):
+
+    def graph1(self):
+        # a <-> b -> c -> d -> e -> c, f isolated, g -> g
+        edges = [('a','b'), ('b','a'), ('b','c'), ('c','d'), ('d','e'),
+                 ('e','c'), ('g','g')]
+        return graph_.Graph('abcdefg', edges)
+
+    def test__strongly_connected_components__empty(self):
+        self.assertEqual(scc_.strongly_connected_components(graph_.Graph()), [])
+
+    def test__strongly_connected_components(self):
+        result = scc_.strongly_connected_components(self.graph1())
+        self.assertEqual(sorted(map(sorted, result)),
+                         [['a','b'], ['c','d','e'], ['f'], ['g']])
+
+    def test__strongly_connected_components__topological(self):
+        graph = self.graph1()
+        result = scc_.strongly_connected_components(graph)
+        position = {n: i for (i, c) in enumerate(result) for n in c}
+        for (left, right) in graph.edges:
+            self.assertLessEqual(position[left], position[right])
+
+    def test__strongly_connected_components__dag(self):
+        graph = graph_.Graph('abc', [('a','b'), ('b','c'), ('a','c')])
+        result = scc_.strongly_connected_components(graph)
+        self.assertEqual(result, [{'a'}, {'b'}, {'c'}])
+
+    def test__strongly_connected_components__consistency_false(self):
+        graph = graph_.Graph(['a'], [('c','a'), ('a','c')], consistency=False)
+        result = scc_.strongly_connected_components(graph)
+        self.assertEqual(result, [{'a','c'}])
+
+    def test__strongly_connected_components__large(self):
+        n = 100000
+        edges = [(i, i + 1) for i in range(n)]
+        graph = graph_.Graph(range(n + 1), edges + [(n, 0)])
+        result = scc_.strongly_connected_components(graph)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(len(result[0]), n + 1)
+        graph.del_edge((n, 0))
+        result = scc_.strongly_connected_components(graph)
+        self.assertEqual(len(result), n + 1)
+        self.assertEqual(result[0], {0})
+
+    def test__condensation(self):
+        graph = self.graph1()
+        dag = scc_.condensation(graph)
+        self.assertIsInstance(dag, graph_.Graph)
+        members = {dag.node(i): i for i in dag.nodes}
+        ab, cde = members[frozenset('ab')], members[frozenset('cde')]
+        self.assertEqual(set(dag.edges), {(ab, cde)})
+        self.assertEqual(len(dag.nodes), 4)
+        topo_.topological_sort(dag)  # acyclic
+
+    def test__condensation__components(self):
+        graph = self.graph1()
+        components = [set('ab'), set('cde'), set('f'), set('g')]
+        dag = scc_.condensation(graph, components)
+        self.assertEqual(dag.nodes.data, {0: frozenset('ab'),
+                                          1: frozenset('cde'),
+                                          2: frozenset('f'),
+                                          3: frozenset('g')})
+        self.assertEqual(set(dag.edges), {(0, 1)})
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
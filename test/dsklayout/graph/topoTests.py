@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import unittest.mock as mock
+
+import dsklayout.graph.topo_ as topo_
+import dsklayout.graph.graph_ as graph_
+import dsklayout.graph.exceptions_ as exceptions_
+
+class Test__topo(unittest.TestCase):
+
+    def graph1(self):
+        # sda -> sda1 -> md0 -> vg-lv -> crypt, sdb -> sdb1 -> md0, sdc
+        edges = [('sda','sda1'), ('sda1','md0'), ('sdb','sdb1'),
+                 ('sdb1','md0'), ('md0','vg-lv'), ('vg-lv','crypt')]
+        return graph_.Graph(['sda','sda1','sdb','sdb1','md0','vg-lv','crypt',
+                             'sdc'], edges)
+
+    def assertTopological(self, graph, order):
+        self.assertEqual(sorted(order), sorted(graph.nodes))
+        position = {n: i for i, n in enumerate(order)}
+        for (left, right) in graph.edges:
+            self.assertLess(position[left], position[right])
+
+    def test__topological_sort__empty(self):
+        self.assertEqual(topo_.topological_sort(graph_.Graph()), [])
+
+    def test__topological_sort(self):
+        graph = self.graph1()
+        self.assertTopological(graph, topo_.topological_sort(graph))
+
+    def test__topological_sort__consistency_false(self):
+        graph = graph_.Graph(['a'], [('a','b'), ('c','a')], consistency=False)
+        self.assertEqual(topo_.topological_sort(graph), ['c', 'a', 'b'])
+
+    def test__topological_sort__frozen(self):
+        graph = self.graph1()
+        order = topo_.topological_sort(graph.freeze())
+        self.assertTopological(graph, order)
+
+    def test__topological_sort__cached(self):
+        graph = self.graph1()
+        order = topo_.topological_sort(graph)
+        with mock.patch.object(topo_, '_kahn') as kahn:
+            self.assertEqual(topo_.topological_sort(graph), order)
+            self.assertFalse(kahn.called)
+        graph.add_edge(('crypt','sdc'))
+        order = topo_.topological_sort(graph)
+        self.assertTopological(graph, order)
+        self.assertEqual(order[-1], 'sdc')
+
+    def test__topological_sort__returns_copy(self):
+        graph = self.graph1()
+        topo_.topological_sort(graph).clear()
+        self.assertEqual(len(topo_.topological_sort(graph)), 8)
+
+    def test__topological_sort__CyclicGraphError(self):
+        graph = self.graph1()
+        graph.add_edge(('crypt','sda1'))
+        with self.assertRaises(exceptions_.CyclicGraphError) as context:
+            topo_.topological_sort(graph)
+        self.assertEqual(len(context.exception.backedges), 1)
+        self.assertIn(context.exception.backedges[0],
+                      [('sda1','md0'), ('md0','vg-lv'), ('vg-lv','crypt'),
+                       ('crypt','sda1')])
+
+    def test__topological_sort__self_loop(self):
+        graph = graph_.Graph(['a','b'], [('a','a'), ('a','b')])
+        with self.assertRaises(exceptions_.CyclicGraphError) as context:
+            topo_.topological_sort(graph)
+        self.assertEqual(context.exception.backedges, [('a','a')])
+
+    def test__topological_sort__backedge_func(self):
+        graph = graph_.Graph('abcd', [('a','b'), ('b','c'), ('c','a'),
+                                      ('c','d')])
+        backedge_func = mock.Mock()
+        order = topo_.topological_sort(graph, backedge_func)
+        self.assertEqual(backedge_func.call_count, 1)
+        (_, backedge), _ = backedge_func.call_args
+        graph.del_edge(backedge)
+        self.assertTopological(graph, order)
+
+    def test__levels(self):
+        graph = self.graph1()
+        self.assertEqual(topo_.levels(graph), {'sda':0, 'sdb':0, 'sdc':0,
+                                               'sda1':1, 'sdb1':1, 'md0':2,
+                                               'vg-lv':3, 'crypt':4})
+
+    def test__levels__longest_path(self):
+        graph = graph_.Graph('abc', [('a','b'), ('b','c'), ('a','c')])
+        self.assertEqual(topo_.levels(graph), {'a':0, 'b':1, 'c':2})
+
+    def test__levels__cached(self):
+        graph = self.graph1()
+        result = topo_.levels(graph)
+        with mock.patch.object(topo_, '_assign_levels') as assign:
+            self.assertEqual(topo_.levels(graph), result)
+            self.assertFalse(assign.called)
+        graph.del_edge(('sdb1','md0'))
+        self.assertEqual(topo_.levels(graph)['crypt'], 4)
+        graph.del_edge(('sda1','md0'))
+        self.assertEqual(topo_.levels(graph)['crypt'], 2)
+
+    def test__levels__CyclicGraphError(self):
+        graph = graph_.Graph('ab', [('a','b'), ('b','a')])
+        with self.assertRaises(exceptions_.CyclicGraphError):
+            topo_.levels(graph)
+
+    def test__levels__backedge_func(self):
+        graph = graph_.Graph('abc', [('a','b'), ('b','c'), ('c','b')])
+        backedge_func = mock.Mock()
+        self.assertEqual(topo_.levels(graph, backedge_func),
+                         {'a':0, 'b':1, 'c':2})
+        backedge_func.assert_called_once_with(graph, ('c','b'))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -115,6 +115,56 @@ class Test__Trail(unittest.TestCase):
         self.assertIs(trail.egress_func, l)
         self.assertIs(trail.backedge_func, b)
 
+    def test__record__default(self):
+        trail = trail_.Trail('graph')
+        self.assertEqual(trail.record, frozenset(['nodes', 'edges', 'backedges']))
+        self.assertTrue(trail.records('nodes'))
+        self.assertTrue(trail.records('edges'))
+        self.assertTrue(trail.records('backedges'))
+        self.assertTrue(trail.tracks_edges())
+
+    def test__record__nodes(self):
+        trail = trail_.Trail('graph', record=('nodes',))
+        self.assertEqual(trail.record, frozenset(['nodes']))
+        trail.explore_and_append_node('p')
+        trail.explore_and_append_edge(('p','q'))
+        trail.explore_and_append_backedge(('q','p'))
+        self.assertEqual(trail.nodes, ['p'])
+        self.assertEqual(trail.edges, [])
+        self.assertEqual(trail.backedges, [])
+        self.assertEqual(trail.explored_edges, set([('p','q'), ('q','p')]))
+        self.assertFalse(trail.tracks_edges())
+
+    def test__record__empty(self):
+        trail = trail_.Trail('graph', record=())
+        trail.append_node('p')
+        self.assertEqual(trail.nodes, [])
+        self.assertFalse(trail.tracks_edges())
+
+    def test__record__backedge_func(self):
+        trail = trail_.Trail('graph', record=('nodes',), backedge_func=lambda *args: False)
+        self.assertTrue(trail.tracks_edges())
+
+    def test__record__ValueError(self):
+        with self.assertRaises(ValueError) as context:
+            trail_.Trail('graph', record=('nodes', 'foo'))
+        self.assertEqual("Invalid record %s" % repr(['foo']), str(context.exception))
+
+    def test__has_callbacks(self):
+        func = lambda *args: False
+        self.assertFalse(trail_.Trail('graph').has_callbacks())
+        self.assertTrue(trail_.Trail('graph', ingress_func=func).has_callbacks())
+        self.assertTrue(trail_.Trail('graph', egress_func=func).has_callbacks())
+        self.assertTrue(trail_.Trail('graph', backedge_func=func).has_callbacks())
+
+    def test__noop(self):
+        self.assertIs(trail_.noop(), False)
+        self.assertIs(trail_.noop('g', 'n', 'e'), False)
+        trail = trail_.Trail('graph')
+        self.assertIs(trail.ingress_func, trail_.noop)
+        self.assertIs(trail.egress_func, trail_.noop)
+        self.assertIs(trail.backedge_func, trail_.noop)
+
 
 if __name__ == '__main__':
     unittest.main()
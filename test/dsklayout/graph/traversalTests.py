@@ -156,6 +156,32 @@ class Test__Traversal(unittest.TestCase):
         graph.outward.assert_called_once_with('n')
 
 
+    def test__views(self):
+        self.assertFalse(Traversal().views)
+        self.assertTrue(Traversal(views=True).views)
+
+    def test__select_incident_edges__views(self):
+        graph = mock.Mock()
+        graph.view = mock.Mock(return_value = 'ok')
+        traversal = Traversal(views=True)
+        self.assertEqual(traversal.select_incident_edges(graph, 'n'), 'ok')
+        self.assertEqual(traversal.select_both_edges(graph, 'n'), 'ok')
+        graph.view.assert_called_with('n', 'incident')
+
+    def test__select_inward_edges__views(self):
+        graph = mock.Mock()
+        graph.view = mock.Mock(return_value = 'ok')
+        traversal = Traversal(views=True)
+        self.assertEqual(traversal.select_inward_edges(graph, 'n'), 'ok')
+        graph.view.assert_called_once_with('n', 'inward')
+
+    def test__select_outward_edges__views(self):
+        graph = mock.Mock()
+        graph.view = mock.Mock(return_value = 'ok')
+        traversal = Traversal(views=True)
+        self.assertEqual(traversal.select_outward_edges(graph, 'n'), 'ok')
+        graph.view.assert_called_once_with('n', 'outward')
+
     def test__call__(self):
         self.assertIsNone(Traversal()('graph', 'startpoint'))
 
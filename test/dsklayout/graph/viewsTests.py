@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import collections.abc
+
+import dsklayout.graph.views_ as views_
+
+class Test__NodesView(unittest.TestCase):
+
+    def registries(self):
+        successors = {'p': {'q', 'r'}, 's': {'r'}}
+        predecessors = {'q': {'p'}, 'r': {'p', 's'}}
+        return successors, predecessors
+
+    def test__isinstance_Set(self):
+        self.assertIsInstance(views_.NodesView('p', {}), collections.abc.Set)
+
+    def test__single_registry(self):
+        successors, _ = self.registries()
+        view = views_.NodesView('p', successors)
+        self.assertEqual(view, {'q', 'r'})
+        self.assertEqual(len(view), 2)
+        self.assertIn('q', view)
+        self.assertNotIn('s', view)
+
+    def test__two_registries(self):
+        successors, predecessors = self.registries()
+        view = views_.NodesView('r', predecessors, successors)
+        self.assertEqual(sorted(view), ['p', 's'])
+        self.assertEqual(len(view), 2)
+
+    def test__missing_node(self):
+        view = views_.NodesView('x', {})
+        self.assertEqual(view, set())
+        self.assertEqual(len(view), 0)
+        self.assertNotIn('p', view)
+
+    def test__live(self):
+        successors, _ = self.registries()
+        view = views_.NodesView('t', successors)
+        self.assertEqual(view, set())
+        successors['t'] = {'u'}
+        self.assertEqual(view, {'u'})
+
+    def test__set_operations(self):
+        successors, _ = self.registries()
+        view = views_.NodesView('p', successors)
+        self.assertEqual(type(view | {'x'}), set)
+        self.assertEqual(view | {'x'}, {'q', 'r', 'x'})
+        self.assertEqual(view & {'q'}, {'q'})
+
+    def test__read_only(self):
+        view = views_.NodesView('p', {'p': {'q'}})
+        self.assertFalse(hasattr(view, 'add'))
+        self.assertFalse(hasattr(view, 'discard'))
+
+    def test__repr(self):
+        view = views_.NodesView('p', {'p': {'q'}})
+        self.assertEqual(repr(view), "NodesView({'q'})")
+
+class Test__EdgesView(unittest.TestCase):
+
+    def registries(self):
+        successors = {'p': {'q', 'p'}, 's': {'p'}}
+        predecessors = {'q': {'p'}, 'p': {'p', 's'}}
+        return successors, predecessors
+
+    def test__outward(self):
+        successors, _ = self.registries()
+        view = views_.EdgesView('p', successors=successors)
+        self.assertEqual(view, {('p','q'), ('p','p')})
+        self.assertEqual(len(view), 2)
+        self.assertIn(('p','q'), view)
+        self.assertNotIn(('s','p'), view)
+
+    def test__inward(self):
+        _, predecessors = self.registries()
+        view = views_.EdgesView('p', predecessors=predecessors)
+        self.assertEqual(view, {('p','p'), ('s','p')})
+        self.assertEqual(len(view), 2)
+        self.assertIn(('s','p'), view)
+        self.assertNotIn(('p','q'), view)
+
+    def test__incident(self):
+        successors, predecessors = self.registries()
+        view = views_.EdgesView('p', successors, predecessors)
+        self.assertEqual(sorted(view), [('p','p'), ('p','q'), ('s','p')])
+        self.assertEqual(len(view), 3)
+
+    def test__contains__malformed(self):
+        successors, predecessors = self.registries()
+        view = views_.EdgesView('p', successors, predecessors)
+        self.assertNotIn(('p',), view)
+        self.assertNotIn(None, view)
+
+    def test__live(self):
+        successors, predecessors = self.registries()
+        view = views_.EdgesView('q', successors, predecessors)
+        self.assertEqual(view, {('p','q')})
+        successors['q'] = {'r'}
+        self.assertEqual(view, {('p','q'), ('q','r')})
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
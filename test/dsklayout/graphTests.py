@@ -9,9 +9,16 @@ class Test__graph__PackageSymbols(unittest.TestCase):
     def test__bfs__symbols(self):
         self.assertIs(graph.Bfs, graph.bfs_.Bfs)
 
+    def test__components__symbols(self):
+        self.assertIs(graph.components, graph.components_.components)
+        self.assertIs(graph.map_components, graph.components_.map_components)
+
     def test__dfs__symbols(self):
         self.assertIs(graph.Dfs, graph.dfs_.Dfs)
 
+    def test__diff__symbols(self):
+        self.assertIs(graph.GraphDiff, graph.diff_.GraphDiff)
+
     def test__edges__symbols(self):
         self.assertIs(graph.Edges, graph.edges_.Edges)
 
@@ -19,20 +26,42 @@ class Test__graph__PackageSymbols(unittest.TestCase):
         self.assertIs(graph.Elems, graph.elems_.Elems)
 
     def test__exceptions__symbols(self):
-        self.assertTrue(True)
+        self.assertIs(graph.CyclicGraphError, graph.exceptions_.CyclicGraphError)
+
+    def test__frozen__symbols(self):
+        self.assertIs(graph.FrozenGraph, graph.frozen_.FrozenGraph)
 
     def test__graph__symbols(self):
         self.assertIs(graph.Graph, graph.graph_.Graph)
 
+    def test__index__symbols(self):
+        self.assertIs(graph.Index, graph.index_.Index)
+
     def test__nodes__symbols(self):
         self.assertIs(graph.Nodes, graph.nodes_.Nodes)
 
+    def test__reach__symbols(self):
+        self.assertIs(graph.Reachability, graph.reach_.Reachability)
+
+    def test__scc__symbols(self):
+        self.assertIs(graph.strongly_connected_components,
+                      graph.scc_.strongly_connected_components)
+        self.assertIs(graph.condensation, graph.scc_.condensation)
+
+    def test__topo__symbols(self):
+        self.assertIs(graph.topological_sort, graph.topo_.topological_sort)
+        self.assertIs(graph.levels, graph.topo_.levels)
+
     def test__trail__symbols(self):
         self.assertIs(graph.Trail, graph.trail_.Trail)
 
     def test__traversal__symbols(self):
         self.assertIs(graph.Traversal, graph.traversal_.Traversal)
 
+    def test__views__symbols(self):
+        self.assertIs(graph.NodesView, graph.views_.NodesView)
+        self.assertIs(graph.EdgesView, graph.views_.EdgesView)
+
 if __name__ == '__main__':
     unittest.main()
 
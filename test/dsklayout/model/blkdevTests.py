@@ -2,6 +2,7 @@
 # -*- coding: utf8 -*-
 
 import unittest
+import unittest.mock as mock
 from unittest.mock import patch
 import os.path
 import json
@@ -79,6 +80,54 @@ class Test__BlkDev(unittest.TestCase):
         blkdev.reappear(props)
         self.assertEqual(blkdev.properties, {'name': '/dev/md2', 'fstype': 'ext4', 'parttype': 0xfd})
 
+    def test__reappear__convert_equal_converted(self):
+        blkdev = blkdev_.BlkDev({'name': '/dev/md2', 'ra': '128'}, convert=True)
+        blkdev.reappear({'name': '/dev/md2', 'ra': '0128'})
+        self.assertEqual(blkdev.ra, 128)
+
+    def test__reappear__convert_conflict(self):
+        blkdev = blkdev_.BlkDev({'name': '/dev/md2', 'ro': '0'}, convert=True)
+        with self.assertRaises(exceptions_.InconsistentDataError) as context:
+            blkdev.reappear({'name': '/dev/md2', 'ro': '1'})
+        self.assertEqual("Conflicting values for property ro: False vs True", str(context.exception))
+
+    def test__convert__lazy(self):
+        converter = mock.Mock(return_value=128)
+        with mock.patch.dict(blkdev_.BlkDev._converters, {'ra': converter}):
+            blkdev = blkdev_.BlkDev({'name': '/dev/sda', 'ra': '128'}, convert=True)
+            self.assertFalse(converter.called)
+            self.assertEqual(blkdev.ra, 128)
+            self.assertEqual(blkdev.ra, 128)
+            converter.assert_called_once_with('128')
+
+    def test__convert__keeps_raw_values(self):
+        blkdev = blkdev_.BlkDev({'ra': '128', 'ro': '1'}, convert=True)
+        self.assertIs(blkdev.ro, True)
+        self.assertEqual(blkdev._properties, {'ra': '128', 'ro': '1'})
+        self.assertEqual(blkdev.properties, {'ra': 128, 'ro': True})
+
+    def test__convert__evolving(self):
+        blkdev = blkdev_.BlkDev({'name': '/dev/md2', 'pkname': '/dev/sda2'}, convert=True)
+        self.assertEqual(blkdev.pkname, ['/dev/sda2'])
+        blkdev.reappear({'name': '/dev/md2', 'pkname': '/dev/sdb2'})
+        self.assertEqual(blkdev.pkname, ['/dev/sda2', '/dev/sdb2'])
+        blkdev.appear({'name': '/dev/md2', 'pkname': None})
+        self.assertEqual(blkdev.pkname, [])
+
+    def test__convert__evolving_cache(self):
+        with patch.dict(blkdev_.BlkDev._converters, {'pkname': tuple}):
+            blkdev = blkdev_.BlkDev({'name': '/dev/md2', 'pkname': '/dev/sda2'}, convert=True)
+            self.assertEqual(blkdev.pkname, ('/dev/sda2',))
+            blkdev.evolve({'pkname': '/dev/sdb2'})
+            self.assertEqual(blkdev.pkname, ('/dev/sda2', '/dev/sdb2'))
+            blkdev.reappear({'pkname': '/dev/sdb2'})
+            self.assertEqual(blkdev.pkname, ('/dev/sda2', '/dev/sdb2'))
+            blkdev = blkdev_.BlkDev({'name': '/dev/md2'}, convert=True)
+            self.assertEqual(blkdev.properties, {'name': '/dev/md2'})
+            blkdev.evolve({'pkname': '/dev/sda2'})
+            self.assertEqual(blkdev.pkname, ('/dev/sda2',))
+            self.assertEqual(blkdev.properties, {'name': '/dev/md2', 'pkname': ('/dev/sda2',)})
+
     def test__reappear__2(self):
         blkdev = blkdev_.BlkDev({'name': '/dev/md2', 'fstype':  'ext4', 'mountpoint': '/home'})
         with self.assertRaises(exceptions_.InconsistentDataError) as context:
@@ -143,6 +192,10 @@ class Test__BlkDev(unittest.TestCase):
         blkdev = blkdev_.BlkDev({'parttype': '0xfd'}, convert=True)
         self.assertIs(blkdev.parttype, 0xfd)
 
+    def test__parttype__convert_gpt(self):
+        blkdev = blkdev_.BlkDev({'parttype': '21686148-6449-6e6f-744e-656564454649'}, convert=True)
+        self.assertEqual(blkdev.parttype, '21686148-6449-6e6f-744e-656564454649')
+
     def test__parttype__convert_none(self):
         blkdev = blkdev_.BlkDev({'parttype': None}, convert=True)
         self.assertIs(blkdev.parttype, None)
@@ -362,6 +415,16 @@ class Test__BlkDev(unittest.TestCase):
         self.assertEqual(blkdev.vendor, 'ATA')
 
 
+    def test__evolve(self):
+        blkdev = blkdev_.BlkDev({'name': '/dev/md2', 'fstype':  'ext4', 'pkname': '/dev/sda2'})
+        blkdev.evolve({'name': '/dev/md2', 'fstype':  'xfs', 'pkname': '/dev/sdb2'})
+        self.assertEqual(blkdev.properties, {'name': '/dev/md2', 'fstype': 'ext4', 'pkname': ['/dev/sda2', '/dev/sdb2']})
+
+    def test__evolve__no_pkname(self):
+        blkdev = blkdev_.BlkDev({'name': '/dev/md2'})
+        blkdev.evolve({'name': '/dev/md2', 'pkname': None})
+        self.assertEqual(blkdev.properties, {'name': '/dev/md2', 'pkname': []})
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import os.path
+import json
+
+import dsklayout.model.blkdevtable_ as blkdevtable_
+import dsklayout.model.blkdev_ as blkdev_
+import dsklayout.model.lsblk_ as lsblk_
+import dsklayout.model.exceptions_ as exceptions_
+
+
+class Test__BlkDevTable(unittest.TestCase):
+
+    def fixture(self, file):
+        mydir = os.path.dirname(__file__)
+        with open(os.path.join(mydir, 'fixtures', file)) as f:
+            return json.loads(f.read())
+
+    def test__init__0(self):
+        table = blkdevtable_.BlkDevTable()
+        self.assertEqual(len(table), 0)
+        self.assertFalse(table.convert)
+        self.assertIn('fstype', table.columns)
+        self.assertIn('pkname', table.columns)
+
+    def test__add(self):
+        table = blkdevtable_.BlkDevTable()
+        dev = table.add({'name': '/dev/sda', 'type': 'disk', 'pkname': None})
+        self.assertIsInstance(dev, blkdevtable_.BlkDevRow)
+        self.assertIsInstance(dev, blkdev_.BlkDev)
+        self.assertIs(dev.table, table)
+        self.assertEqual(dev.row, 0)
+        self.assertEqual(len(table), 1)
+        self.assertEqual(dev.properties, {'name': '/dev/sda', 'type': 'disk',
+                                          'pkname': []})
+
+    def test__attributes(self):
+        table = blkdevtable_.BlkDevTable()
+        dev = table.add({'name': '/dev/sda', 'size': '1024', 'ro': '0'})
+        self.assertEqual(dev.name, '/dev/sda')
+        self.assertEqual(dev.size, '1024')
+        with self.assertRaises(KeyError):
+            dev.fstype
+
+    def test__attributes__convert(self):
+        table = blkdevtable_.BlkDevTable(convert=True)
+        dev = table.add({'name': '/dev/sda', 'ra': '128', 'ro': '0'})
+        self.assertEqual(dev.ra, 128)
+        self.assertIs(dev.ro, False)
+        self.assertEqual(dev.properties['ra'], 128)
+        self.assertEqual(table.value(0, 'ra'), '128')
+
+    def test__distinct_values_stored_once(self):
+        table = blkdevtable_.BlkDevTable()
+        for i in range(100):
+            table.add({'name': '/dev/sd%d' % i, 'type': 'disk'})
+        self.assertEqual(table._values['type'][1:], ['disk'])
+        self.assertEqual(table._codes['type'].typecode, 'B')
+        # unique values are not put in a dictionary
+        self.assertNotIn('name', table._codes)
+        self.assertEqual(table.column('name'),
+                         ['/dev/sd%d' % i for i in range(100)])
+
+    def test__codes_widened(self):
+        table = blkdevtable_.BlkDevTable()
+        for i in range(300):
+            table.add({'label': 'label%d' % i, 'type': 'part'})
+        self.assertEqual(table._codes['label'].typecode, 'H')
+        self.assertEqual(table._codes['type'].typecode, 'B')
+        self.assertEqual(table.value(299, 'label'), 'label299')
+        self.assertEqual(table.where({'label': 'label299'}), [299])
+        self.assertEqual(table.select('label', lambda x: x in ('label0',
+                                                               'label299')),
+                         [0, 299])
+
+    def test__extra(self):
+        table = blkdevtable_.BlkDevTable()
+        dev = table.add({'name': '/dev/sda', 'foo': 'FOO', 'model': ['x']})
+        self.assertEqual(dev.properties, {'name': '/dev/sda', 'foo': 'FOO',
+                                          'model': ['x']})
+        self.assertEqual(table.value(0, 'foo'), 'FOO')
+        self.assertEqual(dev.model, ['x'])
+        self.assertEqual(table.column('model'), [None])
+
+    def test__extra__replaced_by_coded_value(self):
+        table = blkdevtable_.BlkDevTable()
+        dev = table.add({'name': '/dev/md2', 'foo': 'FOO'})
+        table.assign_evolving(0, 'pkname', ['/dev/sda2'])  # unhashable
+        self.assertEqual(list(dev.pkname), [['/dev/sda2']])
+        table.assign_evolving(0, 'pkname', '/dev/sdb2')
+        self.assertEqual(dev.pkname, ['/dev/sdb2'])
+        self.assertEqual(dev.properties, {'name': '/dev/md2', 'foo': 'FOO',
+                                          'pkname': ['/dev/sdb2']})
+        dev = table.add({'name': '/dev/md3', 'pkname': None})
+        table.assign_evolving(1, 'pkname', ['/dev/sda3'])
+        table.assign_evolving(1, 'pkname', '/dev/sdb3')
+        self.assertEqual(dev.properties, {'name': '/dev/md3',
+                                          'pkname': ['/dev/sdb3']})
+        self.assertEqual(list(table._extra), [0])
+
+    def test__value__KeyError(self):
+        table = blkdevtable_.BlkDevTable()
+        table.add({'name': '/dev/sda'})
+        with self.assertRaises(KeyError):
+            table.value(0, 'fstype')
+        with self.assertRaises(KeyError):
+            table.value(0, 'foo')
+
+    def test__row__rows(self):
+        table = blkdevtable_.BlkDevTable()
+        table.add({'name': '/dev/sda'})
+        table.add({'name': '/dev/sdb'})
+        self.assertEqual(table.row(1).name, '/dev/sdb')
+        self.assertEqual([d.name for d in table.rows()],
+                         ['/dev/sda', '/dev/sdb'])
+        self.assertEqual([d.name for d in table.rows([1])], ['/dev/sdb'])
+        with self.assertRaises(IndexError):
+            table.row(2)
+
+    def test__appear(self):
+        table = blkdevtable_.BlkDevTable()
+        dev = table.add({'name': '/dev/md2', 'fstype': 'ext4'})
+        dev.appear({'fstype': 'xfs', 'pkname': '/dev/sda2'})
+        self.assertEqual(dev.properties, {'fstype': 'xfs',
+                                          'pkname': ['/dev/sda2']})
+
+    def test__reappear__evolving(self):
+        table = blkdevtable_.BlkDevTable()
+        dev = table.add({'name': '/dev/md2', 'pkname': '/dev/sda2'})
+        dev.reappear({'name': '/dev/md2', 'pkname': '/dev/sdb2'})
+        dev.reappear({'name': '/dev/md2', 'pkname': '/dev/sda2'})
+        self.assertEqual(dev.pkname, ['/dev/sda2', '/dev/sdb2'])
+        self.assertEqual(table.value(0, 'pkname'), ['/dev/sda2', '/dev/sdb2'])
+
+    def test__reappear__inconsistent(self):
+        table = blkdevtable_.BlkDevTable()
+        dev = table.add({'name': '/dev/md2', 'fstype': 'ext4'})
+        with self.assertRaises(exceptions_.InconsistentDataError):
+            dev.reappear({'name': '/dev/md2', 'fstype': 'xfs'})
+
+    def test__column(self):
+        table = blkdevtable_.BlkDevTable()
+        table.add({'type': 'disk'})
+        table.add({'type': 'part'})
+        table.add({'name': '/dev/sdc'})
+        table.add({'type': 'disk'})
+        self.assertEqual(table.column('type'), ['disk', 'part', None, 'disk'])
+
+    def test__select(self):
+        table = blkdevtable_.BlkDevTable()
+        for ra in ('10', '20', '30', '20'):
+            table.add({'ra': ra})
+        calls = []
+
+        def predicate(value):
+            calls.append(value)
+            return value >= 20
+
+        self.assertEqual(table.select('ra', predicate, convert=True),
+                         [1, 2, 3])
+        self.assertEqual(sorted(calls), [10, 20, 30])
+        self.assertEqual(table.select('ra', lambda x: x == '10'), [0])
+        self.assertEqual(table.select('ra', lambda x: False), [])
+
+    def test__select__plain(self):
+        table = blkdevtable_.BlkDevTable()
+        table.add({'name': '/dev/sda', 'size': '4G'})
+        table.add({'type': 'disk'})
+        table.add({'name': '/dev/sdb', 'size': '8G'})
+        self.assertEqual(table.select('name', lambda x: x.endswith('b')), [2])
+        self.assertEqual(table.select('size', lambda x: x is not None),
+                         [0, 2])
+
+    def test__where(self):
+        table = blkdevtable_.BlkDevTable()
+        table.add({'type': 'disk', 'rota': '1'})
+        table.add({'type': 'disk', 'rota': '0'})
+        table.add({'type': 'part', 'rota': '0', 'pkname': '/dev/sdb'})
+        self.assertEqual(table.where({'type': 'disk'}), [0, 1])
+        self.assertEqual(table.where({'type': 'disk', 'rota': '0'}), [1])
+        self.assertEqual(table.where({'pkname': ['/dev/sdb']}), [2])
+        self.assertEqual(table.where({'type': 'lvm'}), [])
+        self.assertEqual(table.where({}), [0, 1, 2])
+
+    def test__where__plain(self):
+        table = blkdevtable_.BlkDevTable()
+        table.add({'name': '/dev/sda', 'type': 'disk'})
+        table.add({'name': '/dev/sdb', 'type': 'disk'})
+        table.add({'name': '/dev/sdb1', 'type': 'part', 'uuid': None})
+        self.assertEqual(table.where({'name': '/dev/sdb'}), [1])
+        self.assertEqual(table.where({'name': '/dev/sdb', 'type': 'part'}),
+                         [])
+        self.assertEqual(table.where({'uuid': None}), [2])
+        self.assertEqual(table.where({'name': '/dev/sdc'}), [])
+
+    def test__lsblk_graph(self):
+        plan = [
+            ('lsblk_1_all.json', False, 'lsblk_1_all.graph.json'),
+            ('lsblk_1_all.flat.json', True, 'lsblk_1_all.graph.json'),
+            ('lsblk_1_sda.json', False, 'lsblk_1_sda.graph.json'),
+        ]
+        for (content, flat, expected) in plan:
+            table = blkdevtable_.BlkDevTable()
+            lsblk = lsblk_.LsBlk(self.fixture(content), flat=flat)
+            graph = lsblk.graph(table=table)
+            expct = self.fixture(expected)
+            self.assertEqual(set(graph.edges),
+                             {tuple(e) for e in expct['edges']})
+            self.assertEqual(len(graph.nodes), len(expct['nodes']))
+            self.assertEqual(len(table), len(expct['nodes']))
+            for node, props in expct['nodes'].items():
+                self.assertIs(graph.nodes[node].table, table)
+                self.assertEqual(props, graph.nodes[node].properties)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -13,6 +13,14 @@ class Test__InconsistentDataError(unittest.TestCase):
     def test__str(self):
         self.assertEqual(str(exceptions_.InconsistentDataError("foo bar")), "foo bar")
 
+class Test__PartitionTableError(unittest.TestCase):
+
+    def test__base(self):
+        self.assertIsInstance(exceptions_.PartitionTableError(), Exception)
+
+    def test__str(self):
+        self.assertEqual(str(exceptions_.PartitionTableError("foo bar")), "foo bar")
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import unittest.mock as mock
+import tempfile
+import shutil
+import os
+import json
+
+import dsklayout.model.layoutcache_ as layoutcache_
+import dsklayout.model.lsblk_ as lsblk_
+import dsklayout.model.blkdev_ as blkdev_
+
+
+class Test__LayoutCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.sysfs = os.path.join(self.tmpdir, 'sys')
+        self.cachedir = os.path.join(self.tmpdir, 'cache')
+        os.makedirs(os.path.join(self.sysfs, 'kernel'))
+        for name in ('sda', 'sdb'):
+            os.makedirs(os.path.join(self.sysfs, 'block', name))
+        self.set_seqnum(1234)
+        self.mountinfo = os.path.join(self.tmpdir, 'mountinfo')
+        self.set_mounts('22 1 8:1 / / rw - ext4 /dev/sda1 rw\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def set_seqnum(self, seqnum):
+        with open(os.path.join(self.sysfs, 'kernel', 'uevent_seqnum'), 'w') as f:
+            f.write('%d\n' % seqnum)
+
+    def set_mounts(self, text):
+        with open(self.mountinfo, 'w') as f:
+            f.write(text)
+
+    def cache(self):
+        return layoutcache_.LayoutCache(self.cachedir, sysfs=self.sysfs,
+                                        mountinfo=self.mountinfo)
+
+    def fixture(self, file):
+        mydir = os.path.dirname(__file__)
+        with open(os.path.join(mydir, 'fixtures', file)) as f:
+            return json.loads(f.read())
+
+    def lsblk_graph(self):
+        return lsblk_.LsBlk(self.fixture('lsblk_1_all.json')).graph()
+
+    def assertGraphsEqual(self, graph, expct):
+        self.assertEqual(set(graph.edges), set(expct.edges))
+        self.assertEqual(set(graph.nodes), set(expct.nodes))
+        for node in expct.nodes:
+            self.assertIsInstance(graph.nodes[node], blkdev_.BlkDev)
+            self.assertEqual(graph.nodes[node].properties,
+                             expct.nodes[node].properties)
+
+    def test__directory(self):
+        self.assertEqual(self.cache().directory, self.cachedir)
+
+    def test__encode_graph__fixture_format(self):
+        data = layoutcache_.LayoutCache.encode_graph(self.lsblk_graph())
+        expct = self.fixture('lsblk_1_all.graph.json')
+        self.assertEqual(data['nodes'], expct['nodes'])
+        self.assertEqual(sorted(data['edges']), sorted(expct['edges']))
+
+    def test__encode_graph__raw_values(self):
+        graph = lsblk_.LsBlk(self.fixture('lsblk_1_sda.json')).graph(convert=True)
+        data = layoutcache_.LayoutCache.encode_graph(graph)
+        self.assertEqual(data['nodes']['/dev/sda']['ro'], '0')
+
+    def test__decode_graph(self):
+        graph = self.lsblk_graph()
+        data = layoutcache_.LayoutCache.encode_graph(graph)
+        data = json.loads(json.dumps(data))
+        self.assertGraphsEqual(layoutcache_.LayoutCache.decode_graph(data), graph)
+
+    def test__key(self):
+        cache = self.cache()
+        key = cache.key(['/dev/sda'], 'lsblk')
+        self.assertEqual(cache.key(['/dev/sda'], 'lsblk'), key)
+        self.assertNotEqual(cache.key(['/dev/sdb'], 'lsblk'), key)
+        self.set_seqnum(1235)
+        self.assertNotEqual(cache.key(['/dev/sda'], 'lsblk'), key)
+
+    def test__key__block_listing(self):
+        cache = self.cache()
+        key = cache.key()
+        os.makedirs(os.path.join(self.sysfs, 'block', 'sdc'))
+        self.assertNotEqual(cache.key(), key)
+
+    def test__key__mounts(self):
+        cache = self.cache()
+        key = cache.key()
+        self.set_mounts('22 1 8:1 / / rw - ext4 /dev/sda1 rw\n'
+                        '23 22 8:17 / /mnt rw - ext4 /dev/sdb1 rw\n')
+        self.assertNotEqual(cache.key(), key)
+        self.assertEqual(cache.key().split('-')[0], key.split('-')[0])
+
+    def test__key__no_mountinfo(self):
+        os.unlink(self.mountinfo)
+        self.assertIsNone(self.cache().key())
+
+    def test__graph__mount_invalidates(self):
+        cache = self.cache()
+        build = mock.Mock(side_effect=self.lsblk_graph)
+        cache.graph(build, ['/dev/sda'])
+        cache.graph(build, ['/dev/sda'])
+        self.assertEqual(build.call_count, 1)
+        self.set_mounts('')
+        cache.graph(build, ['/dev/sda'])
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(len(os.listdir(self.cachedir)), 1)
+
+    def test__key__no_sysfs(self):
+        cache = layoutcache_.LayoutCache(self.cachedir, sysfs=self.cachedir)
+        self.assertIsNone(cache.key())
+
+    def test__store__load(self):
+        cache = self.cache()
+        graph = self.lsblk_graph()
+        self.assertIsNone(cache.load(cache.key()))
+        cache.store(cache.key(), graph)
+        self.assertGraphsEqual(cache.load(cache.key()), graph)
+        self.assertEqual(len(os.listdir(self.cachedir)), 1)
+
+    def test__store__discards_outdated(self):
+        cache = self.cache()
+        graph = self.lsblk_graph()
+        cache.store(cache.key('a'), graph)
+        cache.store(cache.key('b'), graph)
+        self.set_seqnum(1235)
+        cache.store(cache.key('a'), graph)
+        self.assertEqual(len(os.listdir(self.cachedir)), 2)
+        self.assertIsNotNone(cache.load(cache.key('a')))
+
+    def test__load__corrupted(self):
+        cache = self.cache()
+        cache.store(cache.key(), self.lsblk_graph())
+        (name,) = os.listdir(self.cachedir)
+        with open(os.path.join(self.cachedir, name), 'w') as f:
+            f.write('{"nodes": ')
+        self.assertIsNone(cache.load(cache.key()))
+
+    def test__graph(self):
+        cache = self.cache()
+        build = mock.Mock(side_effect=self.lsblk_graph)
+        first = cache.graph(build, ['/dev/sda'], 'lsblk')
+        second = cache.graph(build, ['/dev/sda'], 'lsblk')
+        build.assert_called_once_with()
+        self.assertGraphsEqual(second, first)
+        self.set_seqnum(1235)
+        cache.graph(build, ['/dev/sda'], 'lsblk')
+        self.assertEqual(build.call_count, 2)
+
+    def test__graph__uncacheable(self):
+        cache = layoutcache_.LayoutCache(self.cachedir, sysfs=self.cachedir)
+        build = mock.Mock(return_value='graph')
+        self.assertEqual(cache.graph(build), 'graph')
+        self.assertEqual(cache.graph(build), 'graph')
+        self.assertEqual(build.call_count, 2)
+        self.assertFalse(os.path.exists(self.cachedir))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
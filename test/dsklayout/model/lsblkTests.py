@@ -2,14 +2,23 @@
 # -*- coding: utf8 -*-
 
 import unittest
+import unittest.mock
 from unittest.mock import patch
+import contextlib
 import os.path
 import json
+import io
+import asyncio
+import subprocess
+import tempfile
 
 import dsklayout.model.lsblk_ as lsblk_
+import dsklayout.model.blkdev_ as blkdev_
 from dsklayout.graph import *
 
 backtick = 'dsklayout.model.lsblk_.backtick'
+pipe = 'dsklayout.model.lsblk_.pipe'
+async_backtick = 'dsklayout.model.lsblk_.async_backtick'
 
 class Test__LsBlk(unittest.TestCase):
 
@@ -19,6 +28,12 @@ class Test__LsBlk(unittest.TestCase):
         ('lsblk_1_sda.json',        'lsblk_1_sda.graph.json'),
     ]
 
+    flat_fixture_plan = [
+        ('lsblk_1_all.flat.json',       'lsblk_1_all.graph.json'),
+        ('lsblk_1_sda_sdb.flat.json',   'lsblk_1_sda_sdb.graph.json'),
+        ('lsblk_1_sda.flat.json',       'lsblk_1_sda.graph.json'),
+    ]
+
     def __init__(self, *args, **kw):
         super().__init__(*args, **kw)
         self._fixtures = dict()
@@ -32,8 +47,12 @@ class Test__LsBlk(unittest.TestCase):
             self.load_fixtures()
         return self._fixtures
 
+    def fixture_text(self, file):
+        with open(self.fixture_path(file)) as f:
+            return f.read()
+
     def load_fixtures(self):
-        for left, right in self.fixture_plan:
+        for left, right in self.fixture_plan + self.flat_fixture_plan:
             with open(self.fixture_path(left)) as f:
                 self._fixtures[left] = json.loads(f.read())
             with open(self.fixture_path(right)) as f:
@@ -48,6 +67,10 @@ class Test__LsBlk(unittest.TestCase):
         lsblk = lsblk_.LsBlk(content)
         self.assertIs(lsblk.content, content)
 
+    def test__flat(self):
+        self.assertFalse(lsblk_.LsBlk('content').flat)
+        self.assertTrue(lsblk_.LsBlk('content', flat=True).flat)
+
     def test__run__with_no_args(self):
         with patch(backtick, return_value='ok') as mock:
             self.assertIs(lsblk_.LsBlk.run(), 'ok')
@@ -73,6 +96,11 @@ class Test__LsBlk(unittest.TestCase):
             self.assertIs(lsblk_.LsBlk.run(['sda', 'sdb'], ['-x', '-y'], lsblk='/opt/bin/lsblk'), 'ok')
             mock.assert_called_once_with(['/opt/bin/lsblk', '-J', '-O', '-p', '-x', '-y',  'sda', 'sdb'])
 
+    def test__run__flat(self):
+        with patch(backtick, return_value='ok') as mock:
+            self.assertIs(lsblk_.LsBlk.run(['sda'], ['-x'], flat=True), 'ok')
+            mock.assert_called_once_with(['lsblk', '-J', '-O', '-p', '-l', '-x', 'sda'])
+
     def test__new__with_no_args(self):
         with patch(backtick, return_value='{"foo":"bar"}') as mock:
             lsblk = lsblk_.LsBlk.new()
@@ -80,6 +108,33 @@ class Test__LsBlk(unittest.TestCase):
             self.assertEqual(lsblk.content, {"foo":  "bar"})
             mock.assert_called_once_with(['lsblk', '-J', '-O', '-p'])
 
+    def test__anew(self):
+        async def fake(cmd):
+            return '{"foo":"bar"}'
+        with patch(async_backtick, side_effect=fake) as mock:
+            loop = asyncio.new_event_loop()
+            try:
+                lsblk = loop.run_until_complete(lsblk_.LsBlk.anew('/dev/sda', flat=True))
+            finally:
+                loop.close()
+            self.assertIsInstance(lsblk, lsblk_.LsBlk)
+            self.assertEqual(lsblk.content, {"foo":  "bar"})
+            self.assertTrue(lsblk.flat)
+            mock.assert_called_once_with(['lsblk', '-J', '-O', '-p', '-l', '/dev/sda'])
+
+    def test__anew__runner(self):
+        runner = unittest.mock.Mock()
+        async def fake(cmd):
+            return '{"foo":"bar"}'
+        runner.backtick.side_effect = fake
+        loop = asyncio.new_event_loop()
+        try:
+            lsblk = loop.run_until_complete(lsblk_.LsBlk.anew(runner=runner))
+        finally:
+            loop.close()
+        self.assertEqual(lsblk.content, {"foo":  "bar"})
+        runner.backtick.assert_called_once_with(['lsblk', '-J', '-O', '-p'])
+
     def test__new__with_device(self):
         with patch(backtick, return_value='{"foo":"bar"}') as mock:
             lsblk = lsblk_.LsBlk.new('sda')
@@ -121,6 +176,120 @@ class Test__LsBlk(unittest.TestCase):
             for node, props in expct["nodes"].items():
                 self.assertEqual(props, graph.nodes[node].properties)
 
+    def assertGraphMatches(self, graph, expct):
+        self.assertEqual(set(graph.edges), set(tuple(e) for e in expct["edges"]))
+        self.assertEqual(len(graph.nodes), len(expct["nodes"]))
+        for node, props in expct["nodes"].items():
+            self.assertEqual(props, graph.nodes[node].properties)
+
+    def test__new__flat(self):
+        text = self.fixture_text('lsblk_1_sda.flat.json')
+        with patch(backtick, return_value=text) as mock:
+            lsblk = lsblk_.LsBlk.new(['sda'], flat=True)
+            mock.assert_called_once_with(['lsblk', '-J', '-O', '-p', '-l', 'sda'])
+        self.assertTrue(lsblk.flat)
+        self.assertGraphMatches(lsblk.graph(), self.fixtures['lsblk_1_sda.graph.json'])
+
+    def test__graph__flat__with_fixtures(self):
+        self.maxDiff = None
+        for left, right in self.flat_fixture_plan:
+            graph = lsblk_.LsBlk(self.fixtures[left], flat=True).graph()
+            self.assertGraphMatches(graph, self.fixtures[right])
+
+    def test__graph__flat__no_reappear(self):
+        content = self.fixtures['lsblk_1_sda_sdb.flat.json']
+        with patch.object(blkdev_.BlkDev, 'reappear') as reappear:
+            lsblk_.LsBlk(content, flat=True).graph()
+            self.assertFalse(reappear.called)
+
+    def test__graph__flat__missing_parent(self):
+        content = {'blockdevices': [
+            {'kname': '/dev/sda1', 'pkname': '/dev/sda'},
+            {'kname': '/dev/md0', 'pkname': '/dev/sda1'},
+        ]}
+        graph = lsblk_.LsBlk(content, flat=True).graph()
+        self.assertEqual(set(graph.nodes), {'/dev/sda1', '/dev/md0'})
+        self.assertEqual(set(graph.edges), {('/dev/sda1', '/dev/md0')})
+
+    def test__graph__flat__keyattr(self):
+        content = {'blockdevices': [
+            {'name': 'sda', 'kname': '/dev/sda', 'pkname': None},
+            {'name': 'sda1', 'kname': '/dev/sda1', 'pkname': '/dev/sda'},
+        ]}
+        graph = lsblk_.LsBlk(content, flat=True).graph(keyattr='name')
+        self.assertEqual(set(graph.edges), {('sda', 'sda1')})
+
+    def test__new_graph__flat(self):
+        text = self.fixture_text('lsblk_1_sda_sdb.flat.json')
+        @contextlib.contextmanager
+        def side(cmd):
+            yield io.StringIO(text)
+        with patch(pipe, side_effect=side) as mock:
+            graph = lsblk_.LsBlk.new_graph(['sda', 'sdb'], flat=True)
+            mock.assert_called_once_with(['lsblk', '-J', '-O', '-p', '-l', 'sda', 'sdb'])
+        self.assertGraphMatches(graph, self.fixtures['lsblk_1_sda_sdb.graph.json'])
+
+    def test__iter_blockdevices(self):
+        for left, _ in self.fixture_plan:
+            expct = self.fixtures[left]['blockdevices']
+            for chunk_size in (1, 7, 4096, 65536):
+                stream = io.StringIO(self.fixture_text(left))
+                devices = lsblk_.LsBlk.iter_blockdevices(stream, chunk_size=chunk_size)
+                self.assertEqual(list(devices), expct)
+
+    def test__iter_blockdevices__empty(self):
+        stream = io.StringIO('{"blockdevices": [ ]}')
+        self.assertEqual(list(lsblk_.LsBlk.iter_blockdevices(stream)), [])
+
+    def test__iter_blockdevices__lazy(self):
+        text = '{"blockdevices": [%s]}' % ', '.join(['{"kname": "a"}'] * 1000)
+        stream = io.StringIO(text)
+        devices = lsblk_.LsBlk.iter_blockdevices(stream, chunk_size=64)
+        self.assertEqual(next(devices), {"kname": "a"})
+        self.assertLessEqual(stream.tell(), 64)
+
+    def test__iter_blockdevices__ValueError(self):
+        stream = io.StringIO('{"foo": []}')
+        with self.assertRaises(ValueError):
+            list(lsblk_.LsBlk.iter_blockdevices(stream))
+        stream = io.StringIO('{"blockdevices": [{"kname": "a"}, {"kname": ')
+        with self.assertRaises(ValueError):
+            list(lsblk_.LsBlk.iter_blockdevices(stream, chunk_size=8))
+
+    def test__graph_from_stream__with_fixtures(self):
+        for left, _ in self.fixture_plan:
+            expct = lsblk_.LsBlk(self.fixtures[left]).graph()
+            stream = io.StringIO(self.fixture_text(left))
+            graph = lsblk_.LsBlk.graph_from_stream(stream, chunk_size=512)
+            self.assertEqual(set(graph.edges), set(expct.edges))
+            self.assertEqual(set(graph.nodes), set(expct.nodes))
+            for node in expct.nodes:
+                self.assertEqual(graph.nodes[node].properties, expct.nodes[node].properties)
+
+    def test__new_graph(self):
+        text = self.fixture_text('lsblk_1_sda.json')
+        @contextlib.contextmanager
+        def side(cmd):
+            yield io.StringIO(text)
+        with patch(pipe, side_effect=side) as mock:
+            graph = lsblk_.LsBlk.new_graph(['sda'], lsblk='/opt/bin/lsblk')
+            mock.assert_called_once_with(['/opt/bin/lsblk', '-J', '-O', '-p', 'sda'])
+        expct = self.fixtures['lsblk_1_sda.graph.json']
+        self.assertEqual(set(graph.edges), set(tuple(e) for e in expct["edges"]))
+        self.assertEqual(set(graph.nodes), set(expct["nodes"]))
+
+    def test__new_graph__CalledProcessError(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            lsblk = os.path.join(tmpdir, 'lsblk')
+            with open(lsblk, 'w') as f:
+                f.write('#!/bin/sh\necho "lsblk: $4: not a block device" >&2\nexit 32\n')
+            os.chmod(lsblk, 0o755)
+            with self.assertRaises(subprocess.CalledProcessError) as context:
+                lsblk_.LsBlk.new_graph(['/dev/foo'], lsblk=lsblk)
+        self.assertEqual(context.exception.returncode, 32)
+        self.assertEqual(context.exception.cmd, [lsblk, '-J', '-O', '-p', '/dev/foo'])
+        self.assertEqual(context.exception.stderr, 'lsblk: /dev/foo: not a block device\n')
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import os.path
+import json
+
+import dsklayout.model.propindex_ as propindex_
+import dsklayout.model.blkdev_ as blkdev_
+import dsklayout.model.lsblk_ as lsblk_
+import dsklayout.graph.graph_ as graph_
+
+
+class Test__PropertyIndex(unittest.TestCase):
+
+    def graph1(self):
+        nodes = {
+            '/dev/sda': blkdev_.BlkDev({'type': 'disk', 'serial': 'S1'}),
+            '/dev/sda1': blkdev_.BlkDev({'type': 'part', 'uuid': 'u1',
+                                         'fstype': 'ext4', 'label': 'root'}),
+            '/dev/sda2': blkdev_.BlkDev({'type': 'part', 'uuid': 'u2',
+                                         'fstype': 'LVM2_member',
+                                         'partuuid': 'p2'}),
+            '/dev/sdb': {'type': 'disk', 'fstype': 'LVM2_member'},
+            '/dev/sdc': None,
+        }
+        edges = [('/dev/sda', '/dev/sda1'), ('/dev/sda', '/dev/sda2')]
+        return graph_.Graph(nodes, edges)
+
+    def test__keys(self):
+        index = propindex_.PropertyIndex()
+        self.assertEqual(index.keys, ('uuid', 'partuuid', 'label', 'partlabel',
+                                      'wwn', 'serial', 'fstype', 'type'))
+        index = propindex_.PropertyIndex(['uuid'])
+        self.assertEqual(index.keys, ('uuid',))
+
+    def test__rebuild(self):
+        graph = self.graph1()
+        index = graph.indexes.add(propindex_.PropertyIndex())
+        self.assertEqual(index.lookup('uuid', 'u1'), {'/dev/sda1'})
+        self.assertEqual(index.lookup('fstype', 'LVM2_member'),
+                         {'/dev/sda2', '/dev/sdb'})
+        self.assertEqual(index.lookup('type', 'disk'), {'/dev/sda', '/dev/sdb'})
+        self.assertEqual(index.lookup('serial', 'S1'), {'/dev/sda'})
+        self.assertEqual(index.lookup('uuid', 'x'), set())
+        self.assertEqual(index.values('type'), {'disk', 'part'})
+        self.assertEqual(index.values('wwn'), set())
+
+    def test__lookup__KeyError(self):
+        index = propindex_.PropertyIndex(['uuid'])
+        with self.assertRaises(KeyError):
+            index.lookup('fstype', 'ext4')
+
+    def test__add_node(self):
+        graph = self.graph1()
+        index = graph.indexes.add(propindex_.PropertyIndex())
+        graph.add_node('/dev/sdd', blkdev_.BlkDev({'uuid': 'u4'}))
+        self.assertEqual(index.lookup('uuid', 'u4'), {'/dev/sdd'})
+        graph.add_edge(('/dev/sdd', '/dev/md0'),
+                       **{'/dev/md0': blkdev_.BlkDev({'type': 'raid1'})})
+        self.assertEqual(index.lookup('type', 'raid1'), {'/dev/md0'})
+
+    def test__add_node__replace_data(self):
+        graph = self.graph1()
+        index = graph.indexes.add(propindex_.PropertyIndex())
+        graph.add_node('/dev/sda1', blkdev_.BlkDev({'uuid': 'u5'}))
+        self.assertEqual(index.lookup('uuid', 'u1'), set())
+        self.assertEqual(index.lookup('label', 'root'), set())
+        self.assertEqual(index.lookup('uuid', 'u5'), {'/dev/sda1'})
+        self.assertEqual(index.values('label'), set())
+
+    def test__del_node(self):
+        graph = self.graph1()
+        index = graph.indexes.add(propindex_.PropertyIndex())
+        graph.del_node('/dev/sda2')
+        self.assertEqual(index.lookup('fstype', 'LVM2_member'), {'/dev/sdb'})
+        self.assertEqual(index.lookup('partuuid', 'p2'), set())
+        graph.del_node('/dev/sdc')
+        self.assertEqual(index.lookup('type', 'disk'), {'/dev/sda', '/dev/sdb'})
+
+    def test__resolve(self):
+        graph = self.graph1()
+        index = graph.indexes.add(propindex_.PropertyIndex())
+        self.assertEqual(index.resolve('UUID=u1'), {'/dev/sda1'})
+        self.assertEqual(index.resolve('UUID="u2"'), {'/dev/sda2'})
+        self.assertEqual(index.resolve('LABEL=root'), {'/dev/sda1'})
+        self.assertEqual(index.resolve('PARTUUID=p2'), {'/dev/sda2'})
+        self.assertEqual(index.resolve('PARTLABEL=x'), set())
+        for spec in ('/dev/sda1', 'FOO=bar'):
+            with self.assertRaises(ValueError) as context:
+                index.resolve(spec)
+            self.assertEqual(str(context.exception),
+                             "unsupported device reference: %s" % repr(spec))
+
+    def test__lsblk_graph(self):
+        mydir = os.path.dirname(__file__)
+        with open(os.path.join(mydir, 'fixtures', 'lsblk_1_all.json')) as f:
+            graph = lsblk_.LsBlk(json.loads(f.read())).graph()
+        index = graph.indexes.add(propindex_.PropertyIndex())
+        for key in index.keys:
+            expected = dict()
+            for (node, dev) in graph.nodes.items():
+                value = dev.properties.get(key)
+                if value is not None:
+                    expected.setdefault(value, set()).add(node)
+            self.assertEqual(index.values(key), set(expected))
+            for (value, nodes) in expected.items():
+                self.assertEqual(index.lookup(key, value), nodes)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import tempfile
+import shutil
+import struct
+import uuid
+import zlib
+import os
+
+import dsklayout.model.ptable_ as ptable_
+import dsklayout.model.exceptions_ as exceptions_
+import dsklayout.model.propindex_ as propindex_
+import dsklayout.model.blkdev_ as blkdev_
+import dsklayout.graph.graph_ as graph_
+
+DISK_GUID = '5e5b2c3e-8f2b-4a5b-9d0e-0123456789ab'
+LINUX_FS = '0fc63daf-8483-4772-8e79-3d69d8477de4'
+ESP = 'c12a7328-f81f-11d2-ba4b-00a0c93ec93b'
+
+
+def guid(text):
+    return uuid.UUID(text).bytes_le
+
+
+def mbr_entry(type, start, size, status=0):
+    return struct.pack('<B3sB3sII', status, bytes(3), type, bytes(3), start, size)
+
+
+def boot_sector(entries, signature=0):
+    sector = bytearray(512)
+    struct.pack_into('<I', sector, 440, signature)
+    for (i, entry) in enumerate(entries):
+        sector[446 + 16*i:446 + 16*(i+1)] = entry
+    sector[510:512] = b'\x55\xaa'
+    return sector
+
+
+class Image(object):
+    """Writes partition tables to a sparse image file"""
+
+    def __init__(self, path, sectors, sector_size=512):
+        self.path = path
+        self.sectors = sectors
+        self.sector_size = sector_size
+        with open(path, 'wb') as f:
+            f.truncate(sectors * sector_size)
+
+    def write(self, lba, data):
+        with open(self.path, 'r+b') as f:
+            f.seek(lba * self.sector_size)
+            f.write(data)
+
+    def gpt(self, partitions, count=128):
+        # partitions: (type, guid, first, last, attrs, name)
+        ss = self.sector_size
+        last = self.sectors - 1
+        entries = bytearray(count * 128)
+        for (i, (type, unique, first, end, attrs, name)) in enumerate(partitions):
+            struct.pack_into('<16s16sQQQ72s', entries, i * 128, guid(type),
+                             guid(unique), first, end, attrs,
+                             name.encode('utf-16-le'))
+        entry_sectors = (len(entries) + ss - 1) // ss
+        self.write(0, boot_sector([mbr_entry(0xee, 1, min(last, 0xffffffff))]))
+        self.write(2, entries)
+        self.write(last - entry_sectors, entries)
+        self.write(1, self.gpt_header(1, last, 2, count, entries))
+        self.write(last, self.gpt_header(last, 1, last - entry_sectors, count, entries))
+
+    def gpt_header(self, my_lba, alt_lba, entries_lba, count, entries):
+        header = bytearray(struct.pack('<8sIIIIQQQQ16sQIII', b'EFI PART',
+                                       0x10000, 92, 0, 0, my_lba, alt_lba,
+                                       34, self.sectors - 34, guid(DISK_GUID),
+                                       entries_lba, count, 128,
+                                       zlib.crc32(entries)))
+        struct.pack_into('<I', header, 16, zlib.crc32(header))
+        return header
+
+    def damage(self, lba):
+        self.write(lba, b'\xff' * 16)
+
+
+class Test__Partition(unittest.TestCase):
+
+    def test__init__(self):
+        part = ptable_.Partition(1, 2048, 4096, '0x83', 'abcd-01', 'root', 0x80)
+        self.assertEqual(part.number, 1)
+        self.assertEqual(part.start, 2048)
+        self.assertEqual(part.size, 4096)
+        self.assertEqual(part.type, '0x83')
+        self.assertEqual(part.uuid, 'abcd-01')
+        self.assertEqual(part.name, 'root')
+        self.assertEqual(part.flags, 0x80)
+
+    def test__repr__(self):
+        part = ptable_.Partition(1, 2048, 4096, '0x83', 'abcd-01')
+        self.assertEqual(repr(part), "Partition(1, 2048, 4096, '0x83', 'abcd-01')")
+
+
+class Test__PartitionTable(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def image(self, name='disk.img', sectors=2**21, sector_size=512):
+        return Image(os.path.join(self.tmpdir, name), sectors, sector_size)
+
+    def gpt_image(self, **kw):
+        image = self.image(**kw)
+        image.gpt([
+            (ESP, '11111111-2222-3333-4444-555555555555', 2048, 206847, 0, 'EFI System'),
+            (LINUX_FS, '66666666-7777-8888-9999-aaaaaaaaaaaa', 206848, 1048575, 1 << 60, 'root'),
+        ])
+        return image
+
+    def check_gpt(self, table):
+        self.assertEqual(table.label, 'gpt')
+        self.assertEqual(table.uuid, DISK_GUID)
+        self.assertEqual([p.number for p in table.partitions], [1, 2])
+        esp, root = table.partitions
+        self.assertEqual((esp.start, esp.size), (2048, 204800))
+        self.assertEqual(esp.type, ESP)
+        self.assertEqual(esp.uuid, '11111111-2222-3333-4444-555555555555')
+        self.assertEqual(esp.name, 'EFI System')
+        self.assertEqual((root.start, root.size), (206848, 841728))
+        self.assertEqual(root.flags, 1 << 60)
+        self.assertEqual(root.name, 'root')
+
+    def test__read__gpt(self):
+        image = self.gpt_image()
+        table = ptable_.PartitionTable.read(image.path)
+        self.assertEqual(table.device, image.path)
+        self.assertEqual(table.sector_size, 512)
+        self.assertTrue(table.primary_valid)
+        self.assertTrue(table.backup_valid)
+        self.check_gpt(table)
+
+    def test__read__gpt_is_sparse(self):
+        image = self.gpt_image()
+        self.assertLess(os.stat(image.path).st_blocks * 512, 2**20)
+
+    def test__read__gpt_4096(self):
+        image = self.gpt_image(sectors=2**18, sector_size=4096)
+        table = ptable_.PartitionTable.read(image.path)
+        self.assertEqual(table.sector_size, 4096)
+        self.check_gpt(table)
+
+    def test__read__gpt_damaged_primary_header(self):
+        image = self.gpt_image()
+        image.damage(1)
+        table = ptable_.PartitionTable.read(image.path)
+        self.assertFalse(table.primary_valid)
+        self.assertTrue(table.backup_valid)
+        self.check_gpt(table)
+
+    def test__read__gpt_damaged_primary_entries(self):
+        image = self.gpt_image()
+        image.damage(2)
+        table = ptable_.PartitionTable.read(image.path)
+        self.assertFalse(table.primary_valid)
+        self.assertTrue(table.backup_valid)
+        self.check_gpt(table)
+
+    def test__read__gpt_damaged_backup(self):
+        image = self.gpt_image()
+        image.damage(image.sectors - 1)
+        table = ptable_.PartitionTable.read(image.path)
+        self.assertTrue(table.primary_valid)
+        self.assertFalse(table.backup_valid)
+        self.check_gpt(table)
+
+    def test__read__gpt_damaged_both(self):
+        image = self.gpt_image()
+        image.damage(2)
+        image.damage(image.sectors - 1)
+        with self.assertRaises(exceptions_.PartitionTableError) as context:
+            ptable_.PartitionTable.read(image.path)
+        self.assertEqual(str(context.exception),
+                         "%s: both GPT headers are damaged" % image.path)
+
+    def test__read__mbr(self):
+        image = self.image()
+        image.write(0, boot_sector([
+            mbr_entry(0x83, 2048, 204800, status=0x80),
+            mbr_entry(0x05, 206848, 409600),
+        ], signature=0xdeadbeef))
+        # first EBR: logical partition and link to the next EBR
+        image.write(206848, boot_sector([mbr_entry(0x82, 2048, 100000),
+                                         mbr_entry(0x05, 102400, 307200)]))
+        image.write(206848 + 102400, boot_sector([mbr_entry(0x83, 2048, 200000)]))
+        table = ptable_.PartitionTable.read(image.path)
+        self.assertEqual(table.label, 'dos')
+        self.assertEqual(table.uuid, 'deadbeef')
+        parts = table.partitions
+        self.assertEqual([p.number for p in parts], [1, 2, 5, 6])
+        self.assertEqual([p.type for p in parts], ['0x83', '0x5', '0x82', '0x83'])
+        self.assertEqual([p.start for p in parts], [2048, 206848, 208896, 311296])
+        self.assertEqual([p.size for p in parts], [204800, 409600, 100000, 200000])
+        self.assertEqual([p.flags for p in parts], [0x80, 0, 0, 0])
+        self.assertEqual(table.partition(5).uuid, 'deadbeef-05')
+        with self.assertRaises(KeyError):
+            table.partition(3)
+
+    def test__read__mbr_ebr_loop(self):
+        image = self.image()
+        image.write(0, boot_sector([mbr_entry(0x0f, 2048, 409600)]))
+        image.write(2048, boot_sector([mbr_entry(0x83, 2048, 1000),
+                                       mbr_entry(0x05, 4096, 1)]))
+        image.write(2048 + 4096, boot_sector([mbr_entry(0x83, 2048, 1000),
+                                              mbr_entry(0x05, 4096, 1)]))
+        table = ptable_.PartitionTable.read(image.path)
+        self.assertEqual([p.number for p in table.partitions], [1, 5, 6])
+
+    def test__read__no_table(self):
+        image = self.image()
+        with self.assertRaises(exceptions_.PartitionTableError) as context:
+            ptable_.PartitionTable.read(image.path)
+        self.assertEqual(str(context.exception),
+                         "%s: no partition table found" % image.path)
+
+    def test__read__OSError(self):
+        with self.assertRaises(OSError):
+            ptable_.PartitionTable.read(os.path.join(self.tmpdir, 'missing'))
+
+    def test__read_all(self):
+        image1 = self.gpt_image(name='a.img')
+        image2 = self.image(name='b.img')
+        missing = os.path.join(self.tmpdir, 'c.img')
+        tables = ptable_.PartitionTable.read_all([image1.path, image2.path, missing], jobs=2)
+        self.assertEqual(set(tables), {image1.path, image2.path, missing})
+        self.check_gpt(tables[image1.path])
+        self.assertIsInstance(tables[image2.path], exceptions_.PartitionTableError)
+        self.assertIsInstance(tables[missing], OSError)
+
+    def graph(self):
+        nodes = {
+            '/dev/sda': blkdev_.BlkDev({'type': 'disk'}),
+            '/dev/sda1': blkdev_.BlkDev({'type': 'part', 'partuuid': '11111111-2222-3333-4444-555555555555'}),
+            '/dev/sdb1': blkdev_.BlkDev({'type': 'part', 'partuuid': None}),
+        }
+        return graph_.Graph(nodes, [('/dev/sda', '/dev/sda1')])
+
+    def test__link(self):
+        table = ptable_.PartitionTable.read(self.gpt_image().path)
+        links = table.link(self.graph())
+        self.assertEqual([(p.number, n) for (p, n) in links], [(1, '/dev/sda1'), (2, None)])
+
+    def test__link__with_index(self):
+        table = ptable_.PartitionTable.read(self.gpt_image().path)
+        graph = self.graph()
+        graph.indexes.add(propindex_.PropertyIndex())
+        graph.nodes.data.clear()  # the index must be used, not node data
+        links = table.link(graph)
+        self.assertEqual([(p.number, n) for (p, n) in links], [(1, '/dev/sda1'), (2, None)])
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import subprocess
+from unittest.mock import patch
+
+import dsklayout.model.sfdisk_ as sfdisk_
+
+backtick = 'dsklayout.model.sfdisk_.backtick'
+
+class Test__SfDisk(unittest.TestCase):
+
+    def test__init__(self):
+        table = sfdisk_.SfDisk('/dev/sda', 'label: gpt\n')
+        self.assertEqual(table.device, '/dev/sda')
+        self.assertEqual(table.dump, 'label: gpt\n')
+
+    def test__run(self):
+        with patch(backtick, return_value='label: gpt\n') as mock:
+            self.assertEqual(sfdisk_.SfDisk.run('/dev/sda'), 'label: gpt\n')
+            mock.assert_called_once_with(['sfdisk', '--dump', '/dev/sda'])
+
+    def test__run__with_custom_sfdisk(self):
+        with patch(backtick, return_value='label: gpt\n') as mock:
+            sfdisk_.SfDisk.run('/dev/sda', sfdisk='/sbin/sfdisk')
+            mock.assert_called_once_with(['/sbin/sfdisk', '--dump', '/dev/sda'])
+
+    def test__new(self):
+        with patch(backtick, return_value='label: dos\n') as mock:
+            table = sfdisk_.SfDisk.new('/dev/sdb')
+            self.assertIsInstance(table, sfdisk_.SfDisk)
+            self.assertEqual(table.device, '/dev/sdb')
+            self.assertEqual(table.dump, 'label: dos\n')
+            mock.assert_called_once_with(['sfdisk', '--dump', '/dev/sdb'])
+
+    def test__restore(self):
+        table = sfdisk_.SfDisk('/dev/sda', 'label: gpt\n')
+        with patch('subprocess.run') as mock:
+            self.assertIsNone(table.restore())
+            mock.assert_called_once_with(['sfdisk', '/dev/sda'], input='label: gpt\n',
+                                         stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                         universal_newlines=True, check=True)
+
+    def test__restore__other_device(self):
+        table = sfdisk_.SfDisk('/dev/sda', 'label: gpt\n')
+        with patch('subprocess.run') as mock:
+            table.restore('/dev/sdb', sfdisk='/sbin/sfdisk')
+            self.assertEqual(mock.call_args[0], (['/sbin/sfdisk', '/dev/sdb'],))
+
+    def test__restore__CalledProcessError(self):
+        table = sfdisk_.SfDisk('/dev/sda', 'label: gpt\n')
+        with patch('subprocess.run', side_effect=subprocess.CalledProcessError(1, 'sfdisk')):
+            with self.assertRaises(subprocess.CalledProcessError):
+                table.restore()
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+import unittest
+import tempfile
+import shutil
+import json
+import os
+
+import dsklayout.model.sysfsblk_ as sysfsblk_
+import dsklayout.model.blkdev_ as blkdev_
+import dsklayout.model.lsblk_ as lsblk_
+
+def fixture(name):
+    path = os.path.join(os.path.dirname(__file__), 'fixtures', name)
+    with open(path) as f:
+        return json.load(f)
+
+class FakeSysfs(object):
+    """Creates a minimal sysfs tree with block devices in a directory"""
+
+    def __init__(self, root):
+        self.root = root
+        self.devices = os.path.join(root, 'devices')
+        self.udev = os.path.join(root, 'udev')
+        self.mountinfo = os.path.join(root, 'mountinfo')
+        os.makedirs(os.path.join(root, 'class', 'block'))
+        os.makedirs(os.path.join(root, 'dev', 'block'))
+        os.makedirs(self.udev)
+        self.write(self.mountinfo, '')
+
+    @property
+    def kw(self):
+        return dict(sysfs=self.root, udev=self.udev, mountinfo=self.mountinfo,
+                    devfs=os.path.join(self.root, 'nodev'))
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+
+    def add(self, name, dev, size, parent=None, **attrs):
+        if parent is None:
+            path = os.path.join(self.devices, 'virtual', 'block', name)
+        else:
+            path = os.path.join(self.devices, 'virtual', 'block', parent, name)
+            self.write(os.path.join(path, 'partition'), '1')
+        self.write(os.path.join(path, 'dev'), dev)
+        self.write(os.path.join(path, 'size'), str(size))
+        self.write(os.path.join(path, 'ro'), '0')
+        self.write(os.path.join(path, 'uevent'), 'MAJOR=%s\nMINOR=%s\nDEVNAME=%s' % (tuple(dev.split(':')) + (name,)))
+        self.write(os.path.join(path, 'queue', 'scheduler'), 'noop deadline [cfq]')
+        self.write(os.path.join(path, 'queue', 'rotational'), '1')
+        for attr, value in attrs.items():
+            self.write(os.path.join(path, *attr.split('__')), value)
+        return self.register(name, dev, path)
+
+    def register(self, name, dev, path):
+        os.makedirs(os.path.join(path, 'holders'))
+        os.makedirs(os.path.join(path, 'slaves'))
+        os.symlink(path, os.path.join(self.root, 'class', 'block', name))
+        os.symlink(path, os.path.join(self.root, 'dev', 'block', dev))
+        return path
+
+    def add_udev(self, dev, **props):
+        lines = ['E:%s=%s' % item for item in sorted(props.items())]
+        self.write(os.path.join(self.udev, 'b%s' % dev), '\n'.join(lines))
+
+    def mount(self, dev, mountpoint):
+        with open(self.mountinfo, 'a') as f:
+            f.write('1 1 %s / %s rw - ext4 none rw\n' % (dev, mountpoint))
+
+    def hold(self, slave, holder):
+        classdir = os.path.join(self.root, 'class', 'block')
+        os.symlink(os.path.join(classdir, holder), os.path.join(classdir, slave, 'holders', holder))
+        os.symlink(os.path.join(classdir, slave), os.path.join(classdir, holder, 'slaves', slave))
+
+
+class Test__SysfsBlk(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        sysfs = FakeSysfs(self.tmpdir)
+        sysfs.add('sda', '8:0', 8388608, device__model='VBOX HARDDISK')
+        sysfs.add('sda1', '8:1', 2048, 'sda', uevent='PARTN=1\nPARTNAME=BIOS Boot')
+        sysfs.add('sda2', '8:2', 4194304, 'sda')
+        sysfs.add('sdb', '8:16', 8388608)
+        sysfs.add('sdb1', '8:17', 4194304, 'sdb')
+        sysfs.add('md2', '9:2', 4192256, md__level='raid1')
+        sysfs.add('dm-0', '253:0', 2097152, dm__name='vg-root', dm__uuid='LVM-abcd')
+        sysfs.hold('sda2', 'md2')
+        sysfs.hold('sdb1', 'md2')
+        sysfs.hold('md2', 'dm-0')
+        self.sysfs = sysfs
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test__content(self):
+        content = 'content'
+        self.assertIs(sysfsblk_.SysfsBlk(content).content, content)
+
+    def test__read(self):
+        content = sysfsblk_.SysfsBlk.read(**self.sysfs.kw)
+        knames = [(d['kname'], d['pkname']) for d in content['blockdevices']]
+        self.assertEqual(knames, [('/dev/sda', None),
+                                  ('/dev/sda1', '/dev/sda'),
+                                  ('/dev/sda2', '/dev/sda'),
+                                  ('/dev/md2', '/dev/sda2'),
+                                  ('/dev/md2', '/dev/sdb1'),
+                                  ('/dev/dm-0', '/dev/md2'),
+                                  ('/dev/sdb', None),
+                                  ('/dev/sdb1', '/dev/sdb')])
+
+    def test__read__properties(self):
+        content = sysfsblk_.SysfsBlk.read(**self.sysfs.kw)
+        devices = {d['kname']: d for d in content['blockdevices']}
+        sda = devices['/dev/sda']
+        self.assertEqual(sda['name'], '/dev/sda')
+        self.assertEqual(sda['maj:min'], '8:0')
+        self.assertEqual(sda['size'], '4G')
+        self.assertEqual(sda['type'], 'disk')
+        self.assertEqual(sda['model'], 'VBOX HARDDISK')
+        self.assertEqual(sda['sched'], 'cfq')
+        self.assertEqual(sda['rota'], '1')
+        self.assertEqual(sda['ro'], '0')
+        self.assertIsNone(sda['serial'])
+        self.assertIsNone(sda['fstype'])
+        self.assertEqual(devices['/dev/sda1']['type'], 'part')
+        self.assertEqual(devices['/dev/sda1']['partlabel'], 'BIOS Boot')
+        self.assertEqual(devices['/dev/md2']['type'], 'raid1')
+        self.assertEqual(devices['/dev/dm-0']['type'], 'lvm')
+        self.assertEqual(devices['/dev/dm-0']['name'], '/dev/mapper/vg-root')
+
+    def test__read__udev(self):
+        self.sysfs.add_udev('8:2', ID_FS_TYPE='linux_raid_member',
+                            ID_FS_LABEL_ENC='pipek:2\\x20x',
+                            ID_PART_ENTRY_NAME='Linux\\x20RAID',
+                            ID_SERIAL_SHORT='VB1234')
+        self.sysfs.add_udev('8:0', ID_SERIAL_SHORT='VB1234')
+        content = sysfsblk_.SysfsBlk.read(**self.sysfs.kw)
+        devices = {d['kname']: d for d in content['blockdevices']}
+        sda2 = devices['/dev/sda2']
+        self.assertEqual(sda2['fstype'], 'linux_raid_member')
+        self.assertEqual(sda2['label'], 'pipek:2 x')
+        self.assertEqual(sda2['partlabel'], 'Linux RAID')
+        self.assertIsNone(sda2['serial'])
+        self.assertEqual(devices['/dev/sda']['serial'], 'VB1234')
+        self.assertEqual(devices['/dev/sda1']['partlabel'], 'BIOS Boot')
+
+    def test__read__mountpoint(self):
+        self.sysfs.mount('253:0', '/srv/my\\040data')
+        content = sysfsblk_.SysfsBlk.read(**self.sysfs.kw)
+        devices = {d['kname']: d for d in content['blockdevices']}
+        self.assertEqual(devices['/dev/dm-0']['mountpoint'], '/srv/my data')
+        self.assertIsNone(devices['/dev/md2']['mountpoint'])
+
+    def test__read__partition_queue(self):
+        # partitions have no queue/, lsblk shows the one of their disk
+        shutil.rmtree(os.path.join(self.tmpdir, 'class', 'block', 'sda1',
+                                   'queue'))
+        content = sysfsblk_.SysfsBlk.read(**self.sysfs.kw)
+        sda1 = {d['kname']: d for d in content['blockdevices']}['/dev/sda1']
+        self.assertEqual(sda1['sched'], 'cfq')
+        self.assertEqual(sda1['rota'], '1')
+        self.assertIsNone(sda1['model'])
+
+    def test__human_size(self):
+        human_size = sysfsblk_.SysfsBlk._human_size
+        self.assertEqual(human_size(0), '0B')
+        self.assertEqual(human_size(512), '512B')
+        self.assertEqual(human_size(1024), '1K')
+        self.assertEqual(human_size(4 * 1024 ** 3), '4G')
+        self.assertEqual(human_size(268107776, ','), '255,7M')
+        self.assertEqual(human_size(1073739776), '1024M')
+        self.assertEqual(human_size(4093640704, '.'), '3.8G')
+        # rounding boundaries of size_to_human_string()
+        self.assertEqual(human_size(1592196663798), '1.5T')
+        self.assertEqual(human_size(560424759166), '522G')
+        self.assertEqual(human_size(1024 + 949), '1.9K')
+        self.assertEqual(human_size(1024 + 950), '2K')
+        self.assertEqual(human_size(1024 + 549), '1.5K')
+        self.assertEqual(human_size(1024 + 550), '1.6K')
+        self.assertEqual(human_size(1024 ** 2 + 51199), '1M')
+        self.assertEqual(human_size(1024 ** 2 + 51200), '1.1M')
+
+    def test__read__all_lsblk_properties(self):
+        content = sysfsblk_.SysfsBlk.read(**self.sysfs.kw)
+        properties = set(blkdev_.BlkDev._property_map.values())
+        for device in content['blockdevices']:
+            self.assertEqual(set(device), properties)
+
+    def test__read__devices(self):
+        content = sysfsblk_.SysfsBlk.read(['/dev/sdb'], **self.sysfs.kw)
+        knames = [(d['kname'], d['pkname']) for d in content['blockdevices']]
+        self.assertEqual(knames, [('/dev/sdb', None),
+                                  ('/dev/sdb1', '/dev/sdb'),
+                                  ('/dev/md2', '/dev/sda2'),
+                                  ('/dev/md2', '/dev/sdb1'),
+                                  ('/dev/dm-0', '/dev/md2')])
+
+    def test__graph(self):
+        graph = sysfsblk_.SysfsBlk.new(**self.sysfs.kw).graph()
+        self.assertEqual(set(graph.edges), {('/dev/sda', '/dev/sda1'),
+                                            ('/dev/sda', '/dev/sda2'),
+                                            ('/dev/sda2', '/dev/md2'),
+                                            ('/dev/sdb', '/dev/sdb1'),
+                                            ('/dev/sdb1', '/dev/md2'),
+                                            ('/dev/md2', '/dev/dm-0')})
+        self.assertEqual(len(graph.nodes), 7)
+        self.assertEqual(graph.node('/dev/md2').properties['pkname'],
+                         ['/dev/sda2', '/dev/sdb1'])
+
+    def test__graph__devices(self):
+        graph = sysfsblk_.SysfsBlk.new('sdb', **self.sysfs.kw).graph()
+        self.assertEqual(set(graph.edges), {('/dev/sdb', '/dev/sdb1'),
+                                            ('/dev/sdb1', '/dev/md2'),
+                                            ('/dev/md2', '/dev/dm-0')})
+
+class Test__SysfsBlk__LsBlk(unittest.TestCase):
+    """Graphs built by SysfsBlk and LsBlk from one shared fixture"""
+
+    # properties that depend on the host (device nodes) or are not read
+    ignored = ('owner', 'group', 'mode', 'hotplug', 'tran', 'subsystems')
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.content = fixture('lsblk_1_all.flat.json')
+        self.sysfs = FakeSysfs(self.tmpdir)
+        self.build(self.content['blockdevices'])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    @classmethod
+    def sectors(cls, size):
+        # a number of sectors lsblk shows as size (e.g. '255,7M')
+        number, suffix = float(size[:-1].replace(',', '.')), size[-1]
+        estimate = int(number * 1024 ** 'BKMGTPE'.index(suffix) / 512)
+        for delta in sorted(range(-4096, 4097), key=abs):
+            if sysfsblk_.SysfsBlk._human_size(512 * (estimate + delta),
+                                              ',') == size:
+                return estimate + delta
+        raise ValueError(size)
+
+    def build(self, devices):
+        names, held = set(), set()
+        for device in devices:
+            name = os.path.basename(device['kname'])
+            if name not in names:
+                names.add(name)
+                self.add(name, device)
+            if device['pkname'] is not None and device['type'] != 'part':
+                slave = os.path.basename(device['pkname'])
+                if (slave, name) not in held:
+                    held.add((slave, name))
+                    self.sysfs.hold(slave, name)
+
+    def add(self, name, device):
+        path = os.path.join(self.sysfs.devices, 'pci', name)
+        if device['type'] == 'part':
+            disk = os.path.basename(device['pkname'])
+            path = os.path.join(self.sysfs.devices, 'pci', disk, name)
+            self.sysfs.write(os.path.join(path, 'partition'), name[-1])
+        self.sysfs.write(os.path.join(path, 'uevent'), 'DEVNAME=%s' % name)
+        for (prop, file) in sysfsblk_.SysfsBlk._attributes:
+            value = device[prop]
+            if value is None or prop in ('serial', 'wwn'):  # from udev
+                continue
+            if prop == 'size':
+                value = str(self.sectors(value))
+            elif prop in sysfsblk_.SysfsBlk._sizes:
+                value = str(self.sectors(value) * 512)
+            elif prop == 'sched':
+                value = 'noop deadline [%s]' % value
+            if file.startswith('device/'):
+                if device['hctl'] is not None:
+                    self.sysfs.write(os.path.join(self.sysfs.devices, 'host',
+                                                  device['hctl'], file[7:]),
+                                     value)
+            elif device['type'] != 'part' or file == 'dev' or not \
+                    (file.startswith('queue/') or file == 'removable'):
+                # partitions share queue/ and removable with their disk
+                self.sysfs.write(os.path.join(path, file), value)
+        if device['hctl'] is not None:
+            os.symlink(os.path.join(self.sysfs.devices, 'host', device['hctl']),
+                       os.path.join(path, 'device'))
+        if device['type'].startswith('raid'):
+            self.sysfs.write(os.path.join(path, 'md', 'level'), device['type'])
+        if device['type'] == 'lvm':
+            self.sysfs.write(os.path.join(path, 'dm', 'name'),
+                             os.path.basename(device['name']))
+            self.sysfs.write(os.path.join(path, 'dm', 'uuid'), 'LVM-' + name)
+            self.sysfs.write(os.path.join(path, 'dm', 'suspended'), '0')
+        udev = {names[-1]: device[prop].replace(' ', '\\x20')
+                for (prop, names) in sysfsblk_.SysfsBlk._udev
+                if device[prop] is not None}
+        self.sysfs.add_udev(device['maj:min'], **udev)
+        if device['mountpoint'] is not None:
+            self.sysfs.mount(device['maj:min'], device['mountpoint'])
+        return self.sysfs.register(name, device['maj:min'], path)
+
+    def properties(self, graph):
+        return {node: {k: v for (k, v) in data.properties.items()
+                       if k not in self.ignored}
+                for (node, data) in graph.nodes.items()}
+
+    def test__graph(self):
+        expected = lsblk_.LsBlk(self.content, flat=True).graph()
+        content = sysfsblk_.SysfsBlk.read(decimal_point=',', **self.sysfs.kw)
+        graph = sysfsblk_.SysfsBlk(content).graph()
+        self.assertEqual(set(graph.nodes), set(expected.nodes))
+        self.assertEqual(set(graph.edges), set(expected.edges))
+        self.assertEqual(self.properties(graph), self.properties(expected))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim: set ft=python et ts=4 sw=4:
@@ -12,8 +12,29 @@ class Test__model__PackageSymbols(unittest.TestCase):
     def test__blkdev__symbols(self):
         self.assertIs(model.BlkDev, model.blkdev_.BlkDev)
 
+    def test__blkdevtable__symbols(self):
+        self.assertIs(model.BlkDevTable, model.blkdevtable_.BlkDevTable)
+        self.assertIs(model.BlkDevRow, model.blkdevtable_.BlkDevRow)
+
+    def test__layoutcache__symbols(self):
+        self.assertIs(model.LayoutCache, model.layoutcache_.LayoutCache)
+
+    def test__ptable__symbols(self):
+        self.assertIs(model.Partition, model.ptable_.Partition)
+        self.assertIs(model.PartitionTable, model.ptable_.PartitionTable)
+
+    def test__propindex__symbols(self):
+        self.assertIs(model.PropertyIndex, model.propindex_.PropertyIndex)
+
     def test__exceptions__symbols(self):
         self.assertIs(model.InconsistentDataError, model.exceptions_.InconsistentDataError)
+        self.assertIs(model.PartitionTableError, model.exceptions_.PartitionTableError)
+
+    def test__sysfsblk__symbols(self):
+        self.assertIs(model.SysfsBlk, model.sysfsblk_.SysfsBlk)
+
+    def test__sfdisk__symbols(self):
+        self.assertIs(model.SfDisk, model.sfdisk_.SfDisk)
 
 if __name__ == '__main__':
     unittest.main()
@@ -3,7 +3,11 @@
 
 import unittest
 from unittest.mock import patch
+import subprocess
+import asyncio
 import types
+import time
+import sys
 
 import dsklayout.util as util
 
@@ -12,6 +16,15 @@ class Test__util__PackageSymbols(unittest.TestCase):
     def test__backtick__symbol(self):
         self.assertIsInstance(util.backtick, types.FunctionType)
 
+    def test__pipe__symbol(self):
+        self.assertIsInstance(util.pipe, types.FunctionType)
+
+    def test__async_backtick__symbol(self):
+        self.assertTrue(asyncio.iscoroutinefunction(util.async_backtick))
+
+    def test__CommandRunner__symbol(self):
+        self.assertIsInstance(util.CommandRunner, type)
+
 class Test__util__PackageFunctions(unittest.TestCase):
 
     def test__backtick__with_two_args(self):
@@ -53,6 +66,152 @@ class Test__util__PackageFunctions(unittest.TestCase):
                                                         universal_newlines=True,
                                                         timeout=None)
 
+    def test__pipe(self):
+        cmd = [sys.executable, '-c', 'print("foo"); print("bar")']
+        with util.pipe(cmd) as stream:
+            self.assertEqual(stream.readline(), 'foo\n')
+            self.assertEqual(stream.read(), 'bar\n')
+
+    def test__pipe__unread_output(self):
+        cmd = [sys.executable, '-c', 'print("x" * 1000000)']
+        with util.pipe(cmd) as stream:
+            self.assertEqual(stream.read(3), 'xxx')
+
+    def test__pipe__CalledProcessError(self):
+        cmd = [sys.executable, '-c', 'import sys; sys.stderr.write("err"); sys.exit(3)']
+        with self.assertRaises(subprocess.CalledProcessError) as context:
+            with util.pipe(cmd) as stream:
+                stream.read()
+        self.assertEqual(context.exception.returncode, 3)
+        self.assertEqual(context.exception.stderr, 'err')
+
+    def test__pipe__exception_CalledProcessError(self):
+        cmd = [sys.executable, '-c', 'import sys; sys.stderr.write("err"); sys.exit(3)']
+        with self.assertRaises(subprocess.CalledProcessError) as context:
+            with util.pipe(cmd) as stream:
+                stream.read()
+                raise ValueError('no output')
+        self.assertEqual(context.exception.returncode, 3)
+        self.assertEqual(context.exception.stderr, 'err')
+        self.assertIsInstance(context.exception.__context__, ValueError)
+
+    def test__pipe__exception_success(self):
+        cmd = [sys.executable, '-c', 'print("foo")']
+        with self.assertRaises(ValueError):
+            with util.pipe(cmd) as stream:
+                stream.read()
+                raise ValueError('foo')
+
+    def test__pipe__exception_kills_process(self):
+        cmd = [sys.executable, '-c', 'import time; time.sleep(60)']
+        with self.assertRaises(RuntimeError):
+            with util.pipe(cmd):
+                raise RuntimeError('foo')
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class Test__util__AsyncFunctions(unittest.TestCase):
+
+    def test__async_backtick(self):
+        cmd = [sys.executable, '-c', 'print("foo")']
+        self.assertEqual(run(util.async_backtick(cmd)), 'foo\n')
+
+    def test__async_backtick__input(self):
+        cmd = [sys.executable, '-c', 'import sys; print(sys.stdin.read().upper())']
+        self.assertEqual(run(util.async_backtick(cmd, 'bar')), 'BAR\n')
+
+    def test__async_backtick__CalledProcessError(self):
+        cmd = [sys.executable, '-c', 'import sys; print("out"); sys.stderr.write("err"); sys.exit(3)']
+        with self.assertRaises(subprocess.CalledProcessError) as context:
+            run(util.async_backtick(cmd))
+        self.assertEqual(context.exception.returncode, 3)
+        self.assertEqual(context.exception.output, 'out\n')
+        self.assertEqual(context.exception.stderr, 'err')
+
+    def test__async_backtick__timeout(self):
+        cmd = [sys.executable, '-c', 'import time; time.sleep(60)']
+        start = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired) as context:
+            run(util.async_backtick(cmd, timeout=0.2))
+        self.assertLess(time.monotonic() - start, 30)
+        self.assertEqual(context.exception.cmd, cmd)
+
+    def test__async_backtick__cancel(self):
+        cmd = [sys.executable, '-c', 'import time; time.sleep(60)']
+
+        async def cancelled():
+            task = asyncio.ensure_future(util.async_backtick(cmd))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            await asyncio.wait([task])
+            return task
+
+        start = time.monotonic()
+        task = run(cancelled())
+        self.assertTrue(task.cancelled())
+        self.assertLess(time.monotonic() - start, 30)
+
+
+class Test__CommandRunner(unittest.TestCase):
+
+    def test__init__(self):
+        runner = util.CommandRunner()
+        self.assertEqual(runner.limit, 4)
+        self.assertIsNone(runner.timeout)
+        runner = util.CommandRunner(limit=2, timeout=10)
+        self.assertEqual(runner.limit, 2)
+        self.assertEqual(runner.timeout, 10)
+
+    def test__backticks(self):
+        runner = util.CommandRunner()
+        cmds = [[sys.executable, '-c', 'print(%d)' % i] for i in range(3)]
+        self.assertEqual(run(runner.backticks(cmds)), ['0\n', '1\n', '2\n'])
+
+    def test__backtick__limit(self):
+        running = []
+        peak = []
+
+        async def fake(cmd, input=None, timeout=None):
+            running.append(cmd)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(cmd)
+            return cmd
+
+        runner = util.CommandRunner(limit=2)
+        with patch('dsklayout.util.async_backtick', side_effect=fake):
+            outputs = run(runner.backticks(['a', 'b', 'c', 'd', 'e']))
+        self.assertEqual(outputs, ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(max(peak), 2)
+
+    def test__backtick__timeout(self):
+        calls = []
+
+        async def fake(cmd, input=None, timeout=None):
+            calls.append(timeout)
+
+        runner = util.CommandRunner(timeout=5)
+        with patch('dsklayout.util.async_backtick', side_effect=fake):
+            run(runner.backtick('a'))
+            run(runner.backtick('b', timeout=1))
+        self.assertEqual(calls, [5, 1])
+
+    def test__backticks__failure_cancels_others(self):
+        runner = util.CommandRunner()
+        cmds = [[sys.executable, '-c', 'import time; time.sleep(60)'],
+                [sys.executable, '-c', 'import sys; sys.exit(1)']]
+        start = time.monotonic()
+        with self.assertRaises(subprocess.CalledProcessError):
+            run(runner.backticks(cmds))
+        self.assertLess(time.monotonic() - start, 30)
+
 
 if __name__ == '__main__':
     unittest.main()